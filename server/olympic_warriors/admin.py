@@ -2,7 +2,7 @@
 Admin dashboard configuration for the Olympic Warriors app.
 """
 
-from django.contrib.admin import site, ModelAdmin, TabularInline
+from django.contrib.admin import action, site, ModelAdmin, TabularInline
 from django.http import HttpRequest
 from .models import (
     Player,
@@ -30,7 +30,12 @@ from .models import (
     Relay,
     Fair,
     ObstacleCourse,
+    LeaderboardEntry,
+    RegistrationImportJob,
+    TeamPreference,
 )
+from .grading import grade_blindtest_round
+from .teams import TeamBuildError, build_teams, rebalance_edition_teams
 
 
 def request_only_active(request: HttpRequest) -> HttpRequest:
@@ -74,6 +79,16 @@ class PlayerRatingInline(TabularInline):
     extra = 1
 
 
+class TeamPreferenceInline(TabularInline):
+    """
+    Inline for the TeamPreference model to be accessed from the Player model.
+    """
+
+    model = TeamPreference
+    fk_name = "player"
+    extra = 1
+
+
 class PlayerInline(TabularInline):
     """
     Inline for the Player model to be accessed from the Team model.
@@ -90,6 +105,7 @@ class RugbyEventInline(TabularInline):
 
     model = RugbyEvent
     extra = 1
+    readonly_fields = ["points"]
 
 
 class DodgeballEventInline(TabularInline):
@@ -99,6 +115,7 @@ class DodgeballEventInline(TabularInline):
 
     model = DodgeballEvent
     extra = 1
+    readonly_fields = ["ended_round"]
 
 
 class PlayerAdmin(ModelAdmin):
@@ -109,7 +126,8 @@ class PlayerAdmin(ModelAdmin):
     list_display = ["user", "rating", "team", "edition"]
     list_filter = ["team", "edition", "is_active"]
     search_fields = ["name", "team", "user", "edition"]
-    inlines = [PlayerRatingInline]
+    readonly_fields = ["team_preferences"]
+    inlines = [PlayerRatingInline, TeamPreferenceInline]
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -143,6 +161,7 @@ class TeamAdmin(ModelAdmin):
 
     list_display = ["name", "edition", "total_points", "ranking"]
     list_filter = ["edition", "is_active"]
+    list_select_related = ["edition", "leaderboard_entry"]
     search_fields = ["name", "edition"]
     inlines = [PlayerInline]
 
@@ -154,6 +173,67 @@ class TeamAdmin(ModelAdmin):
         return super().changelist_view(request, extra_context)
 
 
+class LeaderboardEntryAdmin(ModelAdmin):
+    """
+    Admin dashboard configuration for the LeaderboardEntry model.
+    """
+
+    list_display = ["team", "edition", "total_points", "ranking"]
+    list_filter = ["edition"]
+    list_select_related = ["team", "edition"]
+    readonly_fields = ["team", "edition", "total_points", "ranking", "breakdown"]
+    search_fields = ["team__name"]
+
+
+class RegistrationImportJobAdmin(ModelAdmin):
+    """
+    Admin dashboard configuration for the RegistrationImportJob model.
+    """
+
+    list_display = [
+        "edition", "registration_form", "status", "processed_rows", "total_rows", "created_at"
+    ]
+    list_filter = ["status", "edition"]
+    list_select_related = ["edition"]
+    readonly_fields = [
+        "edition",
+        "registration_form",
+        "status",
+        "total_rows",
+        "processed_rows",
+        "created_users",
+        "created_players",
+        "created_ratings",
+        "updated_players",
+        "errors",
+        "created_at",
+        "started_at",
+        "finished_at",
+    ]
+
+
+class RegistrationImportJobInline(TabularInline):
+    """
+    Inline for the RegistrationImportJob model to follow imports from the Edition model.
+    """
+
+    model = RegistrationImportJob
+    extra = 0
+    can_delete = False
+    fields = [
+        "registration_form",
+        "status",
+        "processed_rows",
+        "total_rows",
+        "created_players",
+        "updated_players",
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class EditionAdmin(ModelAdmin):
     """
     Admin dashboard configuration for the Edition model.
@@ -162,6 +242,50 @@ class EditionAdmin(ModelAdmin):
     list_display = ["year"]
     list_filter = ["is_active"]
     search_fields = ["year"]
+    inlines = [RegistrationImportJobInline]
+    actions = ["build_balanced_teams", "rebalance_teams"]
+
+    @action(description="Build balanced teams from the player ratings")
+    def build_balanced_teams(self, request, queryset):
+        """
+        Split the active players of the selected editions into their active teams.
+        """
+        for edition in queryset:
+            try:
+                balance = build_teams(edition)
+            except TeamBuildError as e:
+                self.message_user(request, str(e), level="error")
+                continue
+            self.message_user(
+                request,
+                f"{edition}: teams built with score {balance.score:.2f}, strength spread "
+                f"{balance.strength_spread:.2f}, {balance.broken_preferences} broken preferences.",
+            )
+
+    @action(description="Rebalance teams after players withdrew or joined")
+    def rebalance_teams(self, request, queryset):
+        """
+        Restore the balance of the teams of the selected editions with as few changes
+        as possible.
+        """
+        for edition in queryset:
+            try:
+                rebalance, new_teams = rebalance_edition_teams(edition)
+            except TeamBuildError as e:
+                self.message_user(request, str(e), level="error")
+                continue
+            players = Player.objects.select_related("user", "team").in_bulk(new_teams)
+            changes = ", ".join(
+                f"{players[player_id]} to {players[player_id].team}" for player_id in new_teams
+            )
+            self.message_user(
+                request,
+                f"{edition}: {len(rebalance.moves)} moves and {len(rebalance.swaps)} swaps, "
+                f"strength spread {rebalance.strength_spread_before:.2f} to "
+                f"{rebalance.strength_spread:.2f}"
+                + (f" ({changes})." if changes else "."),
+                level="success" if rebalance.is_balanced else "warning",
+            )
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -226,11 +350,24 @@ class BlindtestRoundAdmin(ModelAdmin):
     Admin dashboard configuration for the BlindtestRound model.
     """
 
-    list_display = ["blindtest", "order", "is_active"]
-    list_filter = ["blindtest", "order", "is_active"]
-    search_fields = ["blindtest", "order"]
+    list_display = ["blindtest", "order", "artist", "song", "is_open", "is_active"]
+    list_editable = ["is_open"]
+    list_filter = ["blindtest", "order", "is_open", "is_active"]
+    search_fields = ["blindtest", "order", "artist", "song"]
 
     inlines = [BlindtestGuessInline]
+    actions = ["grade_rounds"]
+
+    @action(description="Grade guesses against the answer key")
+    def grade_rounds(self, request, queryset):
+        """
+        Grade the guesses of the selected rounds.
+        """
+        changed = sum(
+            grade_blindtest_round(round_id).changed
+            for round_id in queryset.values_list("id", flat=True)
+        )
+        self.message_user(request, f"{changed} guesses changed.")
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -343,9 +480,10 @@ class RugbyEventAdmin(GameEventAdmin):
     Admin dashboard configuration for the RugbyEvent model.
     """
 
-    list_display = ["game", "player1", "player2", "time", "event_type"]
+    list_display = ["game", "player1", "player2", "time", "event_type", "points"]
     list_filter = ["game", "player1", "player2", "event_type", "is_active"]
     search_fields = ["game", "player1", "player2", "event_type"]
+    readonly_fields = ["points"]
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -360,9 +498,10 @@ class DodgeballEventAdmin(GameEventAdmin):
     Admin dashboard configuration for the DodgeballEvent model.
     """
 
-    list_display = ["game", "player1", "player2", "time", "event_type"]
+    list_display = ["game", "player1", "player2", "time", "event_type", "ended_round"]
     list_filter = ["game", "player1", "player2", "event_type", "is_active"]
     search_fields = ["game", "player1", "player2", "event_type"]
+    readonly_fields = ["ended_round"]
 
     def changelist_view(self, request, extra_context=None):
         """
@@ -374,6 +513,8 @@ class DodgeballEventAdmin(GameEventAdmin):
 
 site.register(Player, PlayerAdmin)
 site.register(Team, TeamAdmin)
+site.register(LeaderboardEntry, LeaderboardEntryAdmin)
+site.register(RegistrationImportJob, RegistrationImportJobAdmin)
 site.register(Edition, EditionAdmin)
 site.register(PlayerRating, PlayerRatingAdmin)
 site.register(Discipline, DisciplineAdmin)
@@ -0,0 +1,2 @@
+from .ingest import EventBatchError, ingest_game_events
+from .replay import apply_replay, replay_discipline, replay_disciplines
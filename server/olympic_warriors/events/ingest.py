@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+from olympic_warriors.models import DodgeballEvent, Game, GameEvent, Player, RugbyEvent
+
+# Event model of each discipline supporting game events
+EVENT_MODELS = {
+    "Rugby": RugbyEvent,
+    "Dodgeball": DodgeballEvent,
+}
+# Event types needing a player 2, the player hit or whose ball was caught
+TWO_PLAYER_EVENT_TYPES = {
+    DodgeballEvent: {
+        DodgeballEvent.DodgeballEventTypes.HIT,
+        DodgeballEvent.DodgeballEventTypes.CATCH,
+    },
+}
+
+
+class EventBatchError(ValueError):
+    """
+    Raised when events of a batch are invalid, none of the batch being applied.
+    """
+
+    def __init__(self, errors: dict[int, str]):
+        self.errors = errors
+        super().__init__(
+            "; ".join(f"Event {index}: {error}" for index, error in sorted(errors.items()))
+        )
+
+
+@dataclass
+class EventBatchResult:
+    """
+    Outcome of a batch of game events.
+    """
+
+    created: dict[str, int] = field(default_factory=dict)
+    duplicates: dict[str, int] = field(default_factory=dict)
+    games: list[Game] = field(default_factory=list)
+
+
+def ingest_game_events(events: list[dict]) -> EventBatchResult:
+    """
+    Apply a batch of typed game events in one transaction, in time order.
+
+    Events whose idempotency key was already applied, or appears earlier in the batch, are
+    skipped and reported as duplicates, so that a batch can be sent again safely. Games and
+    rosters are loaded once for the whole batch.
+
+    @param events: events with idempotency_key, game, player1, player2, time and event_type
+
+    @return: ids of the created and already applied events by idempotency key,
+        and the games with their resulting scores
+    @raise EventBatchError: if an event is invalid
+    """
+    result = EventBatchResult()
+    result.duplicates = dict(
+        GameEvent.objects.filter(
+            idempotency_key__in=[event["idempotency_key"] for event in events]
+        ).values_list("idempotency_key", "id")
+    )
+
+    game_ids = {event["game"] for event in events}
+    games = Game.objects.select_related("discipline", "team1", "team2").in_bulk(game_ids)
+    players = Player.objects.select_related("team", "user").in_bulk(
+        {event["player1"] for event in events}
+        | {event["player2"] for event in events if event.get("player2")}
+    )
+
+    errors = {}
+    new_events = []
+    keys = set()
+    batch_duplicates = set()
+    for index, event in enumerate(events):
+        key = event["idempotency_key"]
+        if key in result.duplicates:
+            continue
+        if key in keys:
+            batch_duplicates.add(key)
+            continue
+        keys.add(key)
+
+        game = games.get(event["game"])
+        if game is None:
+            errors[index] = f"Game {event['game']} not found."
+            continue
+        event_model = EVENT_MODELS.get(game.discipline.name)
+        if event_model is None:
+            errors[index] = f"{game.discipline.name} games do not support events."
+            continue
+        if event["event_type"] not in dict(event_model._meta.get_field("event_type").choices):
+            errors[index] = f"Invalid {game.discipline.name} event type {event['event_type']}."
+            continue
+
+        game_players = []
+        for player_field in ("player1", "player2"):
+            player_id = event.get(player_field)
+            if player_id is None:
+                game_players.append(None)
+                continue
+            player = players.get(player_id)
+            if player is None or player.team_id not in (game.team1_id, game.team2_id):
+                errors[index] = f"Player {player_id} is not part of the teams playing the game."
+                break
+            game_players.append(player)
+        if index in errors:
+            continue
+        if game_players[0] is None:
+            errors[index] = "Player 1 is required."
+            continue
+        if game_players[1] is None and event["event_type"] in TWO_PLAYER_EVENT_TYPES.get(
+            event_model, ()
+        ):
+            errors[index] = "Player 2 is required."
+            continue
+
+        new_events.append(
+            (
+                event.get("time") or timezone.now(),
+                index,
+                event_model(
+                    idempotency_key=key,
+                    game=game,
+                    player1=game_players[0],
+                    player2=game_players[1],
+                    event_type=event["event_type"],
+                ),
+            )
+        )
+
+    if errors:
+        raise EventBatchError(errors)
+
+    with transaction.atomic():
+        for time, _, event in sorted(new_events, key=lambda new_event: new_event[:2]):
+            event.time = time
+            event.save()
+            result.created[event.idempotency_key] = event.id
+    # Events repeated within the batch were applied by their first occurrence
+    for key in batch_duplicates:
+        result.duplicates[key] = result.created[key]
+
+    result.games = list(Game.objects.filter(id__in=game_ids).order_by("id"))
+    return result
@@ -0,0 +1,243 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from olympic_warriors.models import (
+    BlindtestGuess,
+    Discipline,
+    DodgeballEvent,
+    DodgeballGameState,
+    FeedEntry,
+    Game,
+    LeaderboardEntry,
+    RugbyEvent,
+    RugbyGameState,
+    TeamResult,
+)
+
+
+@dataclass
+class ScoreDiff:
+    """
+    A stored value differing from the value replayed from events.
+    """
+
+    kind: str
+    id: int
+    stored: object
+    expected: object
+
+
+@dataclass
+class DisciplineReplay:
+    """
+    Scores of a discipline replayed from its events, games and guesses.
+
+    Game scores are only replayed for games with events, scores of the other games
+    being entered by hand. Team points are only replayed for disciplines with games
+    or blindtest guesses.
+    """
+
+    discipline_id: int
+    game_scores: dict[int, tuple[int, int]] = field(default_factory=dict)
+    team_points: dict[int, int] = field(default_factory=dict)
+    event_values: dict[int, object] = field(default_factory=dict)
+    diffs: list[ScoreDiff] = field(default_factory=list)
+
+
+def _replay_rugby_game(game: Game, events: list[tuple]) -> tuple[tuple[int, int], dict]:
+    """
+    Replay the events of a Rugby game in memory.
+
+    @return: score of the game and points of each try by event id
+    """
+    state = RugbyGameState(game=game)
+    scores = {game.team1_id: 0, game.team2_id: 0}
+    try_points = {}
+    for event_id, event_type, team1_id, _, time in events:
+        if event_type == RugbyEvent.RugbyEventTypes.TRY:
+            try_points[event_id] = state.try_points(team1_id)
+            scores[team1_id] = scores.get(team1_id, 0) + try_points[event_id]
+        state.apply(event_type, team1_id, time)
+    return (scores[game.team1_id], scores[game.team2_id]), try_points
+
+
+def _replay_dodgeball_game(game: Game, events: list[tuple]) -> tuple[tuple[int, int], dict]:
+    """
+    Replay the events of a Dodgeball game in memory.
+
+    @return: score of the game and whether each event ends a round by event id
+    """
+    state = DodgeballGameState(game=game)
+    scores = {game.team1_id: 0, game.team2_id: 0}
+    ended_rounds = {}
+    for event_id, event_type, team1_id, team2_id, time in events:
+        ended_rounds[event_id] = state.apply(event_type, team1_id, team2_id, time)
+        if ended_rounds[event_id]:
+            if event_type == DodgeballEvent.DodgeballEventTypes.FOUL:
+                scoring_team_id = game.team2_id if team1_id == game.team1_id else game.team1_id
+            else:
+                scoring_team_id = team1_id
+            scores[scoring_team_id] = scores.get(scoring_team_id, 0) + 1
+    return (scores[game.team1_id], scores[game.team2_id]), ended_rounds
+
+
+# Event model, replay function and derived event field of each discipline with events
+EVENT_REPLAYS = {
+    "Rugby": (RugbyEvent, _replay_rugby_game, "points"),
+    "Dodgeball": (DodgeballEvent, _replay_dodgeball_game, "ended_round"),
+}
+
+
+def replay_discipline(discipline_id: int) -> DisciplineReplay:
+    """
+    Replay the scores of a discipline from its events, games and guesses, in bulk.
+
+    @param discipline_id: id of the discipline to replay
+
+    @return: replayed scores and their differences with stored values
+    """
+    discipline = Discipline.objects.get(id=discipline_id)
+    replay = DisciplineReplay(discipline_id=discipline_id)
+
+    games = {
+        game.id: game
+        for game in Game.objects.filter(discipline_id=discipline_id, is_active=True)
+    }
+
+    if discipline.name in EVENT_REPLAYS:
+        event_model, replay_game, event_field = EVENT_REPLAYS[discipline.name]
+        events_by_game = {}
+        stored_event_values = {}
+        for event_id, game_id, event_type, team1_id, team2_id, time, value in (
+            event_model.objects.filter(game__in=games, is_active=True)
+            .order_by("time", "id")
+            .values_list(
+                "id", "game_id", "event_type", "player1__team_id", "player2__team_id",
+                "time", event_field,
+            )
+        ):
+            events_by_game.setdefault(game_id, []).append(
+                (event_id, event_type, team1_id, team2_id, time)
+            )
+            stored_event_values[event_id] = value
+
+        for game_id, events in events_by_game.items():
+            replay.game_scores[game_id], event_values = replay_game(games[game_id], events)
+            replay.event_values.update(event_values)
+
+        for event_id, value in replay.event_values.items():
+            if stored_event_values[event_id] != value:
+                replay.diffs.append(
+                    ScoreDiff("event", event_id, stored_event_values[event_id], value)
+                )
+
+    for game_id, score in replay.game_scores.items():
+        stored_score = (games[game_id].score1, games[game_id].score2)
+        if stored_score != score:
+            replay.diffs.append(ScoreDiff("game", game_id, stored_score, score))
+
+    if games:
+        for game in games.values():
+            score1, score2 = replay.game_scores.get(game.id, (game.score1, game.score2))
+            team1_points, team2_points = Game.result_points(score1, score2)
+            replay.team_points[game.team1_id] = (
+                replay.team_points.get(game.team1_id, 0) + team1_points
+            )
+            replay.team_points[game.team2_id] = (
+                replay.team_points.get(game.team2_id, 0) + team2_points
+            )
+    elif discipline.name == "Blindtest":
+        replay.team_points = {
+            team_id: artists + songs
+            for team_id, artists, songs in BlindtestGuess.objects.filter(
+                blindtest_round__blindtest_id=discipline_id,
+                blindtest_round__is_active=True,
+                is_active=True,
+            )
+            .values("team_id")
+            .annotate(
+                artists=Count("id", filter=Q(is_artist_correct=True)),
+                songs=Count("id", filter=Q(is_song_correct=True)),
+            )
+            .values_list("team_id", "artists", "songs")
+        }
+
+    if games or discipline.name == "Blindtest":
+        for result_id, team_id, points in TeamResult.objects.filter(
+            discipline_id=discipline_id
+        ).values_list("id", "team_id", "points"):
+            expected = replay.team_points.get(team_id, 0)
+            replay.team_points[team_id] = expected
+            if points != expected:
+                replay.diffs.append(ScoreDiff("result", result_id, points, expected))
+
+    return replay
+
+
+def apply_replay(replay: DisciplineReplay) -> None:
+    """
+    Overwrite stored scores with replayed ones, in bulk, and refresh the leaderboard.
+
+    Live game states of the corrected games are dropped, to be rebuilt from their events.
+
+    @param replay: replay of a discipline
+    """
+    if not replay.diffs:
+        return
+    diffs = {kind: {} for kind in ("event", "game", "result")}
+    for diff in replay.diffs:
+        diffs[diff.kind][diff.id] = diff.expected
+
+    discipline = Discipline.objects.get(id=replay.discipline_id)
+    with transaction.atomic():
+        if diffs["event"]:
+            event_model, _, event_field = EVENT_REPLAYS[discipline.name]
+            events = list(event_model.objects.filter(id__in=diffs["event"]))
+            for event in events:
+                setattr(event, event_field, diffs["event"][event.id])
+            event_model.objects.bulk_update(events, [event_field])
+
+        if diffs["game"]:
+            games = list(Game.objects.filter(id__in=diffs["game"]))
+            for game in games:
+                game.score1, game.score2 = diffs["game"][game.id]
+            Game.objects.bulk_update(games, ["score1", "score2"])
+            FeedEntry.record_games(games)
+            RugbyGameState.objects.filter(game__in=games).delete()
+            DodgeballGameState.objects.filter(game__in=games).delete()
+
+        if diffs["result"]:
+            results = list(TeamResult.objects.filter(id__in=diffs["result"]))
+            for result in results:
+                result.points = diffs["result"][result.id]
+            TeamResult.objects.bulk_update(results, ["points"])
+
+        LeaderboardEntry.refresh_discipline(replay.discipline_id)
+
+
+def _init_worker():
+    """
+    Set up Django in a worker process.
+    """
+    django.setup()
+
+
+def replay_disciplines(discipline_ids: list[int], workers: int = 1) -> list[DisciplineReplay]:
+    """
+    Replay several disciplines, in parallel across a process pool when workers > 1.
+
+    @param discipline_ids: ids of the disciplines to replay
+    @param workers: number of worker processes
+
+    @return: replays in the order of the discipline ids
+    """
+    if workers <= 1 or len(discipline_ids) <= 1:
+        return [replay_discipline(discipline_id) for discipline_id in discipline_ids]
+
+    # Workers open their own connections, sharing the parent ones would corrupt them
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(replay_discipline, discipline_ids))
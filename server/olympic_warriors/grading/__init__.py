@@ -0,0 +1,2 @@
+from .text import AnswerIndex, normalize_answer
+from .blindtest import RoundGrading, grade_blindtest_round
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from olympic_warriors.models import BlindtestGuess, BlindtestRound, LeaderboardEntry, TeamResult
+
+from .text import DEFAULT_THRESHOLD, AnswerIndex, normalize_answer
+
+
+@dataclass
+class RoundGrading:
+    """
+    Outcome of grading a blindtest round.
+    """
+
+    round_id: int
+    graded: int = 0
+    changed: int = 0
+    points: dict[int, int] = field(default_factory=dict)
+
+
+def grade_blindtest_round(
+    round_id: int, threshold: float = DEFAULT_THRESHOLD
+) -> RoundGrading:
+    """
+    Grade every active guess of a blindtest round against its answer key, in one pass.
+
+    Only the parts of the answer key that are filled are graded. Changed guesses are
+    written in bulk and the point deltas of every team are applied with a single UPDATE,
+    unless the round is inactive.
+
+    @param round_id: id of the blindtest round
+    @param threshold: minimum similarity between a guess and an accepted answer
+
+    @return: number of graded and changed guesses, and points added by team id
+    @raise BlindtestRound.DoesNotExist: if the round is not found
+    """
+    blindtest_round = BlindtestRound.objects.get(id=round_id)
+    indexes = {
+        "artist": AnswerIndex(
+            [blindtest_round.artist, *blindtest_round.artist_aliases], threshold
+        ),
+        "song": AnswerIndex([blindtest_round.song, *blindtest_round.song_aliases], threshold),
+    }
+    indexes = {answer_field: index for answer_field, index in indexes.items() if index}
+    grading = RoundGrading(round_id=round_id)
+    if not indexes:
+        return grading
+
+    with transaction.atomic():
+        guesses = list(
+            BlindtestGuess.objects.select_for_update().filter(
+                blindtest_round=blindtest_round, is_active=True
+            )
+        )
+        # Teams often give the same answers, match each distinct answer once
+        matches = {}
+        changed_guesses = []
+        for guess in guesses:
+            changed = False
+            for answer_field, index in indexes.items():
+                answer = normalize_answer(getattr(guess, answer_field))
+                if (answer_field, answer) not in matches:
+                    matches[(answer_field, answer)] = index.matches(answer, normalized=True)
+                is_correct = matches[(answer_field, answer)]
+                flag = f"is_{answer_field}_correct"
+                if getattr(guess, flag) != is_correct:
+                    setattr(guess, flag, is_correct)
+                    grading.points[guess.team_id] = (
+                        grading.points.get(guess.team_id, 0) + (1 if is_correct else -1)
+                    )
+                    changed = True
+            if changed:
+                changed_guesses.append(guess)
+
+        grading.graded = len(guesses)
+        grading.changed = len(changed_guesses)
+        BlindtestGuess.objects.bulk_update(
+            changed_guesses, ["is_artist_correct", "is_song_correct"]
+        )
+
+        # Team results only count active rounds, reactivating the round grants the points
+        if blindtest_round.is_active and TeamResult.objects.add_points(
+            {
+                (blindtest_round.blindtest_id, team_id): points
+                for team_id, points in grading.points.items()
+            }
+        ):
+            LeaderboardEntry.refresh_discipline(blindtest_round.blindtest_id)
+
+    return grading
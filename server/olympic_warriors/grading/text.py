@@ -0,0 +1,67 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+# Featured artists, and bracketed details such as "(Remastered 2011)" or "[Live]"
+FEATURING_PATTERN = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s.*$")
+BRACKETS_PATTERN = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+LEADING_ARTICLE_PATTERN = re.compile(r"^the\s+")
+
+DEFAULT_THRESHOLD = 0.85
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Normalize an answer so that accents, case, punctuation, featured artists and bracketed
+    details are not taken into account.
+
+    @param text: raw answer
+
+    @return: normalized answer, empty when there is nothing to compare
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = BRACKETS_PATTERN.sub(" ", text)
+    text = FEATURING_PATTERN.sub("", text)
+    text = text.replace("&", " and ")
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    text = " ".join(text.split())
+    return LEADING_ARTICLE_PATTERN.sub("", text)
+
+
+class AnswerIndex:
+    """
+    Accepted answers, normalized once, matched exactly first then by similarity.
+    """
+
+    def __init__(self, answers: list[str], threshold: float = DEFAULT_THRESHOLD):
+        self.answers = {answer for answer in map(normalize_answer, answers) if answer}
+        self.threshold = threshold
+
+    def __bool__(self) -> bool:
+        return bool(self.answers)
+
+    def matches(self, guess: str, normalized: bool = False) -> bool:
+        """
+        Check whether a guess matches an accepted answer.
+
+        @param guess: guess to check
+        @param normalized: whether the guess is already normalized
+        """
+        guess = guess if normalized else normalize_answer(guess)
+        if not guess:
+            return False
+        if guess in self.answers:
+            return True
+
+        for answer in self.answers:
+            matcher = SequenceMatcher(None, guess, answer, autojunk=False)
+            # Upper bounds first, to skip answers that cannot be similar enough
+            if (
+                matcher.real_quick_ratio() >= self.threshold
+                and matcher.quick_ratio() >= self.threshold
+                and matcher.ratio() >= self.threshold
+            ):
+                return True
+        return False
@@ -0,0 +1 @@
+from .broker import Broker, LocalBroker, Subscription, get_broker, publish_feed_entries
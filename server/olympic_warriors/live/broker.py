@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Messages kept for a slow client before its stream is closed, it then resumes from the feed
+SUBSCRIPTION_MAX_SIZE = 1000
+
+
+class Subscription:
+    """
+    Messages published on some channels, queued for a client on its event loop.
+    """
+
+    def __init__(self, channels: list[str], loop: asyncio.AbstractEventLoop):
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_MAX_SIZE)
+        self.overflowed = False
+
+    def put(self, message: dict) -> None:
+        """
+        Queue a message, must be called from the event loop of the subscription.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self) -> dict:
+        """
+        Wait for the next message.
+        """
+        return await self.queue.get()
+
+
+class Broker:
+    """
+    Publish/subscribe interface of the live channel, see LocalBroker.
+    """
+
+    def publish(self, channels: list[str], message: dict) -> None:
+        """
+        Publish a message on channels, from any thread.
+        """
+        raise NotImplementedError
+
+    def subscribe(self, channels: list[str]) -> Subscription:
+        """
+        Subscribe to channels, from a running event loop.
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Stop receiving messages of a subscription.
+        """
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """
+    In-process broker, only reaching clients connected to the same process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, channels: list[str], message: dict) -> None:
+        with self._lock:
+            subscriptions = {
+                subscription
+                for channel in channels
+                for subscription in self._subscriptions.get(channel, ())
+            }
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The event loop of the client is closed
+                self.unsubscribe(subscription)
+
+    def subscribe(self, channels: list[str]) -> Subscription:
+        subscription = Subscription(channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for channel in subscription.channels:
+                subscriptions = self._subscriptions.get(channel, set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._subscriptions.pop(channel, None)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Broker:
+    """
+    Get the broker of the process, set with the LIVE_BROKER setting.
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(
+                getattr(settings, "LIVE_BROKER", "olympic_warriors.live.broker.LocalBroker")
+            )()
+        return _broker
+
+
+def publish_feed_entries(entries: list) -> None:
+    """
+    Publish feed entries on their edition and discipline channels once committed.
+
+    @param entries: feed entries just numbered with their sequence
+    """
+    messages = [
+        (
+            [f"edition:{entry.edition_id}"]
+            + ([f"discipline:{entry.discipline_id}"] if entry.discipline_id else []),
+            {
+                "id": entry.id,
+                "sequence": entry.sequence,
+                "kind": entry.kind,
+                "object_id": entry.object_id,
+                "payload": entry.payload,
+            },
+        )
+        for entry in entries
+    ]
+
+    def publish():
+        broker = get_broker()
+        for channels, message in messages:
+            broker.publish(channels, message)
+
+    if messages:
+        transaction.on_commit(publish)
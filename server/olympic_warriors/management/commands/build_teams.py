@@ -0,0 +1,93 @@
+"""
+Splits the active players of an edition into balanced teams.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from olympic_warriors.models import Edition
+from olympic_warriors.teams import TeamBuildError, build_teams, rebalance_edition_teams
+from olympic_warriors.teams.balance import DEFAULT_ITERATIONS
+from olympic_warriors.teams.rebalance import DEFAULT_TOLERANCE
+
+
+class Command(BaseCommand):
+    """
+    Splits the active players of an edition into balanced teams.
+    """
+
+    help = (
+        "Splits the active players of an edition into its active teams, balancing their "
+        "strength overall and in each rating dimension while respecting team preferences."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("edition", type=int, help="id of the edition")
+        parser.add_argument(
+            "--iterations", type=int, default=DEFAULT_ITERATIONS,
+            help="number of iterations of the annealing",
+        )
+        parser.add_argument("--seed", type=int, help="seed of the random generator")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="report the balance without saving the teams"
+        )
+        parser.add_argument(
+            "--rebalance", action="store_true",
+            help="only restore the balance of the current teams, with as few changes as possible",
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+            help="spread of team strengths considered balanced when rebalancing",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            edition = Edition.objects.get(id=options["edition"])
+        except Edition.DoesNotExist:
+            raise CommandError(f"Edition {options['edition']} not found.")
+
+        start = time.monotonic()
+        if options["rebalance"]:
+            self.rebalance(edition, options, start)
+            return
+        try:
+            balance = build_teams(
+                edition,
+                iterations=options["iterations"],
+                seed=options["seed"],
+                commit=not options["dry_run"],
+            )
+        except TeamBuildError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Teams {'computed' if options['dry_run'] else 'built'} in "
+                f"{time.monotonic() - start:.2f}s: score {balance.score:.2f}, strength spread "
+                f"{balance.strength_spread:.2f}, {balance.broken_preferences} broken preferences"
+            )
+        )
+
+    def rebalance(self, edition, options, start):
+        """
+        Restore the balance of the current teams of an edition.
+        """
+        try:
+            rebalance, new_teams = rebalance_edition_teams(
+                edition, tolerance=options["tolerance"], commit=not options["dry_run"]
+            )
+        except TeamBuildError as e:
+            raise CommandError(str(e))
+
+        for player_id, team_id in new_teams.items():
+            self.stdout.write(f"Player {player_id} to team {team_id}")
+        message = (
+            f"{len(rebalance.moves)} moves and {len(rebalance.swaps)} swaps in "
+            f"{time.monotonic() - start:.2f}s: strength spread "
+            f"{rebalance.strength_spread_before:.2f} to {rebalance.strength_spread:.2f}, "
+            f"{rebalance.broken_preferences} broken preferences"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(message) if rebalance.is_balanced else self.style.WARNING(message)
+        )
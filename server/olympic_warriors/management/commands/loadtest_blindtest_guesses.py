@@ -0,0 +1,168 @@
+"""
+Fires concurrent guess submissions through the API on a temporary blindtest round and reports
+their latency.
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from olympic_warriors.models import Blindtest, BlindtestGuess, BlindtestRound, Player, Team
+
+
+class Command(BaseCommand):
+    """
+    Fires concurrent guess submissions through the API on a temporary blindtest round and reports
+    their latency.
+    """
+
+    help = (
+        "Submits guesses concurrently through the API, as their teams' players, on a temporary "
+        "open round of an inactive blindtest deleted afterwards, and fails if the p99 latency "
+        "exceeds the given budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("blindtest", type=int, help="id of the blindtest")
+        parser.add_argument(
+            "--submissions", type=int, default=100, help="number of submissions to fire"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=100, help="number of concurrent submitters"
+        )
+        parser.add_argument(
+            "--max-p99-ms", type=float, default=50, help="p99 latency budget in milliseconds"
+        )
+        parser.add_argument(
+            "--host", default="localhost", help="host of the requests, among the allowed hosts"
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="run on an active blindtest, whose players can see and guess the temporary round",
+        )
+
+    def handle(self, *args, **options):
+        if options["submissions"] < 1 or options["concurrency"] < 1:
+            raise CommandError("Submissions and concurrency must be positive.")
+        try:
+            blindtest = Blindtest.objects.get(id=options["blindtest"])
+        except Blindtest.DoesNotExist:
+            raise CommandError(f"Blindtest {options['blindtest']} not found.")
+        if blindtest.is_active and not options["force"]:
+            raise CommandError(
+                f"{blindtest} is active, its players would see the temporary round: "
+                "deactivate it or use --force."
+            )
+
+        team_ids = list(
+            Team.objects.filter(edition=blindtest.edition_id, is_active=True).values_list(
+                "id", flat=True
+            )
+        )
+        if not team_ids:
+            raise CommandError(f"{blindtest} has no active team.")
+
+        # Guesses of the real rounds are never touched, the round is deleted with its guesses
+        last_order = BlindtestRound.objects.filter(blindtest=blindtest).aggregate(
+            last_order=Max("order")
+        )["last_order"] or 0
+        blindtest_round = BlindtestRound.objects.create(
+            blindtest=blindtest, order=last_order + 1, is_open=True
+        )
+        try:
+            self.run(blindtest_round, team_ids, options)
+        finally:
+            blindtest_round.delete()
+
+    def run(self, blindtest_round, team_ids, options):
+        """
+        Fire the submissions on the temporary round and report their latency.
+        """
+        BlindtestGuess.objects.bulk_create(
+            [
+                BlindtestGuess(team_id=team_id, blindtest_round=blindtest_round)
+                for team_id in team_ids
+            ]
+        )
+        guesses = list(
+            BlindtestGuess.objects.filter(blindtest_round=blindtest_round).values_list(
+                "id", "team_id"
+            )
+        )
+
+        users = {
+            player.team_id: player.user
+            for player in Player.objects.filter(team__in=team_ids, is_active=True).select_related(
+                "user"
+            )
+        }
+        staff = User.objects.filter(is_staff=True).first()
+        if any(users.get(team_id, staff) is None for _, team_id in guesses):
+            raise CommandError("Some teams have no player and there is no staff user.")
+        tokens = {
+            user.id: Token.objects.get_or_create(user=user)[0].key
+            for user in {*users.values(), staff} if user is not None
+        }
+        submissions = [
+            (guess_id, tokens[users.get(team_id, staff).id])
+            for guess_id, team_id in (
+                guesses[i % len(guesses)] for i in range(options["submissions"])
+            )
+        ]
+
+        def submit(worker_submissions):
+            """
+            Submit guesses one after the other, timing only the requests.
+            """
+            client = APIClient(SERVER_NAME=options["host"])
+            # Each worker thread opens its own connection once, outside of the timings
+            connection.ensure_connection()
+            try:
+                results = []
+                for guess_id, token in worker_submissions:
+                    client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+                    start = time.perf_counter()
+                    response = client.patch(
+                        f"/blindtest/guess/{guess_id}/answer/",
+                        {"artist": "Load test", "song": "Load test"},
+                        format="json",
+                    )
+                    results.append(
+                        ((time.perf_counter() - start) * 1000, response.status_code == 200)
+                    )
+                return results
+            finally:
+                connection.close()
+
+        concurrency = min(options["concurrency"], len(submissions))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = [
+                result
+                for worker_results in executor.map(
+                    submit, [submissions[i::concurrency] for i in range(concurrency)]
+                )
+                for result in worker_results
+            ]
+
+        latencies = sorted(latency for latency, _ in results)
+        rejected = sum(1 for _, submitted in results if not submitted)
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100)
+        else:
+            percentiles = latencies * 99
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+
+        message = (
+            f"{len(results)} submissions, {rejected} rejected: "
+            f"p50 {p50:.1f}ms, p95 {p95:.1f}ms, p99 {p99:.1f}ms"
+        )
+        if p99 > options["max_p99_ms"]:
+            raise CommandError(f"{message}, over the {options['max_p99_ms']}ms budget")
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,42 @@
+"""
+Previews a schedule without writing to the database.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from olympic_warriors.models import Discipline
+from olympic_warriors.schedule import preview_schedule
+from olympic_warriors.serializer import SchedulePreviewSerializer
+
+
+class Command(BaseCommand):
+    """
+    Previews a round-robin schedule or the next Swiss round without writing to the database.
+    """
+
+    help = "Previews a round-robin schedule or the next Swiss round as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairing-system", choices=["RR", "SW"], help="pairing system")
+        parser.add_argument("--edition", type=int, help="id of the edition to schedule")
+        parser.add_argument("--discipline", type=int, help="id of the discipline to schedule")
+        parser.add_argument("--teams", type=int, help="number of placeholder teams to schedule")
+        parser.add_argument("--max-rounds", type=int, help="number of rounds to schedule")
+
+    def handle(self, *args, **options):
+        try:
+            preview = preview_schedule(
+                pairing_system=options["pairing_system"],
+                edition_id=options["edition"],
+                discipline_id=options["discipline"],
+                team_count=options["teams"],
+                max_rounds=options["max_rounds"],
+            )
+        except Discipline.DoesNotExist:
+            raise CommandError(f"Discipline {options['discipline']} not found.")
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(json.dumps(SchedulePreviewSerializer(preview).data, indent=2))
@@ -0,0 +1,29 @@
+"""
+Rebuilds the materialized leaderboard from team results.
+"""
+
+from django.core.management.base import BaseCommand
+
+from olympic_warriors.models import Edition, LeaderboardEntry
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the materialized leaderboard from team results.
+    """
+
+    help = "Rebuilds the leaderboard of every edition, or of a single one."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edition", type=int, help="id of the edition to rebuild")
+
+    def handle(self, *args, **options):
+        editions = Edition.objects.all()
+        if options["edition"]:
+            editions = editions.filter(id=options["edition"])
+
+        for edition in editions:
+            LeaderboardEntry.rebuild_edition(edition.id)
+            self.stdout.write(f"Rebuilt leaderboard for edition {edition}")
+
+        self.stdout.write(self.style.SUCCESS("Successfully rebuilt leaderboards"))
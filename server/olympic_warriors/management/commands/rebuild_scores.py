@@ -0,0 +1,64 @@
+"""
+Replays scores from game events, games and guesses, and reports or fixes differences.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from olympic_warriors.events import apply_replay, replay_disciplines
+from olympic_warriors.models import Discipline
+
+
+class Command(BaseCommand):
+    """
+    Replays scores from game events, games and guesses, and reports or fixes differences.
+    """
+
+    help = (
+        "Replays game scores from their events and team result points from games and "
+        "blindtest guesses, reporting the differences with stored values."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edition", type=int, help="id of the edition to replay")
+        parser.add_argument("--discipline", type=int, help="id of the discipline to replay")
+        parser.add_argument(
+            "--workers", type=int, default=1, help="number of processes replaying disciplines"
+        )
+        parser.add_argument(
+            "--fix", action="store_true", help="overwrite stored values with replayed ones"
+        )
+
+    def handle(self, *args, **options):
+        disciplines = Discipline.objects.filter(is_active=True).order_by("id")
+        if options["edition"]:
+            disciplines = disciplines.filter(edition=options["edition"])
+        if options["discipline"]:
+            disciplines = disciplines.filter(id=options["discipline"])
+        discipline_names = dict(disciplines.values_list("id", "name"))
+        if not discipline_names:
+            raise CommandError("No discipline to replay.")
+
+        start = time.monotonic()
+        replays = replay_disciplines(list(discipline_names), workers=options["workers"])
+
+        diff_count = 0
+        for replay in replays:
+            for diff in replay.diffs:
+                self.stdout.write(
+                    f"{discipline_names[replay.discipline_id]} ({replay.discipline_id}): "
+                    f"{diff.kind} {diff.id} stored {diff.stored}, replayed {diff.expected}"
+                )
+            diff_count += len(replay.diffs)
+            if options["fix"]:
+                apply_replay(replay)
+
+        elapsed = time.monotonic() - start
+        message = (
+            f"Replayed {len(replays)} disciplines in {elapsed:.2f}s, {diff_count} differences"
+        )
+        if options["fix"] and diff_count:
+            message += " fixed"
+        self.stdout.write(self.style.SUCCESS(message) if not diff_count or options["fix"]
+                          else self.style.WARNING(message))
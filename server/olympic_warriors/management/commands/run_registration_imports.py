@@ -0,0 +1,59 @@
+"""
+Runs the pending registration import jobs, polling for new ones.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from olympic_warriors.registration import (
+    claim_registration_import_job,
+    run_registration_import_job,
+)
+from olympic_warriors.registration.jobs import DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Runs the pending registration import jobs, polling for new ones.
+    """
+
+    help = (
+        "Runs the registration import jobs queued when registration forms are uploaded. "
+        "Several workers can run side by side, each job being claimed by a single one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="exit once no job is pending"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5, help="seconds between polls for new jobs"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help="number of rows imported per transaction",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                job = claim_registration_import_job()
+                if job is None:
+                    if options["once"]:
+                        return
+                    time.sleep(options["interval"])
+                    continue
+
+                self.stdout.write(f"Importing {job}")
+                job = run_registration_import_job(job, chunk_size=options["chunk_size"])
+                message = (
+                    f"{job.get_status_display()}: {job.processed_rows}/{job.total_rows or 0} rows, "
+                    f"{job.created_players} players created, {job.updated_players} updated, "
+                    f"{len(job.errors)} errors"
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(message) if not job.errors else self.style.WARNING(message)
+                )
+        except KeyboardInterrupt:
+            pass
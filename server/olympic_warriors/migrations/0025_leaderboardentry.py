@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0024_obstaclecourse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.IntegerField(default=0)),
+                ('ranking', models.IntegerField(default=0)),
+                ('breakdown', models.JSONField(blank=True, default=dict)),
+                ('edition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='olympic_warriors.edition')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='olympic_warriors.team')),
+            ],
+            options={
+                'verbose_name_plural': 'leaderboard entries',
+                'ordering': ['edition', 'ranking'],
+            },
+        ),
+    ]
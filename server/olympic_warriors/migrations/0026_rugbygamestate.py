@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0025_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rugbyevent',
+            name='points',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RugbyGameState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase_event_type', models.CharField(blank=True, choices=[('STA', 'Start'), ('END', 'End'), ('TRY', 'Try'), ('STL', 'Steal'), ('TKL', 'Tackle'), ('FOL', 'Foul'), ('OUT', 'Out')], max_length=3)),
+                ('tackles_against_team1', models.IntegerField(default=0)),
+                ('tackles_against_team2', models.IntegerField(default=0)),
+                ('last_event_time', models.DateTimeField(blank=True, null=True)),
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rugby_state', to='olympic_warriors.game')),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0026_rugbygamestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dodgeballevent',
+            name='ended_round',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='DodgeballGameState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round_number', models.IntegerField(default=0)),
+                ('live_players_team1', models.IntegerField(default=3)),
+                ('live_players_team2', models.IntegerField(default=3)),
+                ('is_round_over', models.BooleanField(default=False)),
+                ('last_event_time', models.DateTimeField(blank=True, null=True)),
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dodgeball_state', to='olympic_warriors.game')),
+            ],
+        ),
+    ]
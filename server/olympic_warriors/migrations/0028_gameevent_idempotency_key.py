@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0027_dodgeballgamestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameevent',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
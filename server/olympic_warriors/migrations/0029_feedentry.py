@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0028_gameevent_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('EVT', 'Game event'), ('GAM', 'Game'), ('RES', 'Discipline results')], max_length=3)),
+                ('object_id', models.IntegerField()),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('edition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed', to='olympic_warriors.edition')),
+            ],
+            options={
+                'verbose_name_plural': 'feed entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['edition', 'id'], name='olympic_war_edition_ec38c6_idx')],
+            },
+        ),
+    ]
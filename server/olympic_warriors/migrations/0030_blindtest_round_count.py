@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:37
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0029_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blindtest',
+            name='round_count',
+            field=models.IntegerField(default=10, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='blindtestround',
+            name='order',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0030_blindtest_round_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blindtestround',
+            name='artist',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='blindtestround',
+            name='artist_aliases',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='blindtestround',
+            name='song',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='blindtestround',
+            name='song_aliases',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0031_blindtestround_answer_key'),
+    ]
+
+    operations = [
+        # Existing rounds stay open to guesses, only new rounds start closed
+        migrations.AddField(
+            model_name='blindtestround',
+            name='is_open',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='blindtestround',
+            name='is_open',
+            field=models.BooleanField(default=False),
+        ),
+    ]
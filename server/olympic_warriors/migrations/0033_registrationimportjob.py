@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0032_blindtestround_is_open'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registration_form', models.FileField(upload_to='registration_forms/')),
+                ('status', models.CharField(choices=[('PEN', 'Pending'), ('RUN', 'Running'), ('DON', 'Done'), ('FAI', 'Failed')], default='PEN', max_length=3)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('processed_rows', models.IntegerField(default=0)),
+                ('created_users', models.IntegerField(default=0)),
+                ('created_players', models.IntegerField(default=0)),
+                ('created_ratings', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('edition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registration_imports', to='olympic_warriors.edition')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='olympic_war_status_4e6db6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0033_registrationimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='registration_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='registrationimportjob',
+            name='updated_players',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0034_player_registration_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='team_preferences',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='TeamPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('TOG', 'Together'), ('APA', 'Apart')], max_length=3)),
+                ('is_active', models.BooleanField(default=True)),
+                ('other_player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='olympic_warriors.player')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferences', to='olympic_warriors.player')),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def number_existing_entries(apps, schema_editor):
+    """
+    Number the existing entries in id order, keeping the cursors of clients valid.
+    """
+    FeedEntry = apps.get_model('olympic_warriors', 'FeedEntry')
+    FeedEntry.objects.update(sequence=F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0035_teampreference'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedentry',
+            name='olympic_war_edition_ec38c6_idx',
+        ),
+        migrations.AddField(
+            model_name='feedentry',
+            name='sequence',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(number_existing_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('edition', 'sequence'), name='unique_feed_entry_sequence'),
+        ),
+    ]
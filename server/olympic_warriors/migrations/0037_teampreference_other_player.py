@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olympic_warriors', '0036_feedentry_sequence'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='teampreference',
+            constraint=models.CheckConstraint(check=models.Q(('player', models.F('other_player')), _negated=True), name='team_preference_other_player'),
+        ),
+    ]
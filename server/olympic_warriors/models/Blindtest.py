@@ -2,10 +2,12 @@
 Models for Blindtest discipline
 """
 
-from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.core.validators import MinValueValidator
 
 from .Discipline import Discipline
+from .Leaderboard import LeaderboardEntry
 from .Team import Team, TeamResult
 from .ResultTypes import ResultTypes
 
@@ -15,9 +17,11 @@ class Blindtest(Discipline):
     Blindtest is a discipline that takes place in an edition of the Olympic Warriors.
     """
 
+    round_count = models.IntegerField(default=10, validators=[MinValueValidator(1)])
+
     def save(self, *args, **kwargs):
         """
-        Override save method to set discipline name to Blindtest
+        Override save method to set discipline name to Blindtest and provision rounds and guesses
         """
 
         # Check if the object is already in the database
@@ -25,14 +29,94 @@ class Blindtest(Discipline):
             self.name = 'Blindtest'
             self.result_type = ResultTypes.POINTS
             super().save(*args, **kwargs)
-            teams = Team.objects.filter(edition=self.edition, is_active=True)
-
-            for i in range(1, 11):
-                blindtest_round = BlindtestRound.objects.create(blindtest=self, order=i)
-                for team in teams:
-                    BlindtestGuess.objects.create(team=team, blindtest_round=blindtest_round)
+            self.provision()
         else:
+            old_round_count = (
+                Blindtest.objects.filter(pk=self.pk).values_list('round_count', flat=True).first()
+            )
             super().save(*args, **kwargs)
+            if old_round_count != self.round_count:
+                self.provision(old_round_count)
+
+    def provision(self, previous_round_count: int = None):
+        """
+        Create the missing rounds and the missing guesses of active teams, in bulk.
+
+        When the round count changed, the rounds between the previous and the new round
+        count are deactivated or reactivated. Other rounds are left as organizers set them.
+
+        @param previous_round_count: round count before it changed, None if it did not
+        """
+        with transaction.atomic():
+            if previous_round_count is not None and previous_round_count != self.round_count:
+                self._set_rounds_active(
+                    min(previous_round_count, self.round_count),
+                    max(previous_round_count, self.round_count),
+                    is_active=self.round_count > previous_round_count,
+                )
+
+            existing_orders = set(
+                BlindtestRound.objects.filter(blindtest=self).values_list('order', flat=True)
+            )
+            BlindtestRound.objects.bulk_create(
+                [
+                    BlindtestRound(blindtest=self, order=order)
+                    for order in range(1, self.round_count + 1)
+                    if order not in existing_orders
+                ]
+            )
+
+            round_ids = list(
+                BlindtestRound.objects.filter(blindtest=self, is_active=True).values_list(
+                    'id', flat=True
+                )
+            )
+            existing_guesses = set(
+                BlindtestGuess.objects.filter(blindtest_round__in=round_ids).values_list(
+                    'team_id', 'blindtest_round_id'
+                )
+            )
+            team_ids = list(
+                Team.objects.filter(edition=self.edition_id, is_active=True).values_list(
+                    'id', flat=True
+                )
+            )
+            # New guesses are empty, hence granting no points
+            BlindtestGuess.objects.bulk_create(
+                [
+                    BlindtestGuess(team_id=team_id, blindtest_round_id=round_id)
+                    for round_id in round_ids
+                    for team_id in team_ids
+                    if (team_id, round_id) not in existing_guesses
+                ]
+            )
+
+    def _set_rounds_active(self, after_order: int, until_order: int, is_active: bool):
+        """
+        Activate or deactivate the rounds ordered after after_order up to until_order.
+
+        Team results only count the points of active rounds, as replays do: the points of
+        deactivated rounds are removed and the points of reactivated rounds given back.
+        """
+        rounds = BlindtestRound.objects.filter(
+            blindtest=self, order__gt=after_order, order__lte=until_order, is_active=not is_active
+        )
+        sign = 1 if is_active else -1
+        deltas = {
+            (self.id, team_id): sign * (artists + songs)
+            for team_id, artists, songs in BlindtestGuess.objects.filter(
+                blindtest_round__in=rounds, is_active=True
+            )
+            .values("team_id")
+            .annotate(
+                artists=Count("id", filter=Q(is_artist_correct=True)),
+                songs=Count("id", filter=Q(is_song_correct=True)),
+            )
+            .values_list("team_id", "artists", "songs")
+        }
+        rounds.update(is_active=is_active)
+        if TeamResult.objects.add_points(deltas):
+            LeaderboardEntry.refresh_discipline(self.id)
 
 
 class BlindtestRound(models.Model):
@@ -41,8 +125,16 @@ class BlindtestRound(models.Model):
     """
 
     blindtest = models.ForeignKey(Blindtest, on_delete=models.CASCADE, related_name='blindtest')
-    order = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(10)])
+    order = models.IntegerField(validators=[MinValueValidator(1)])
     is_active = models.BooleanField(default=True)
+    # Guesses can only be submitted while the round is open
+    is_open = models.BooleanField(default=False)
+
+    # Answer key, aliases being other accepted answers
+    artist = models.CharField(max_length=255, blank=True, default='')
+    song = models.CharField(max_length=255, blank=True, default='')
+    artist_aliases = models.JSONField(default=list, blank=True)
+    song_aliases = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         """
@@ -75,9 +167,13 @@ class BlindtestGuess(models.Model):
 
     def _update_points(self, points):
         """
-        Update team result points
+        Update team result points, only counted for active rounds
         """
-        team_result = TeamResult.objects.get(team=self.team, discipline=self.blindtest)
+        if not self.blindtest_round.is_active:
+            return
+        team_result = TeamResult.objects.get(
+            team=self.team, discipline=self.blindtest_round.blindtest_id
+        )
         team_result.points += points
         team_result.save()
 
@@ -104,3 +200,81 @@ class BlindtestGuess(models.Model):
                 self._update_points(1)
 
         super().save(*args, **kwargs)
+
+    @classmethod
+    def _submittable(cls, user):
+        """
+        Guesses a user can submit: active guesses of open rounds, of the user's team
+        unless the user is staff.
+        """
+        guesses = cls.objects.filter(
+            is_active=True, blindtest_round__is_active=True, blindtest_round__is_open=True
+        )
+        if not user.is_staff:
+            guesses = guesses.filter(team__player__user=user, team__player__is_active=True)
+        return guesses
+
+    @classmethod
+    def submit(cls, guess_id: int, user, artist: str = None, song: str = None) -> bool:
+        """
+        Submit the answer of a guess with a single conditional UPDATE, without fetching it.
+        Correctness flags are left to grading, so points are not affected.
+
+        @param guess_id: id of the guess
+        @param user: user submitting the guess
+        @param artist: artist guessed, unchanged if None
+        @param song: song guessed, unchanged if None
+
+        @return: whether the guess was updated, see submission_error otherwise
+        """
+        values = {
+            field: value for field, value in (("artist", artist), ("song", song))
+            if value is not None
+        }
+        return bool(values) and cls._submittable(user).filter(id=guess_id).update(**values) > 0
+
+    @classmethod
+    def submit_many(cls, user, submissions: dict[int, dict]) -> list[int]:
+        """
+        Submit the answers of several guesses with a single conditional UPDATE.
+
+        @param user: user submitting the guesses
+        @param submissions: artist and/or song by guess id
+
+        @return: ids of the guesses that could not be updated
+        """
+        values = {}
+        for answer_field in ("artist", "song"):
+            whens = [
+                When(id=guess_id, then=Value(submission[answer_field]))
+                for guess_id, submission in submissions.items()
+                if submission.get(answer_field) is not None
+            ]
+            if whens:
+                values[answer_field] = Case(*whens, default=F(answer_field))
+
+        updated = cls._submittable(user).filter(id__in=submissions).update(**values)
+        if updated == len(submissions):
+            return []
+
+        # Slow path, only when some guesses were rejected
+        accepted_ids = set(
+            cls._submittable(user).filter(id__in=submissions).values_list("id", flat=True)
+        )
+        return sorted(set(submissions) - accepted_ids)
+
+    @classmethod
+    def submission_error(cls, guess_id: int, user) -> tuple[str, int]:
+        """
+        Explain why a guess could not be submitted, only called when a submission failed.
+
+        @return: error message and HTTP status
+        """
+        guess = cls.objects.filter(id=guess_id, is_active=True).select_related(
+            "blindtest_round"
+        ).first()
+        if guess is None:
+            return "Blindtest guess not found", 404
+        if not guess.blindtest_round.is_open or not guess.blindtest_round.is_active:
+            return "Blindtest round is closed", 409
+        return "Blindtest guess belongs to another team", 403
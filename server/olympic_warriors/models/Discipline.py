@@ -1,10 +1,13 @@
+from collections import Counter
 from datetime import datetime
 
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import FileExtensionValidator, MinValueValidator
 
 from olympic_warriors.schedule import schedule_round_robin_games, schedule_swiss_games
 from .Team import Team, TeamResult
+from .Leaderboard import LeaderboardEntry
+from .Feed import FeedEntry
 from .Edition import Edition
 from .Player import Player
 from .ResultTypes import ResultTypes
@@ -56,51 +59,102 @@ class Game(models.Model):
     def __str__(self) -> str:
         return self.discipline.name + ": " + self.team1.name + " vs " + self.team2.name
 
-    def _update_points(self, team1_points=None, team2_points=None):
+    @staticmethod
+    def result_points(score1: int, score2: int) -> tuple[int, int]:
         """
-        Update team results with the points of the game.
+        Get the points granted to both teams for a score: 3 for a win, 1 for a draw.
+
+        @return: points of team 1 and team 2
+        """
+        if score1 > score2:
+            return 3, 0
+        if score1 < score2:
+            return 0, 3
+        return 1, 1
+
+    def _update_points(self, team1_points: int, team2_points: int) -> None:
         """
-        team1_result = TeamResult.objects.get(team=self.team1, discipline=self.discipline)
-        team2_result = TeamResult.objects.get(team=self.team2, discipline=self.discipline)
-        team1_result.points += team1_points
-        team2_result.points += team2_points
-        team1_result.save()
-        team2_result.save()
+        Update team results with the points of the game, in a single atomic UPDATE.
+        """
+        if not team1_points and not team2_points:
+            return
+
+        TeamResult.objects.add_points(
+            {
+                (self.discipline_id, self.team1_id): team1_points,
+                (self.discipline_id, self.team2_id): team2_points,
+            }
+        )
+        LeaderboardEntry.refresh_discipline_on_commit(self.discipline_id)
 
     def save(self, *args, **kwargs):
         """
         Override save method to update team result if score is updated.
+
+        The game row is locked while comparing scores, so that concurrent updates of the
+        same game apply their deltas one after the other.
         """
-        if self.pk:
-            old_game = Game.objects.get(pk=self.pk)
-            score_changed = self.score1 != old_game.score1 or self.score2 != old_game.score2
-
-            if score_changed:
-                if self.score1 > self.score2:
-                    if old_game.score1 == old_game.score2:
-                        self._update_points(team1_points=+2, team2_points=-1)
-                    elif old_game.score1 < old_game.score2:
-                        self._update_points(team1_points=+3, team2_points=-3)
-                elif self.score1 < self.score2:
-                    if old_game.score1 == old_game.score2:
-                        self._update_points(team2_points=+2, team1_points=-1)
-                    elif old_game.score1 > old_game.score2:
-                        self._update_points(team2_points=+3, team1_points=-3)
-                else:  # self.score1 == self.score2
-                    if old_game.score1 > old_game.score2:
-                        self._update_points(team1_points=-2, team2_points=+1)
-                    elif old_game.score1 < old_game.score2:
-                        self._update_points(team2_points=-2, team1_points=+1)
+        team1_points, team2_points = self.result_points(self.score1, self.score2)
 
-        else:
-            if self.score1 > self.score2:
-                self._update_points(team1_points=+3, team2_points=0)
-            elif self.score1 < self.score2:
-                self._update_points(team2_points=+3, team1_points=0)
-            else:  # self.score1 == self.score2
-                self._update_points(team1_points=+1, team2_points=+1)
+        with transaction.atomic():
+            if self.pk:
+                old_scores = (
+                    Game.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("score1", "score2")
+                    .first()
+                )
+                if old_scores is not None:
+                    old_team1_points, old_team2_points = self.result_points(*old_scores)
+                    team1_points -= old_team1_points
+                    team2_points -= old_team2_points
+            else:
+                old_scores = None
 
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
+            if old_scores != (self.score1, self.score2):
+                FeedEntry.record_games([self])
+            self._update_points(team1_points, team2_points)
+
+    @classmethod
+    def submit_scores(cls, scores: dict[int, tuple[int, int]]) -> list["Game"]:
+        """
+        Set the scores of several games at once, typically a whole round.
+
+        Games are locked and updated in bulk, and the point deltas of all games are
+        aggregated by team to update team results with a single UPDATE.
+
+        @param scores: score 1 and score 2 by game id
+
+        @return: updated games
+        @raise Game.DoesNotExist: if a game is not found or inactive
+        """
+        with transaction.atomic():
+            games = list(
+                cls.objects.select_for_update().filter(id__in=scores, is_active=True).order_by("id")
+            )
+            missing_ids = set(scores) - {game.id for game in games}
+            if missing_ids:
+                raise cls.DoesNotExist(
+                    "Games not found: " + ", ".join(str(game_id) for game_id in sorted(missing_ids))
+                )
+
+            deltas = Counter()
+            for game in games:
+                old_team1_points, old_team2_points = cls.result_points(game.score1, game.score2)
+                game.score1, game.score2 = scores[game.id]
+                team1_points, team2_points = cls.result_points(game.score1, game.score2)
+                deltas[(game.discipline_id, game.team1_id)] += team1_points - old_team1_points
+                deltas[(game.discipline_id, game.team2_id)] += team2_points - old_team2_points
+
+            cls.objects.bulk_update(games, ["score1", "score2"])
+            FeedEntry.record_games(games)
+
+            if TeamResult.objects.add_points(deltas):
+                for discipline_id in {discipline_id for discipline_id, _ in deltas}:
+                    LeaderboardEntry.refresh_discipline_on_commit(discipline_id)
+
+        return games
 
 
 class Discipline(models.Model):
@@ -154,16 +208,21 @@ class Discipline(models.Model):
         """
         if self.pk is None:
             super().save(*args, **kwargs)
-            teams = Team.objects.filter(edition=self.edition, is_active=True)
-            for team in teams:
-                TeamResult.objects.get_or_create(
-                    team=team,
-                    discipline=self,
-                    defaults={
-                        "points": 0 if self.result_type == ResultTypes.POINTS else None,
-                        "time": "00:00:00" if self.result_type == ResultTypes.TIME else None,
-                    }
-                )
+            team_ids = Team.objects.filter(edition=self.edition, is_active=True).values_list(
+                "id", flat=True
+            )
+            TeamResult.objects.bulk_create(
+                [
+                    TeamResult(
+                        team_id=team_id,
+                        discipline=self,
+                        points=0 if self.result_type == ResultTypes.POINTS else None,
+                        time="00:00:00" if self.result_type == ResultTypes.TIME else None,
+                    )
+                    for team_id in team_ids
+                ]
+            )
+            LeaderboardEntry.refresh_discipline(self.id)
 
             match self.pairing_system:
                 case self.PairingSystem.ROUND_ROBIN:
@@ -197,6 +256,8 @@ class GameEvent(models.Model):
     )
     time = models.DateTimeField(default=datetime.now, blank=True)
     is_active = models.BooleanField(default=True)
+    # Generated by clients to send events again without duplicating them
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
 
     def __str__(self) -> str:
         return (
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from .Discipline import Discipline, Game, GameEvent
 from .Team import Team, TeamResult
@@ -41,68 +42,17 @@ class DodgeballEvent(GameEvent):
         NEW_ROUND = 'NEW', 'New Round'
 
     event_type = models.CharField(max_length=3, choices=DodgeballEventTypes.choices)
+    ended_round = models.BooleanField(default=False)
 
-    def is_hit_end_of_round(self) -> bool:
+    def scoring_team_id(self, game: Game) -> int:
         """
-        Check previous events to end the round and grant points
+        Get the id of the team winning the round if this event ends it
         """
-        live_players = 3
-        previous_events = DodgeballEvent.objects.filter(game=self.game, is_active=True).order_by(
-            '-time'
-        )
-        for event in previous_events:
-            if event.id == self.id:
-                continue
-
-            match event.event_type:
-                case self.DodgeballEventTypes.HIT:
-                    if self.player2.team.id == event.player2.team.id:
-                        live_players -= 1
-                case self.DodgeballEventTypes.CATCH:
-                    if live_players < 3 and self.player1.team.id == event.player2.team.id:
-                        live_players += 1
-                case self.DodgeballEventTypes.FOUL:
-                    if self.player2.team.id == event.player1.team.id:
-                        live_players -= 1
-                case self.DodgeballEventTypes.NEW_ROUND | self.DodgeballEventTypes.START:
-                    return False
-                case _:
-                    continue
-            if live_players == 0:
-                return True
-
-        return False
-
-    def is_foul_end_of_round(self) -> bool:
-        """
-        Check previous events to end the round and grant points
-        """
-        live_players = 3
-        previous_events = DodgeballEvent.objects.filter(game=self.game, is_active=True).order_by(
-            '-time'
-        )
-        for event in previous_events:
-            if event.id == self.id:
-                continue
-
-            match event.event_type:
-                case self.DodgeballEventTypes.HIT:
-                    if self.player1.team.id == event.player2.team.id:
-                        live_players -= 1
-                case self.DodgeballEventTypes.CATCH:
-                    if live_players < 3 and self.player1.team.id == event.player1.team.id:
-                        live_players += 1
-                case self.DodgeballEventTypes.FOUL:
-                    if self.player1.team.id == event.player1.team.id:
-                        live_players -= 1
-                case self.DodgeballEventTypes.NEW_ROUND | self.DodgeballEventTypes.START:
-                    return False
-                case _:
-                    continue
-            if live_players == 0:
-                return True
-
-        return False
+        if self.event_type == self.DodgeballEventTypes.FOUL:
+            if self.player1.team_id == game.team1_id:
+                return game.team2_id
+            return game.team1_id
+        return self.player1.team_id
 
     def _players_validation(self):
         """
@@ -122,11 +72,14 @@ class DodgeballEvent(GameEvent):
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to update score and raise alerts if needed.
+        Override the save method to update score and game state.
         """
         self._players_validation()
         self._discipline_validation()
 
+        if timezone.is_naive(self.time):
+            self.time = timezone.make_aware(self.time)
+
         created = self.pk is None
         removed = False
 
@@ -134,24 +87,160 @@ class DodgeballEvent(GameEvent):
             removed = DodgeballEvent.objects.get(pk=self.pk).is_active and not self.is_active
 
         # Check if the object is already in the database
-        if created or removed:
-            super().save(*args, **kwargs)
-            match self.event_type:
-                case self.DodgeballEventTypes.HIT:
-                    if self.is_hit_end_of_round():
-                        game = Game.objects.get(id=self.game.id)
-                        if game.team1.id == self.player1.team.id:
-                            game.score1 += 1
-                        else:
-                            game.score2 += 1
-                        game.save()
-                case self.DodgeballEventTypes.FOUL:
-                    if self.is_foul_end_of_round():
-                        game = Game.objects.get(id=self.game.id)
-                        if game.team1.id == self.player1.team.id:
-                            game.score2 += 1
-                        else:
-                            game.score1 += 1
-                        game.save()
-        else:
+        if not created and not removed:
             super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            state = DodgeballGameState.for_game(self.game_id, lock=True)
+            score_deltas = {}
+
+            if created and (state.last_event_time is None or self.time >= state.last_event_time):
+                self.ended_round = state.apply(
+                    self.event_type,
+                    self.player1.team_id,
+                    self.player2.team_id if self.player2 else None,
+                    self.time,
+                )
+                super().save(*args, **kwargs)
+                state.save()
+                if self.ended_round:
+                    score_deltas = {self.scoring_team_id(state.game): 1}
+            else:
+                # Late or removed events change the outcome of the following events
+                super().save(*args, **kwargs)
+                score_deltas = state.rebuild()
+
+            if any(score_deltas.values()):
+                game = Game.objects.get(id=self.game_id)
+                game.score1 += score_deltas.get(game.team1_id, 0)
+                game.score2 += score_deltas.get(game.team2_id, 0)
+                game.save()
+
+
+class DodgeballGameState(models.Model):
+    """
+    Live state of a Dodgeball game, updated as events are saved so that the end of a round
+    is detected without scanning the events of the game.
+    """
+
+    LIVE_PLAYERS = 3
+
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, related_name="dodgeball_state")
+    round_number = models.IntegerField(default=0)
+    live_players_team1 = models.IntegerField(default=LIVE_PLAYERS)
+    live_players_team2 = models.IntegerField(default=LIVE_PLAYERS)
+    is_round_over = models.BooleanField(default=False)
+    last_event_time = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.game} - Round {self.round_number}: "
+            f"{self.live_players_team1}/{self.live_players_team2} live players"
+        )
+
+    @classmethod
+    def for_game(cls, game_id: int, lock: bool = False) -> "DodgeballGameState":
+        """
+        Get the state of a game, building it from its events if it does not exist yet.
+
+        @param game_id: id of the game
+        @param lock: lock the state row until the end of the transaction
+        """
+        queryset = cls.objects.select_related("game")
+        if lock:
+            queryset = queryset.select_for_update()
+        state = queryset.filter(game_id=game_id).first()
+        if state is None:
+            state, created = cls.objects.get_or_create(game_id=game_id)
+            if created:
+                # Scores of existing events were already granted
+                state.rebuild()
+            if lock:
+                state = queryset.get(game_id=game_id)
+        return state
+
+    def _add_live_players(self, team_id: int, count: int) -> int:
+        """
+        Add live players to a team, up to the number of players of a round.
+
+        @return: live players left in the team
+        """
+        if team_id == self.game.team1_id:
+            self.live_players_team1 = min(self.LIVE_PLAYERS, self.live_players_team1 + count)
+            return self.live_players_team1
+        self.live_players_team2 = min(self.LIVE_PLAYERS, self.live_players_team2 + count)
+        return self.live_players_team2
+
+    def apply(self, event_type: str, team1_id: int, team2_id: int, time) -> bool:
+        """
+        Update the state with an event, in memory.
+
+        @param event_type: type of the event
+        @param team1_id: id of the team of the player 1 of the event
+        @param team2_id: id of the team of the player 2 of the event
+        @param time: time of the event
+
+        @return: whether the event ends the round
+        """
+        event_types = DodgeballEvent.DodgeballEventTypes
+        self.last_event_time = time if self.last_event_time is None else max(
+            self.last_event_time, time
+        )
+
+        if event_type in (event_types.START, event_types.NEW_ROUND):
+            self.round_number = 1 if event_type == event_types.START else self.round_number + 1
+            self.live_players_team1 = self.LIVE_PLAYERS
+            self.live_players_team2 = self.LIVE_PLAYERS
+            self.is_round_over = False
+            return False
+
+        if self.is_round_over:
+            return False
+
+        match event_type:
+            case event_types.HIT:
+                self.is_round_over = self._add_live_players(team2_id, -1) <= 0
+            case event_types.FOUL:
+                self.is_round_over = self._add_live_players(team1_id, -1) <= 0
+            case event_types.CATCH:
+                self._add_live_players(team1_id, 1)
+
+        return self.is_round_over
+
+    def rebuild(self) -> dict[int, int]:
+        """
+        Rebuild the state by replaying the events of the game, and mark the events ending
+        a round. Used when events are removed or received out of order.
+
+        @return: score changes by team id, for the rounds whose winning event changed
+        """
+        self.round_number = 0
+        self.live_players_team1 = self.LIVE_PLAYERS
+        self.live_players_team2 = self.LIVE_PLAYERS
+        self.is_round_over = False
+        self.last_event_time = None
+
+        score_deltas = {}
+        changed_events = []
+        events = (
+            DodgeballEvent.objects.filter(game_id=self.game_id)
+            .select_related("player1", "player2")
+            .order_by("time", "id")
+        )
+        for event in events:
+            ended_round = event.is_active and self.apply(
+                event.event_type,
+                event.player1.team_id,
+                event.player2.team_id if event.player2 else None,
+                event.time,
+            )
+            if ended_round != event.ended_round:
+                team_id = event.scoring_team_id(self.game)
+                score_deltas[team_id] = score_deltas.get(team_id, 0) + (1 if ended_round else -1)
+                event.ended_round = ended_round
+                changed_events.append(event)
+
+        DodgeballEvent.objects.bulk_update(changed_events, ["ended_round"])
+        self.save()
+        return score_deltas
@@ -1,11 +1,11 @@
 import pandas as pd
 
 from django.db import models
-from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.utils.crypto import get_random_string
+from olympic_warriors.ratings import global_ratings, weighted_ratings
+from olympic_warriors.registration import import_registrations, registration_errors
 
-from .Player import Player, PlayerRating
+from .RegistrationImport import RegistrationImportJob
 
 
 class Edition(models.Model):
@@ -59,6 +59,13 @@ class Edition(models.Model):
     def __str__(self) -> str:
         return f"{self.year} - {self.host}"
 
+    @property
+    def rating_coefficients(self) -> list[int]:
+        """
+        Coefficients of the rating dimensions, in the order of the ratings.
+        """
+        return [rating["coef"] for rating in self.ratings.values()]
+
     def process_weighted_rating(self, df):
         """
         Process weighted average rating for each player.
@@ -66,24 +73,10 @@ class Edition(models.Model):
         :param df: The DataFrame with the player data.
         :return: The DataFrame with the weighted rating.
         """
-        df["Weighted_Rating"] = df.apply(
-            lambda x: sum([x[rating] * self.ratings[rating]["coef"] for rating in self.ratings])
-            / sum([self.ratings[rating]["coef"] for rating in self.ratings]),
-            axis=1,
-        )
-
-        df["Weighted_Rating"] = df["Weighted_Rating"].apply(lambda x: 1 if x < 1 else x)
-        df["Weighted_Rating"] = df["Weighted_Rating"].apply(lambda x: 10 if x > 10 else x)
-
-        # multiply rating by 2.5 if rating is below 4 and global level estimation is above 5
-        df["Weighted_Rating"] = df.apply(
-            lambda x: (
-                x["Weighted_Rating"] * 2.5
-                if x["Weighted_Rating"] < 4
-                and int(x["Global Level Estimation for Olympic Warriors 2025"] > 4)
-                else x["Weighted_Rating"]
-            ),
-            axis=1,
+        df["Weighted_Rating"] = weighted_ratings(
+            df[list(self.ratings)].to_numpy(dtype=float),
+            self.rating_coefficients,
+            df["Global Level Estimation for Olympic Warriors 2025"].to_numpy(dtype=float),
         )
 
         return df
@@ -96,66 +89,57 @@ class Edition(models.Model):
         :param df: The DataFrame with the player data.
         :return: The DataFrame with the global rating.
         """
-        df["Global_Rating"] = df.apply(
-            lambda x: (
-                (x["Weighted_Rating"] +
-                 x["Global Level Estimation for Olympic Warriors 2025"] * 4)
-                / 5
-            ),
-            axis=1,
+        df["Global_Rating"] = global_ratings(
+            df["Weighted_Rating"].to_numpy(dtype=float),
+            df["Global Level Estimation for Olympic Warriors 2025"].to_numpy(dtype=float),
         )
-        df["Global_Rating"] = df["Global_Rating"].apply(lambda x: 1 if x < 1 else x)
-        df["Global_Rating"] = df["Global_Rating"].apply(lambda x: 10 if x > 10 else x)
-        df["Global_Rating"] = df["Global_Rating"].round(2)
 
         return df
 
-    def create_players_from_registration_form(self, registration_form):
+    def read_registration_form(self, registration_form):
         """
-        Create players from the registration form of the edition.
+        Read a registration form and rate its players.
 
         :param registration_form: The registration form of the edition.
+        :return: The DataFrame with the player data and ratings.
         """
-
         df = pd.read_csv(registration_form)
         df.rename(columns=self.header_mapping, inplace=True)
 
+        # Ratings that are not numbers become NaN, to be reported as invalid rows on import
+        rating_columns = [*self.ratings, "Global Level Estimation for Olympic Warriors 2025"]
+        df[rating_columns] = df[rating_columns].apply(pd.to_numeric, errors="coerce")
+
         df = self.process_weighted_rating(df)
         df = self.process_global_rating(df)
 
-        ## Create players from the registration form
-        for _, row in df.iterrows():
-            try:
-                user = User.objects.get(username=row["Name"].replace(" ", "").lower())
-            except User.DoesNotExist:
-                user = User.objects.create_user(
-                    username=row["Name"].replace(" ", "").lower(),
-                    first_name=row["Name"].split(" ")[0],
-                    last_name=row["Name"].split(" ")[1],
-                    password=get_random_string(length=8),
-                    email=f"{row['Name'].replace(' ', '').lower()}@olympicwarriors.com",
-                )
-
-            try:
-                player = Player.objects.get(user=user, edition=self)
-            except Player.DoesNotExist:
-                player = Player.objects.create(
-                    user=user,
-                    rating=row["Global_Rating"],
-                    edition=self,
-                )
-
-            for rating in self.ratings:
-                PlayerRating.objects.create(
-                    player=player,
-                    name=rating,
-                    identifier=self.ratings[rating]["id"],
-                    rating=row[rating],
-                )
+        return df
+
+    def create_players_from_registration_form(self, registration_form):
+        """
+        Create players from the registration form of the edition, skipping invalid rows.
+
+        :param registration_form: The registration form of the edition.
+        :return: The number of users, players and ratings created.
+        """
+        df = self.read_registration_form(registration_form)
+        return import_registrations(self, df.drop(index=list(registration_errors(self, df))))
+
+    def queue_registration_import(self, registration_form):
+        """
+        Queue the import of a registration form, run in the background by the
+        run_registration_imports worker.
+
+        :param registration_form: The registration form of the edition.
+        :return: The import job.
+        """
+        return RegistrationImportJob.objects.create(
+            edition=self, registration_form=registration_form.name
+        )
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to create players from the registration form of the edition.
+        Override the save method to queue the import of the registration form of the edition.
         """
         # Check if the object is already in the database
         if self.pk is not None:
@@ -163,12 +147,14 @@ class Edition(models.Model):
             original_obj = Edition.objects.get(pk=self.pk)
             # Compare registration from to see if it has been updated
             new_registration_form = getattr(self, "registration_form")
-            if new_registration_form != getattr(original_obj, "registration_form"):
+            if new_registration_form and new_registration_form != getattr(
+                original_obj, "registration_form"
+            ):
                 super().save(*args, **kwargs)
-                self.create_players_from_registration_form(new_registration_form)
+                self.queue_registration_import(new_registration_form)
         elif self.registration_form:
             super().save(*args, **kwargs)
-            self.create_players_from_registration_form(self.registration_form)
+            self.queue_registration_import(self.registration_form)
 
         # Call the original save method to save the object
         super().save(*args, **kwargs)
@@ -0,0 +1,196 @@
+"""
+Model for the append-only change feed polled by live clients.
+"""
+
+from django.db import models, transaction
+from django.db.models import Max
+from olympic_warriors.live import publish_feed_entries
+
+from .Edition import Edition
+from .Team import TeamResult
+
+
+class FeedEntry(models.Model):
+    """
+    A change of a game event, a game score or the results of a discipline.
+
+    Entries are only ever appended. Ids are taken when rows are inserted, so a transaction
+    committing late can add an entry with a lower id than entries already read by clients:
+    clients poll from the sequence instead, numbering entries of an edition in commit order.
+    """
+
+    class Kinds(models.TextChoices):
+        """
+        Enum for the kinds of changes
+        """
+
+        EVENT = 'EVT', 'Game event'
+        GAME = 'GAM', 'Game'
+        RESULTS = 'RES', 'Discipline results'
+
+    id = models.BigAutoField(primary_key=True)
+    edition = models.ForeignKey(Edition, on_delete=models.CASCADE, related_name="feed")
+    kind = models.CharField(max_length=3, choices=Kinds.choices)
+    object_id = models.IntegerField()
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the entry is committed, see sequence_entries
+    sequence = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["edition", "sequence"], name="unique_feed_entry_sequence"
+            )
+        ]
+        verbose_name_plural = "feed entries"
+
+    def __str__(self) -> str:
+        return f"{self.id}: {self.get_kind_display()} {self.object_id}"
+
+    @property
+    def discipline_id(self) -> int:
+        """
+        Id of the discipline the change belongs to.
+        """
+        if self.kind == self.Kinds.RESULTS:
+            return self.object_id
+        return self.payload.get("discipline")
+
+    @classmethod
+    def sequence_entries(cls, edition_ids) -> list:
+        """
+        Number the committed entries of editions that have no sequence yet, and publish them.
+
+        Each edition is locked while its entries are numbered, so that entries committed
+        later are always numbered after the entries numbered before, whatever their ids.
+        Entries left unnumbered by a process stopped right after committing are numbered
+        by the next call.
+
+        @param edition_ids: ids of the editions whose entries are numbered
+
+        @return: numbered entries
+        """
+        sequenced = []
+        for edition_id in sorted(set(edition_ids)):
+            with transaction.atomic():
+                list(Edition.objects.select_for_update().filter(id=edition_id).values("id"))
+                entries = list(
+                    cls.objects.filter(edition_id=edition_id, sequence__isnull=True).order_by("id")
+                )
+                if not entries:
+                    continue
+                last_sequence = cls.objects.filter(edition_id=edition_id).aggregate(
+                    last_sequence=Max("sequence")
+                )["last_sequence"] or 0
+                for sequence, entry in enumerate(entries, start=last_sequence + 1):
+                    entry.sequence = sequence
+                cls.objects.bulk_update(entries, ["sequence"])
+            sequenced += entries
+
+        publish_feed_entries(sequenced)
+        return sequenced
+
+    @classmethod
+    def sequence_on_commit(cls, entries: list) -> None:
+        """
+        Number and publish entries once the current transaction commits.
+
+        @param entries: entries just created
+        """
+        edition_ids = {entry.edition_id for entry in entries}
+        if edition_ids:
+            transaction.on_commit(lambda: cls.sequence_entries(edition_ids))
+
+    @staticmethod
+    def game_payload(game) -> dict:
+        """
+        Get the payload of a game change.
+        """
+        return {
+            "discipline": game.discipline_id,
+            "round": game.round_id,
+            "team1": game.team1_id,
+            "team2": game.team2_id,
+            "score1": game.score1,
+            "score2": game.score2,
+            "is_active": game.is_active,
+        }
+
+    @classmethod
+    def record_games(cls, games: list) -> None:
+        """
+        Append score changes of games, in one query.
+
+        @param games: games whose score changed
+        """
+        cls.sequence_on_commit(
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        edition_id=game.edition_id,
+                        kind=cls.Kinds.GAME,
+                        object_id=game.id,
+                        payload=cls.game_payload(game),
+                    )
+                    for game in games
+                ]
+            )
+        )
+
+    @classmethod
+    def record_event(cls, event) -> None:
+        """
+        Append a game event creation or removal.
+
+        @param event: game event, of any sport
+        """
+        entry = cls.objects.create(
+            edition_id=event.game.edition_id,
+            kind=cls.Kinds.EVENT,
+            object_id=event.id,
+            payload={
+                "discipline": event.game.discipline_id,
+                "game": event.game_id,
+                "player1": event.player1_id,
+                "player2": event.player2_id,
+                "time": event.time.isoformat() if event.time else None,
+                "event_type": getattr(event, "event_type", None),
+                "is_active": event.is_active,
+            },
+        )
+        cls.sequence_on_commit([entry])
+
+    @classmethod
+    def record_results(cls, discipline_id: int, edition_id: int) -> None:
+        """
+        Append the results of a discipline, with rankings, after they changed.
+
+        @param discipline_id: id of the discipline
+        @param edition_id: id of the edition of the discipline
+        """
+        results = [
+            {
+                "team": team_id,
+                "points": points,
+                "time": str(time) if time is not None else None,
+                "ranking": ranking,
+                "global_points": global_points,
+            }
+            for team_id, points, time, ranking, global_points in TeamResult.objects.filter(
+                discipline_id=discipline_id, is_active=True
+            )
+            .with_ranking()
+            .order_by("annotated_ranking", "team_id")
+            .values_list(
+                "team_id", "points", "time", "annotated_ranking", "annotated_global_points"
+            )
+        ]
+        entry = cls.objects.create(
+            edition_id=edition_id,
+            kind=cls.Kinds.RESULTS,
+            object_id=discipline_id,
+            payload={"results": results},
+        )
+        cls.sequence_on_commit([entry])
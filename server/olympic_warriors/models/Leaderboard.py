@@ -0,0 +1,168 @@
+"""
+Model for the materialized edition leaderboard.
+"""
+
+from django.db import models, transaction
+
+from .Edition import Edition
+from .Feed import FeedEntry
+from .Team import Team, TeamResult
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Precomputed standing of a team in its edition, kept up to date when team results change.
+
+    The breakdown maps each discipline id to the global points granted to the team in it.
+    """
+
+    edition = models.ForeignKey(Edition, on_delete=models.CASCADE, related_name="leaderboard")
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name="leaderboard_entry")
+    total_points = models.IntegerField(default=0)
+    ranking = models.IntegerField(default=0)
+    breakdown = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ["edition", "ranking"]
+        verbose_name_plural = "leaderboard entries"
+
+    def __str__(self) -> str:
+        return f"{self.team} - {self.ranking} ({self.total_points} pts)"
+
+    @staticmethod
+    def _global_points(**filters) -> list[tuple[int, int, int]]:
+        """
+        Compute the global points of every active team result matching the filters in one query.
+
+        @param filters: filters on team results, spanning whole disciplines
+
+        @return: list of (team id, discipline id, global points)
+        """
+        return list(
+            TeamResult.objects.filter(is_active=True, **filters)
+            .with_ranking()
+            .values_list("team_id", "discipline_id", "annotated_global_points")
+        )
+
+    @classmethod
+    def _save_edition_entries(cls, edition_id: int, entries: list) -> None:
+        """
+        Recompute totals and rankings of the edition entries and persist them in bulk.
+
+        @param edition_id: id of the edition the entries belong to
+        @param entries: every leaderboard entry of the edition
+        """
+        active_team_ids = set(
+            Team.objects.filter(edition_id=edition_id, is_active=True).values_list("id", flat=True)
+        )
+        for entry in entries:
+            entry.total_points = sum(entry.breakdown.values())
+        active_totals = [
+            entry.total_points for entry in entries if entry.team_id in active_team_ids
+        ]
+        for entry in entries:
+            entry.ranking = sum(1 for total in active_totals if total > entry.total_points) + 1
+
+        cls.objects.bulk_update(entries, ["total_points", "ranking", "breakdown"])
+
+    @classmethod
+    def _get_edition_entries(cls, edition_id: int, create_missing: bool = True) -> list:
+        """
+        Get the leaderboard entries of an edition, creating the missing ones.
+
+        @param edition_id: id of the edition
+        @param create_missing: whether to create entries for teams that have none yet
+
+        @return: leaderboard entries of every team of the edition
+        """
+        entries = list(cls.objects.select_for_update().filter(edition_id=edition_id))
+        if not create_missing:
+            return entries
+
+        known_team_ids = {entry.team_id for entry in entries}
+        missing_entries = [
+            cls(edition_id=edition_id, team_id=team_id)
+            for team_id in Team.objects.filter(edition_id=edition_id)
+            .exclude(id__in=known_team_ids)
+            .values_list("id", flat=True)
+        ]
+        if missing_entries:
+            cls.objects.bulk_create(missing_entries)
+            entries = list(cls.objects.select_for_update().filter(edition_id=edition_id))
+
+        return entries
+
+    @classmethod
+    def refresh_discipline(cls, discipline_id: int, create_missing: bool = True) -> None:
+        """
+        Update the leaderboard of an edition after results of one of its disciplines changed.
+
+        Only the breakdown of the given discipline is recomputed, other disciplines are kept.
+
+        @param discipline_id: id of the discipline whose results changed
+        @param create_missing: whether to create entries for teams that have none yet,
+            disabled while deleting as the teams may be deleted in the same cascade
+        """
+        edition_id = (
+            Edition.objects.filter(discipline=discipline_id).values_list("id", flat=True).first()
+        )
+        if edition_id is None:
+            return
+
+        key = str(discipline_id)
+        with transaction.atomic():
+            entries = cls._get_edition_entries(edition_id, create_missing)
+            # Read once the entries are locked, so that a refresh never writes points older
+            # than the ones written by the previous refresh
+            global_points = {
+                team_id: points
+                for team_id, _, points in cls._global_points(discipline_id=discipline_id)
+            }
+            for entry in entries:
+                if entry.team_id in global_points:
+                    entry.breakdown[key] = global_points[entry.team_id]
+                else:
+                    entry.breakdown.pop(key, None)
+            cls._save_edition_entries(edition_id, entries)
+            if create_missing:
+                FeedEntry.record_results(discipline_id, edition_id)
+
+    @classmethod
+    def refresh_discipline_on_commit(cls, discipline_id: int) -> None:
+        """
+        Refresh the leaderboard once the current transaction commits.
+
+        Refreshing locks every entry of the edition, so frequent writes such as game scores
+        defer it to keep concurrent writes of other disciplines from waiting on each other.
+
+        @param discipline_id: id of the discipline whose results changed
+        """
+        transaction.on_commit(lambda: cls.refresh_discipline(discipline_id))
+
+    @classmethod
+    def refresh_edition(cls, edition_id: int) -> None:
+        """
+        Recompute totals and rankings of an edition without touching the breakdowns,
+        e.g. when a team is activated or deactivated.
+
+        @param edition_id: id of the edition
+        """
+        with transaction.atomic():
+            cls._save_edition_entries(edition_id, cls._get_edition_entries(edition_id))
+
+    @classmethod
+    def rebuild_edition(cls, edition_id: int) -> None:
+        """
+        Rebuild the whole leaderboard of an edition from its team results.
+
+        @param edition_id: id of the edition
+        """
+        breakdowns: dict[int, dict] = {}
+        for team_id, discipline_id, points in cls._global_points(discipline__edition=edition_id):
+            breakdowns.setdefault(team_id, {})[str(discipline_id)] = points
+
+        with transaction.atomic():
+            entries = cls._get_edition_entries(edition_id)
+            for entry in entries:
+                entry.breakdown = breakdowns.get(entry.team_id, {})
+            cls._save_edition_entries(edition_id, entries)
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import F, Q
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -12,6 +14,10 @@ class Player(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(10)])
     team = models.ForeignKey("Team", on_delete=models.CASCADE, null=True, blank=True)
+    # Hash of the registration row the player was imported from, to skip unchanged rows
+    registration_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+    # Wishes of the player about their teammates, as written in the registration form
+    team_preferences = models.TextField(blank=True, default="")
     is_active = models.BooleanField(default=True)
 
     def __str__(self) -> str:
@@ -28,3 +34,43 @@ class PlayerRating(models.Model):
     identifier = models.CharField(max_length=4)
     rating = models.FloatField(validators=[MinValueValidator(1), MaxValueValidator(10)])
     is_active = models.BooleanField(default=True)
+
+
+class TeamPreference(models.Model):
+    """
+    A wish of a player to be, or not to be, in the same team as another player,
+    taken into account when building balanced teams.
+    """
+
+    class Kinds(models.TextChoices):
+        """
+        Enum for the kinds of preferences
+        """
+
+        TOGETHER = 'TOG', 'Together'
+        APART = 'APA', 'Apart'
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="preferences")
+    other_player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=3, choices=Kinds.choices)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=~Q(player=F("other_player")), name="team_preference_other_player"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.player} - {self.get_kind_display()} - {self.other_player}"
+
+    def clean(self):
+        """
+        Check that both players take part in the same edition.
+        """
+        if (
+            self.player_id and self.other_player_id
+            and self.player.edition_id != self.other_player.edition_id
+        ):
+            raise ValidationError("Both players must take part in the same edition")
@@ -0,0 +1,58 @@
+"""
+Model for the background import jobs of registration forms.
+"""
+
+from django.db import models
+
+
+class RegistrationImportJob(models.Model):
+    """
+    Import of a registration form, run in chunks by the run_registration_imports worker.
+
+    Errors are a list of {"line": CSV line number, "error": message}, the rows in error
+    being skipped.
+    """
+
+    class Statuses(models.TextChoices):
+        """
+        Enum for the statuses of an import job
+        """
+
+        PENDING = 'PEN', 'Pending'
+        RUNNING = 'RUN', 'Running'
+        DONE = 'DON', 'Done'
+        FAILED = 'FAI', 'Failed'
+
+    edition = models.ForeignKey(
+        "Edition", on_delete=models.CASCADE, related_name="registration_imports"
+    )
+    registration_form = models.FileField(upload_to="registration_forms/")
+    status = models.CharField(max_length=3, choices=Statuses.choices, default=Statuses.PENDING)
+    total_rows = models.IntegerField(null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    created_users = models.IntegerField(default=0)
+    created_players = models.IntegerField(default=0)
+    created_ratings = models.IntegerField(default=0)
+    updated_players = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [models.Index(fields=["status", "id"])]
+
+    def __str__(self) -> str:
+        return f"{self.edition} - {self.registration_form.name} ({self.get_status_display()})"
+
+    @property
+    def progress(self) -> float:
+        """
+        Share of the rows processed, between 0 and 1.
+        """
+        if self.status == self.Statuses.DONE:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return self.processed_rows / self.total_rows
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from .Discipline import Discipline, Game, GameEvent
 from .ResultTypes import ResultTypes
@@ -41,38 +42,17 @@ class RugbyEvent(GameEvent):
         OUT = 'OUT', 'Out'
 
     event_type = models.CharField(max_length=3, choices=RugbyEventTypes.choices)
+    points = models.IntegerField(null=True, blank=True)
 
-    def process_try_points(self) -> int:
+    def process_try_points(self, state: "RugbyGameState" = None) -> int:
         """
-        Check previous events to grant the right number of points for a try according to tackles
+        Get the number of points to grant for a try according to tackles, from the game state
         """
-        points = 3
-        previous_events = RugbyEvent.objects.filter(game=self.game, is_active=True).order_by(
-            '-time'
-        )
-        for event in previous_events:
-            if event.id == self.id:
-                continue
-
-            match event.event_type:
-                case (
-                    self.RugbyEventTypes.TRY
-                    | self.RugbyEventTypes.OUT
-                    | self.RugbyEventTypes.START
-                    | self.RugbyEventTypes.STEAL
-                ):
-                    return points
-                case self.RugbyEventTypes.TACKLE:
-                    if self.player1.team == event.player1.team:
-                        return points
-                    points -= 1
-                case self.RugbyEventTypes.FOUL:
-                    if self.player1.team == event.player1.team:
-                        return points
-                case _:
-                    continue
-
-        return points
+        state = state or RugbyGameState.for_game(self.game_id)
+        if state.last_event_time is not None and self.time < state.last_event_time:
+            # Late event, replay the events that happened before it
+            state.rebuild(before=self)
+        return state.try_points(self.player1.team_id)
 
     def _players_validation(self):
         """
@@ -92,11 +72,14 @@ class RugbyEvent(GameEvent):
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to update score and raise alerts if needed.
+        Override the save method to update score and game state.
         """
         self._players_validation()
         self._discipline_validation()
 
+        if timezone.is_naive(self.time):
+            self.time = timezone.make_aware(self.time)
+
         created = self.pk is None
         removed = False
 
@@ -104,21 +87,147 @@ class RugbyEvent(GameEvent):
             removed = RugbyEvent.objects.get(pk=self.pk).is_active and not self.is_active
 
         # Check if the object is already in the database
-        if created or removed:
+        if not created and not removed:
             super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            state = RugbyGameState.for_game(self.game_id, lock=True)
+            points = 0
+
+            if created:
+                in_order = state.last_event_time is None or self.time >= state.last_event_time
+                if self.event_type == self.RugbyEventTypes.TRY:
+                    self.points = self.process_try_points(state)
+                    points = self.points
+                super().save(*args, **kwargs)
+
+                if in_order:
+                    state.apply(self.event_type, self.player1.team_id, self.time)
+                    state.save()
+                else:
+                    state.rebuild()
+            else:
+                if self.event_type == self.RugbyEventTypes.TRY:
+                    if self.points is None:
+                        # Try recorded before points were stored with events
+                        self.points = self.process_try_points(state)
+                    points = -self.points
+                super().save(*args, **kwargs)
+                state.rebuild()
+
+            if points:
+                game = Game.objects.get(id=self.game_id)
+                if game.team1_id == self.player1.team_id:
+                    game.score1 += points
+                else:
+                    game.score2 += points
+                game.save()
+
+
+class RugbyGameState(models.Model):
+    """
+    Live state of a Rugby game, updated as events are saved so that try points are
+    computed without scanning the events of the game.
 
-            match self.event_type:
-                case self.RugbyEventTypes.TRY:
-                    points = self.process_try_points()
+    Tackles against a team are the tackles made by the other team since the current phase
+    started, or since the team last tackled or fouled.
+    """
 
-                    if removed:
-                        points = -points
+    PHASE_EVENT_TYPES = [
+        RugbyEvent.RugbyEventTypes.START,
+        RugbyEvent.RugbyEventTypes.TRY,
+        RugbyEvent.RugbyEventTypes.STEAL,
+        RugbyEvent.RugbyEventTypes.OUT,
+    ]
+
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, related_name="rugby_state")
+    phase_event_type = models.CharField(
+        max_length=3, choices=RugbyEvent.RugbyEventTypes.choices, blank=True
+    )
+    tackles_against_team1 = models.IntegerField(default=0)
+    tackles_against_team2 = models.IntegerField(default=0)
+    last_event_time = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.game} - {self.tackles_against_team1}/{self.tackles_against_team2} tackles"
+
+    @classmethod
+    def for_game(cls, game_id: int, lock: bool = False) -> "RugbyGameState":
+        """
+        Get the state of a game, building it from its events if it does not exist yet.
 
-                    game = Game.objects.get(id=self.game.id)
-                    if game.team1.id == self.player1.team.id:
-                        game.score1 += points
-                    else:
-                        game.score2 += points
-                    game.save()
-        else:
-            super().save(*args, **kwargs)
+        @param game_id: id of the game
+        @param lock: lock the state row until the end of the transaction
+        """
+        queryset = cls.objects.select_related("game")
+        if lock:
+            queryset = queryset.select_for_update()
+        state = queryset.filter(game_id=game_id).first()
+        if state is None:
+            state, created = cls.objects.get_or_create(game_id=game_id)
+            if created:
+                state.rebuild()
+            if lock:
+                state = queryset.get(game_id=game_id)
+        return state
+
+    def try_points(self, team_id: int) -> int:
+        """
+        Get the number of points a try of the team is worth in the current state.
+        """
+        if team_id == self.game.team1_id:
+            return 3 - self.tackles_against_team1
+        return 3 - self.tackles_against_team2
+
+    def apply(self, event_type: str, team_id: int, time) -> None:
+        """
+        Update the state with an event, in memory.
+
+        @param event_type: type of the event
+        @param team_id: id of the team of the player 1 of the event
+        @param time: time of the event
+        """
+        self.last_event_time = time if self.last_event_time is None else max(
+            self.last_event_time, time
+        )
+
+        if event_type in self.PHASE_EVENT_TYPES:
+            self.phase_event_type = event_type
+            self.tackles_against_team1 = 0
+            self.tackles_against_team2 = 0
+        elif event_type == RugbyEvent.RugbyEventTypes.TACKLE:
+            if team_id == self.game.team1_id:
+                self.tackles_against_team1 = 0
+                self.tackles_against_team2 += 1
+            else:
+                self.tackles_against_team2 = 0
+                self.tackles_against_team1 += 1
+        elif event_type == RugbyEvent.RugbyEventTypes.FOUL:
+            if team_id == self.game.team1_id:
+                self.tackles_against_team1 = 0
+            else:
+                self.tackles_against_team2 = 0
+
+    def rebuild(self, before: RugbyEvent = None) -> None:
+        """
+        Rebuild the state by replaying the active events of the game.
+        Used when events are removed or received out of order.
+
+        @param before: only replay events that happened before this event, without saving
+        """
+        self.phase_event_type = ""
+        self.tackles_against_team1 = 0
+        self.tackles_against_team2 = 0
+        self.last_event_time = None
+
+        events = RugbyEvent.objects.filter(game_id=self.game_id, is_active=True)
+        if before is not None:
+            events = events.filter(time__lt=before.time)
+        for event_type, team_id, time in events.order_by("time", "id").values_list(
+            "event_type", "player1__team_id", "time"
+        ):
+            self.apply(event_type, team_id, time)
+
+        if before is None:
+            self.save()
@@ -1,8 +1,134 @@
+import operator
+from functools import reduce
+
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models import Case, Count, F, IntegerField, Min, Q, Value, When, Window
+from django.db.models.functions import Rank
+from django.db.models.lookups import Exact, LessThanOrEqual
 from .Edition import Edition
 from .ResultTypes import ResultTypes
 
 
+def compute_global_points(ranking: int, registered_teams_count: int) -> int:
+    """
+    Convert a ranking in a discipline into global points for the edition ranking.
+
+    @param ranking: ranking of the team in the discipline
+    @param registered_teams_count: number of active teams registered to the discipline
+
+    @return: global points granted for the ranking
+    """
+    points = registered_teams_count - ranking + 1
+    if ranking == 1:
+        points += 2
+    elif ranking <= 3:
+        points += 1
+
+    return points
+
+
+class TeamResultQuerySet(models.QuerySet):
+    """
+    QuerySet for team results, able to rank whole disciplines in a single query.
+    """
+
+    def with_ranking(self):
+        """
+        Annotate each team result with its ranking and global points in its discipline.
+
+        Rankings are computed with a window function over the rows of the queryset, so it must
+        contain every active team result of the disciplines it spans.
+
+        @return: queryset annotated with annotated_ranking and annotated_global_points
+        """
+        ranked_types = [ResultTypes.POINTS, ResultTypes.TIME]
+        rank = Window(
+            expression=Rank(),
+            partition_by=[F("discipline")],
+            order_by=[
+                Case(
+                    When(discipline__result_type=ResultTypes.POINTS, then=F("points"))
+                ).desc(nulls_last=True),
+                Case(
+                    When(discipline__result_type=ResultTypes.TIME, then=F("time"))
+                ).asc(nulls_last=True),
+            ],
+        )
+        registered_teams_count = Window(expression=Count("id"), partition_by=[F("discipline")])
+
+        return self.annotate(
+            annotated_ranking=Case(
+                When(discipline__reveal_score=False, then=Value(0)),
+                When(discipline__result_type__in=ranked_types, then=rank),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            annotated_global_points=Case(
+                When(discipline__reveal_score=False, then=Value(0)),
+                When(
+                    discipline__result_type__in=ranked_types,
+                    then=registered_teams_count - rank + 1 + Case(
+                        When(Exact(rank, 1), then=Value(2)),
+                        When(LessThanOrEqual(rank, 3), then=Value(1)),
+                        default=Value(0),
+                    ),
+                ),
+                default=registered_teams_count + 2,
+                output_field=IntegerField(),
+            ),
+        )
+
+    def get_ranked(self, result_id: int) -> "TeamResult":
+        """
+        Get an active team result annotated with its ranking and global points in its
+        discipline, ranking the whole discipline in a subquery.
+
+        @param result_id: id of the team result
+
+        @return: team result annotated like with_ranking
+        @raise TeamResult.DoesNotExist: if the team result is not found or inactive
+        """
+        return (
+            self.filter(discipline__registered_to=result_id, is_active=True)
+            .with_ranking()
+            # Filters on windows are applied in an outer query, once the discipline is ranked
+            .annotate(ranked_id=Window(expression=Min("id"), partition_by=[F("id")]))
+            .get(ranked_id=result_id)
+        )
+
+    def add_points(self, deltas: dict[tuple[int, int], int]) -> int:
+        """
+        Add points to team results with a single UPDATE, without race conditions.
+        Signals are not sent, refreshing the leaderboard is up to the caller.
+
+        @param deltas: points to add by (discipline id, team id)
+
+        @return: number of updated team results
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+
+        return self.filter(
+            reduce(
+                operator.or_,
+                (
+                    Q(discipline_id=discipline_id, team_id=team_id)
+                    for discipline_id, team_id in deltas
+                ),
+            )
+        ).update(
+            points=Case(
+                *[
+                    When(discipline_id=discipline_id, team_id=team_id, then=F("points") + delta)
+                    for (discipline_id, team_id), delta in deltas.items()
+                ],
+                default=F("points"),
+            )
+        )
+
+
 class TeamResult(models.Model):
     """
     Team's score for an Discipline.
@@ -16,6 +142,8 @@ class TeamResult(models.Model):
     time = models.TimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
+    objects = TeamResultQuerySet.as_manager()
+
     def __str__(self) -> str:
         return (
             self.team.name + " - " + self.discipline.name + ' ' + str(self.discipline.edition.year)
@@ -35,6 +163,9 @@ class TeamResult(models.Model):
 
         @return: ranking of the team in the discipline
         """
+        if hasattr(self, "annotated_ranking"):
+            return self.annotated_ranking
+
         if self.discipline.reveal_score is False:
             return 0
 
@@ -62,19 +193,17 @@ class TeamResult(models.Model):
 
         @return: points of the team from ranking
         """
+        if hasattr(self, "annotated_global_points"):
+            return self.annotated_global_points
+
         if self.discipline.reveal_score is False:
             return 0
 
         registered_teams_count = TeamResult.objects.filter(
             discipline=self.discipline, is_active=True
         ).count()
-        points = registered_teams_count - self.ranking + 1
-        if self.ranking == 1:
-            points += 2
-        elif self.ranking <= 3:
-            points += 1
 
-        return points
+        return compute_global_points(self.ranking, registered_teams_count)
 
 
 class Team(models.Model):
@@ -95,7 +224,28 @@ class Team(models.Model):
     @property
     def total_points(self) -> int:
         """
-        Get the total global points of the team
+        Get the total global points of the team, read from the leaderboard when available.
+        """
+        try:
+            return self.leaderboard_entry.total_points
+        except ObjectDoesNotExist:
+            return self.compute_total_points()
+
+    @property
+    def ranking(self) -> int:
+        """
+        Get the ranking of the team in the edition, read from the leaderboard when available.
+
+        @return: ranking of the team in the edition
+        """
+        try:
+            return self.leaderboard_entry.ranking
+        except ObjectDoesNotExist:
+            return self.compute_ranking()
+
+    def compute_total_points(self) -> int:
+        """
+        Compute the total global points of the team from its team results.
         """
         points = 0
         team_results = TeamResult.objects.filter(
@@ -107,17 +257,17 @@ class Team(models.Model):
 
         return points
 
-    @property
-    def ranking(self) -> int:
+    def compute_ranking(self) -> int:
         """
-        Get the ranking of the team in the edition.
+        Compute the ranking of the team in the edition from the team results.
 
         @return: ranking of the team in the edition
         """
         ranking = 1
+        total_points = self.compute_total_points()
         teams = Team.objects.filter(edition=self.edition, is_active=True)
         for team in teams:
-            if team.total_points > self.total_points:
+            if team.compute_total_points() > total_points:
                 ranking += 1
 
         return ranking
@@ -1,13 +1,14 @@
-from .Player import Player, PlayerRating
+from .Player import Player, PlayerRating, TeamPreference
 from .Team import Team, TeamResult
 from .Edition import Edition
+from .RegistrationImport import RegistrationImportJob
 from .Discipline import Game, GameEvent, Discipline, TeamSportRound
 from .Blindtest import Blindtest, BlindtestRound, BlindtestGuess
 from .Crossfit import Crossfit
-from .Dodgeball import Dodgeball, DodgeballEvent
+from .Dodgeball import Dodgeball, DodgeballEvent, DodgeballGameState
 from .HideAndSeek import HideAndSeek
 from .Orienteering import Orienteering
-from .Rugby import Rugby, RugbyEvent
+from .Rugby import Rugby, RugbyEvent, RugbyGameState
 from .Petanque import Petanque
 from .Basketball import Basketball
 from .GeographyQuizz import GeographyQuizz
@@ -15,3 +16,5 @@ from .Relay import Relay
 from .Fair import Fair
 from .ObstacleCourse import ObstacleCourse
 from .ResultTypes import ResultTypes
+from .Leaderboard import LeaderboardEntry
+from .Feed import FeedEntry
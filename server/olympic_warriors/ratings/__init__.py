@@ -0,0 +1 @@
+from .pipeline import global_ratings, score_players, weighted_ratings
@@ -0,0 +1,66 @@
+import numpy as np
+
+MIN_RATING, MAX_RATING = 1, 10
+
+# Players rating themselves low on every dimension while confident overall are boosted
+LOW_RATING = 4
+CONFIDENT_LEVEL = 4
+LOW_RATING_BOOST = 2.5
+
+# Weight of the global level estimation against the weighted rating in the global rating
+GLOBAL_LEVEL_WEIGHT = 4
+
+
+def weighted_ratings(ratings, coefficients, global_levels=None) -> np.ndarray:
+    """
+    Compute the weighted rating of each player from a player × dimension rating matrix.
+
+    Ratings are averaged with the coefficients of the dimensions and clipped between 1 and 10.
+    With global levels, low ratings of confident players are boosted.
+
+    @param ratings: rating of each player (rows) for each dimension (columns)
+    @param coefficients: coefficient of each dimension
+    @param global_levels: global level estimation of each player
+
+    @return: weighted rating of each player
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    weighted = np.asarray(ratings, dtype=float) @ (coefficients / coefficients.sum())
+    weighted = np.clip(weighted, MIN_RATING, MAX_RATING)
+
+    if global_levels is not None:
+        boosted = (weighted < LOW_RATING) & (np.asarray(global_levels) > CONFIDENT_LEVEL)
+        weighted = np.where(boosted, weighted * LOW_RATING_BOOST, weighted)
+
+    return weighted
+
+
+def global_ratings(weighted, global_levels) -> np.ndarray:
+    """
+    Compute the global rating of each player from their weighted rating and global level
+    estimation, clipped between 1 and 10 and rounded to 2 decimals.
+
+    @param weighted: weighted rating of each player
+    @param global_levels: global level estimation of each player
+
+    @return: global rating of each player
+    """
+    global_rating = (
+        np.asarray(weighted, dtype=float)
+        + np.asarray(global_levels, dtype=float) * GLOBAL_LEVEL_WEIGHT
+    ) / (GLOBAL_LEVEL_WEIGHT + 1)
+    return np.clip(global_rating, MIN_RATING, MAX_RATING).round(2)
+
+
+def score_players(ratings, coefficients, global_levels) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the weighted and global ratings of players in one pass.
+
+    @param ratings: rating of each player (rows) for each dimension (columns)
+    @param coefficients: coefficient of each dimension
+    @param global_levels: global level estimation of each player
+
+    @return: weighted and global rating of each player
+    """
+    weighted = weighted_ratings(ratings, coefficients, global_levels)
+    return weighted, global_ratings(weighted, global_levels)
@@ -0,0 +1,2 @@
+from .importer import RegistrationImport, import_registrations, username_from_name
+from .jobs import claim_registration_import_job, registration_errors, run_registration_import_job
@@ -0,0 +1,202 @@
+import hashlib
+import json
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from olympic_warriors.models.Player import Player, PlayerRating
+from rest_framework.authtoken.models import Token
+
+
+@dataclass
+class RegistrationImport:
+    """
+    Number of rows created or updated by the import of registrations.
+    """
+
+    users: int = 0
+    players: int = 0
+    ratings: int = 0
+    updated_players: int = 0
+    unchanged_players: int = 0
+
+
+def username_from_name(name: str) -> str:
+    """
+    Get the username of a registered player from their name.
+    """
+    return name.replace(" ", "").lower()
+
+
+def team_preferences(row: dict) -> str:
+    """
+    Get the team preferences written in a registration row, empty if there are none.
+    """
+    preferences = row.get("Team Preferences")
+    return preferences.strip() if isinstance(preferences, str) else ""
+
+
+def registration_hash(edition, row: dict) -> str:
+    """
+    Hash the content of a registration row imported for a player.
+
+    @param edition: edition the player registers to
+    @param row: rated registration
+
+    @return: hexadecimal SHA-256 of the normalized name, ratings, global rating and team
+    preferences
+    """
+    content = [" ".join(row["Name"].split()).lower()]
+    content += [float(row[rating]) for rating in edition.ratings]
+    content.append(float(row["Global_Rating"]))
+    content.append(team_preferences(row))
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def import_registrations(edition, df) -> RegistrationImport:
+    """
+    Create or update the users, players, ratings and auth tokens of registrations in bulk.
+
+    Existing users and players of the edition are loaded in one query each. Each row is
+    hashed and compared with the hash stored on its player, so that only new or changed
+    rows are written: missing users, tokens, players and ratings are created with
+    bulk_create and changed players and ratings are updated in place with bulk_update.
+    Re-importing an unchanged form therefore only runs the two loading queries.
+
+    Users are created with an unusable password, no password being ever sent to players,
+    which also spares hashing a password per row. When a player registered several times,
+    the latest row wins.
+
+    @param edition: edition the players register to
+    @param df: registrations, with the Name, Global_Rating and rating columns of the edition
+
+    @return: number of users, players and ratings created and of players updated or unchanged
+    """
+    result = RegistrationImport()
+    rows = {}
+    for row in df.to_dict("records"):
+        rows[username_from_name(row["Name"])] = row
+    if not rows:
+        return result
+
+    with transaction.atomic():
+        users = {
+            user.username: user for user in User.objects.filter(username__in=rows)
+        }
+        unusable_password = make_password(None)
+        new_users = []
+        for username, row in rows.items():
+            if username in users:
+                continue
+            first_name, _, last_name = row["Name"].strip().partition(" ")
+            new_users.append(
+                User(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=unusable_password,
+                    email=f"{username}@olympicwarriors.com",
+                )
+            )
+        if new_users:
+            User.objects.bulk_create(new_users)
+            # Ids are not returned by bulk_create on every database
+            users = {
+                user.username: user for user in User.objects.filter(username__in=rows)
+            }
+            # bulk_create does not send the post_save signal creating tokens
+            Token.objects.bulk_create(
+                [
+                    Token(key=Token.generate_key(), user=users[user.username])
+                    for user in new_users
+                ]
+            )
+        result.users = len(new_users)
+
+        players = {
+            player.user_id: player
+            for player in Player.objects.filter(edition=edition, user__in=users.values()).only(
+                "id", "user_id", "rating", "registration_hash", "team_preferences"
+            )
+        }
+        hashes = {username: registration_hash(edition, row) for username, row in rows.items()}
+
+        new_players = []
+        changed_players = []
+        for username, row in rows.items():
+            player = players.get(users[username].id)
+            if player is None:
+                new_players.append(
+                    Player(
+                        user=users[username],
+                        rating=row["Global_Rating"],
+                        edition=edition,
+                        registration_hash=hashes[username],
+                        team_preferences=team_preferences(row),
+                    )
+                )
+            elif player.registration_hash != hashes[username]:
+                player.rating = row["Global_Rating"]
+                player.registration_hash = hashes[username]
+                player.team_preferences = team_preferences(row)
+                changed_players.append(player)
+        result.unchanged_players = len(rows) - len(new_players) - len(changed_players)
+        if not new_players and not changed_players:
+            return result
+
+        if new_players:
+            Player.objects.bulk_create(new_players)
+            players.update(
+                (player.user_id, player)
+                for player in Player.objects.filter(
+                    edition=edition, user__in=[player.user for player in new_players]
+                ).only("id", "user_id")
+            )
+        result.players = len(new_players)
+
+        if changed_players:
+            Player.objects.bulk_update(
+                changed_players, ["rating", "registration_hash", "team_preferences"]
+            )
+        result.updated_players = len(changed_players)
+
+        # Ratings of changed players are updated in place, duplicates left by imports
+        # predating registration hashes being removed
+        existing_ratings = {}
+        duplicate_rating_ids = []
+        for rating in PlayerRating.objects.filter(player__in=changed_players).order_by("id"):
+            key = (rating.player_id, rating.identifier)
+            if key in existing_ratings:
+                duplicate_rating_ids.append(rating.id)
+            else:
+                existing_ratings[key] = rating
+        if duplicate_rating_ids:
+            PlayerRating.objects.filter(id__in=duplicate_rating_ids).delete()
+
+        new_ratings = []
+        changed_ratings = []
+        written_user_ids = {player.user_id for player in new_players + changed_players}
+        for username, row in rows.items():
+            player = players[users[username].id]
+            if player.user_id not in written_user_ids:
+                continue
+            for name, rating in edition.ratings.items():
+                existing_rating = existing_ratings.get((player.id, rating["id"]))
+                if existing_rating is None:
+                    new_ratings.append(
+                        PlayerRating(
+                            player_id=player.id,
+                            name=name,
+                            identifier=rating["id"],
+                            rating=row[name],
+                        )
+                    )
+                elif existing_rating.rating != row[name]:
+                    existing_rating.rating = row[name]
+                    changed_ratings.append(existing_rating)
+        PlayerRating.objects.bulk_create(new_ratings)
+        PlayerRating.objects.bulk_update(changed_ratings, ["rating"])
+        result.ratings = len(new_ratings)
+
+    return result
@@ -0,0 +1,150 @@
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+from olympic_warriors.models.RegistrationImport import RegistrationImportJob
+
+from .importer import import_registrations
+
+DEFAULT_CHUNK_SIZE = 100
+
+# Line of the first row in the CSV file, after the header
+FIRST_LINE = 2
+
+
+def registration_errors(edition, df) -> dict[int, str]:
+    """
+    Check registrations before importing them.
+
+    @param edition: edition the players register to
+    @param df: rated registrations
+
+    @return: error message by index of each invalid row
+    """
+    errors = {}
+    names = df["Name"].where(df["Name"].notna(), "").astype(str).str.strip()
+    for index in df.index[names == ""]:
+        errors[index] = "Missing name"
+    for column in [*edition.ratings, "Global Level Estimation for Olympic Warriors 2025"]:
+        values = pd.to_numeric(df[column], errors="coerce")
+        for index in df.index[~values.between(1, 10)]:
+            value = values.at[index]
+            errors.setdefault(
+                index, f"Invalid {column}: {value:g}" if pd.notna(value) else
+                f"Invalid {column}: not a number"
+            )
+    return errors
+
+
+def claim_registration_import_job():
+    """
+    Claim the oldest pending import job, skipping the ones claimed by other workers.
+
+    @return: running job, None if no job is pending
+    """
+    with transaction.atomic():
+        job = (
+            RegistrationImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=RegistrationImportJob.Statuses.PENDING)
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = RegistrationImportJob.Statuses.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def run_registration_import_job(job, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Run an import job in chunks, each imported in its own transaction.
+
+    Invalid rows, and every row of a chunk failing to import, are recorded as errors and
+    skipped. Progress is saved after each chunk, a job set back to pending resuming after
+    its processed rows.
+
+    @param job: running job
+    @param chunk_size: number of rows imported per transaction
+
+    @return: finished job
+    """
+    edition = job.edition
+    try:
+        df = edition.read_registration_form(job.registration_form)
+        if "Name" not in df.columns:
+            raise ValueError("missing Name column")
+    except Exception as e:
+        return _fail_registration_import_job(job, f"Unreadable registration form: {e}")
+
+    try:
+        return _import_chunks(job, df, chunk_size)
+    except Exception as e:
+        # Leave no job running forever when an error escapes the chunk imports
+        return _fail_registration_import_job(job, f"Import failed: {e}")
+
+
+def _fail_registration_import_job(job, error: str):
+    """
+    Mark an import job as failed.
+
+    @param job: running job
+    @param error: message recorded in the job errors
+
+    @return: failed job
+    """
+    job.status = RegistrationImportJob.Statuses.FAILED
+    job.errors.append({"line": None, "error": error})
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "errors", "finished_at"])
+    return job
+
+
+def _import_chunks(job, df, chunk_size: int):
+    """
+    Import the rows of a job not processed yet, chunk by chunk.
+
+    @param job: running job
+    @param df: rated registrations
+    @param chunk_size: number of rows imported per transaction
+
+    @return: finished job
+    """
+    edition = job.edition
+    job.total_rows = len(df)
+    job.save(update_fields=["total_rows"])
+
+    for start in range(job.processed_rows, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        errors = registration_errors(edition, chunk)
+        rows = chunk.drop(index=list(errors))
+        try:
+            result = import_registrations(edition, rows)
+        except Exception as e:
+            errors.update(dict.fromkeys(rows.index, f"Import failed: {e}"))
+        else:
+            job.created_users += result.users
+            job.created_players += result.players
+            job.created_ratings += result.ratings
+            job.updated_players += result.updated_players
+
+        job.errors.extend(
+            {"line": int(index) + FIRST_LINE, "error": error}
+            for index, error in sorted(errors.items())
+        )
+        job.processed_rows = start + len(chunk)
+        job.save(
+            update_fields=[
+                "processed_rows",
+                "created_users",
+                "created_players",
+                "created_ratings",
+                "updated_players",
+                "errors",
+            ]
+        )
+
+    job.status = RegistrationImportJob.Statuses.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    return job
@@ -1,2 +1,3 @@
 from .round_robin import schedule_round_robin_games
 from .swiss import schedule_swiss_games
+from .preview import preview_schedule
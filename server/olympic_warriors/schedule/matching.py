@@ -0,0 +1,398 @@
+"""
+Maximum weight matching in general graphs, using Edmonds' blossom algorithm
+with the primal-dual method of Galil, in O(n^3).
+
+Adapted from the public domain implementation by Joris van Rantwijk.
+Weights are expected to be integers, so that computations stay exact.
+"""
+
+
+def max_weight_matching(edges: list[tuple[int, int, int]], max_cardinality=False) -> list[int]:
+    """
+    Compute a maximum weight matching of a general graph.
+
+    @param edges: list of (i, j, weight) with vertices numbered from 0
+    @param max_cardinality: only consider matchings of maximum cardinality
+
+    @return: mate of each vertex, -1 if unmatched
+    """
+    # pylint: disable=too-many-locals,too-many-statements,too-many-branches
+    if not edges:
+        return []
+
+    edge_count = len(edges)
+    vertex_count = 1 + max(max(i, j) for i, j, _ in edges)
+    max_weight = max(0, max(weight for _, _, weight in edges))
+
+    # Edge k has endpoints 2k and 2k + 1, endpoint[p] being the vertex of endpoint p
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * edge_count)]
+    neighbour_ends = [[] for _ in range(vertex_count)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbour_ends[i].append(2 * k + 1)
+        neighbour_ends[j].append(2 * k)
+
+    # Remote endpoint of the matched edge of each vertex, -1 if single
+    mate = vertex_count * [-1]
+    # Top-level blossom labels: 0 free, 1 S-vertex, 2 T-vertex, 5 marked while scanning
+    label = (2 * vertex_count) * [0]
+    label_end = (2 * vertex_count) * [-1]
+    in_blossom = list(range(vertex_count))
+    blossom_parent = (2 * vertex_count) * [-1]
+    blossom_children = (2 * vertex_count) * [None]
+    blossom_base = list(range(vertex_count)) + vertex_count * [-1]
+    blossom_endpoints = (2 * vertex_count) * [None]
+    best_edge = (2 * vertex_count) * [-1]
+    blossom_best_edges = (2 * vertex_count) * [None]
+    unused_blossoms = list(range(vertex_count, 2 * vertex_count))
+    dual = vertex_count * [max_weight] + vertex_count * [0]
+    allowed_edge = edge_count * [False]
+    queue = []
+
+    def slack(k):
+        i, j, weight = edges[k]
+        return dual[i] + dual[j] - 2 * weight
+
+    def blossom_leaves(b):
+        if b < vertex_count:
+            yield b
+        else:
+            for child in blossom_children[b]:
+                if child < vertex_count:
+                    yield child
+                else:
+                    yield from blossom_leaves(child)
+
+    def assign_label(w, t, p):
+        b = in_blossom[w]
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            base = blossom_base[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        # Trace back from v and w to find a new blossom base, or -1 for an augmenting path
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                v = endpoint[label_end[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        base_blossom = in_blossom[base]
+        bv = in_blossom[v]
+        bw = in_blossom[w]
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[base_blossom] = b
+        blossom_children[b] = path = []
+        blossom_endpoints[b] = endpoints = []
+        while bv != base_blossom:
+            blossom_parent[bv] = b
+            path.append(bv)
+            endpoints.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+        path.append(base_blossom)
+        path.reverse()
+        endpoints.reverse()
+        endpoints.append(2 * k)
+        while bw != base_blossom:
+            blossom_parent[bw] = b
+            path.append(bw)
+            endpoints.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+        label[b] = 1
+        label_end[b] = label_end[base_blossom]
+        dual[b] = 0
+        for leaf in blossom_leaves(b):
+            if label[in_blossom[leaf]] == 2:
+                queue.append(leaf)
+            in_blossom[leaf] = b
+
+        best_edge_to = (2 * vertex_count) * [-1]
+        for child in path:
+            if blossom_best_edges[child] is None:
+                neighbour_lists = [
+                    [p // 2 for p in neighbour_ends[leaf]] for leaf in blossom_leaves(child)
+                ]
+            else:
+                neighbour_lists = [blossom_best_edges[child]]
+            for neighbour_list in neighbour_lists:
+                for edge in neighbour_list:
+                    i, j, _ = edges[edge]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if (
+                        bj != b
+                        and label[bj] == 1
+                        and (best_edge_to[bj] == -1 or slack(edge) < slack(best_edge_to[bj]))
+                    ):
+                        best_edge_to[bj] = edge
+            blossom_best_edges[child] = None
+            best_edge[child] = -1
+        blossom_best_edges[b] = [edge for edge in best_edge_to if edge != -1]
+        best_edge[b] = -1
+        for edge in blossom_best_edges[b]:
+            if best_edge[b] == -1 or slack(edge) < slack(best_edge[b]):
+                best_edge[b] = edge
+
+    def expand_blossom(b, end_stage):
+        for child in blossom_children[b]:
+            blossom_parent[child] = -1
+            if child < vertex_count:
+                in_blossom[child] = child
+            elif end_stage and dual[child] == 0:
+                expand_blossom(child, end_stage)
+            else:
+                for leaf in blossom_leaves(child):
+                    in_blossom[leaf] = child
+
+        if not end_stage and label[b] == 2:
+            # Relabel the children on the even path from the entry child to the base
+            entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+            j = blossom_children[b].index(entry_child)
+            if j & 1:
+                j -= len(blossom_children[b])
+                j_step = 1
+                endpoint_trick = 0
+            else:
+                j_step = -1
+                endpoint_trick = 1
+            p = label_end[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[
+                    endpoint[blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick ^ 1]
+                ] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowed_edge[blossom_endpoints[b][j - endpoint_trick] // 2] = True
+                j += j_step
+                p = blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick
+                allowed_edge[p // 2] = True
+                j += j_step
+            child = blossom_children[b][j]
+            label[endpoint[p ^ 1]] = label[child] = 2
+            label_end[endpoint[p ^ 1]] = label_end[child] = p
+            best_edge[child] = -1
+            j += j_step
+            while blossom_children[b][j] != entry_child:
+                child = blossom_children[b][j]
+                if label[child] == 1:
+                    j += j_step
+                    continue
+                reached = None
+                for leaf in blossom_leaves(child):
+                    if label[leaf] != 0:
+                        reached = leaf
+                        break
+                if reached is not None:
+                    label[reached] = 0
+                    label[endpoint[mate[blossom_base[child]]]] = 0
+                    assign_label(reached, 2, label_end[reached])
+                j += j_step
+
+        label[b] = label_end[b] = -1
+        blossom_children[b] = blossom_endpoints[b] = None
+        blossom_base[b] = -1
+        blossom_best_edges[b] = None
+        best_edge[b] = -1
+        unused_blossoms.append(b)
+
+    def augment_blossom(b, v):
+        child = v
+        while blossom_parent[child] != b:
+            child = blossom_parent[child]
+        if child >= vertex_count:
+            augment_blossom(child, v)
+        i = j = blossom_children[b].index(child)
+        if i & 1:
+            j -= len(blossom_children[b])
+            j_step = 1
+            endpoint_trick = 0
+        else:
+            j_step = -1
+            endpoint_trick = 1
+        while j != 0:
+            j += j_step
+            child = blossom_children[b][j]
+            p = blossom_endpoints[b][j - endpoint_trick] ^ endpoint_trick
+            if child >= vertex_count:
+                augment_blossom(child, endpoint[p])
+            j += j_step
+            child = blossom_children[b][j]
+            if child >= vertex_count:
+                augment_blossom(child, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+        blossom_endpoints[b] = blossom_endpoints[b][i:] + blossom_endpoints[b][:i]
+        blossom_base[b] = blossom_base[blossom_children[b][0]]
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = in_blossom[s]
+                if bs >= vertex_count:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                if bt >= vertex_count:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    for _ in range(vertex_count):
+        # Each stage finds an augmenting path and augments the matching
+        label[:] = (2 * vertex_count) * [0]
+        best_edge[:] = (2 * vertex_count) * [-1]
+        blossom_best_edges[vertex_count:] = vertex_count * [None]
+        allowed_edge[:] = edge_count * [False]
+        queue[:] = []
+
+        for v in range(vertex_count):
+            if mate[v] == -1 and label[in_blossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbour_ends[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if in_blossom[v] == in_blossom[w]:
+                        continue
+                    if not allowed_edge[k]:
+                        k_slack = slack(k)
+                        if k_slack <= 0:
+                            allowed_edge[k] = True
+                    if allowed_edge[k]:
+                        if label[in_blossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[in_blossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            label_end[w] = p ^ 1
+                    elif label[in_blossom[w]] == 1:
+                        b = in_blossom[v]
+                        if best_edge[b] == -1 or k_slack < slack(best_edge[b]):
+                            best_edge[b] = k
+                    elif label[w] == 0:
+                        if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                            best_edge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path with tight edges, update the dual variables
+            delta_type = -1
+            delta = delta_edge = delta_blossom = None
+            if not max_cardinality:
+                delta_type = 1
+                delta = min(dual[:vertex_count])
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 0 and best_edge[v] != -1:
+                    d = slack(best_edge[v])
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 2
+                        delta_edge = best_edge[v]
+            for b in range(2 * vertex_count):
+                if blossom_parent[b] == -1 and label[b] == 1 and best_edge[b] != -1:
+                    d = slack(best_edge[b]) // 2
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 3
+                        delta_edge = best_edge[b]
+            for b in range(vertex_count, 2 * vertex_count):
+                if (
+                    blossom_base[b] >= 0
+                    and blossom_parent[b] == -1
+                    and label[b] == 2
+                    and (delta_type == -1 or dual[b] < delta)
+                ):
+                    delta = dual[b]
+                    delta_type = 4
+                    delta_blossom = b
+            if delta_type == -1:
+                # Only possible with max cardinality, the matching is maximum
+                delta_type = 1
+                delta = max(0, min(dual[:vertex_count]))
+
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 1:
+                    dual[v] -= delta
+                elif label[in_blossom[v]] == 2:
+                    dual[v] += delta
+            for b in range(vertex_count, 2 * vertex_count):
+                if blossom_base[b] >= 0 and blossom_parent[b] == -1:
+                    if label[b] == 1:
+                        dual[b] += delta
+                    elif label[b] == 2:
+                        dual[b] -= delta
+
+            if delta_type == 1:
+                break
+            if delta_type == 2:
+                allowed_edge[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                if label[in_blossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif delta_type == 3:
+                allowed_edge[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                queue.append(i)
+            elif delta_type == 4:
+                expand_blossom(delta_blossom, False)
+
+        if not augmented:
+            break
+
+        # Expand S-blossoms with zero dual at the end of the stage
+        for b in range(vertex_count, 2 * vertex_count):
+            if (
+                blossom_parent[b] == -1
+                and blossom_base[b] >= 0
+                and label[b] == 1
+                and dual[b] == 0
+            ):
+                expand_blossom(b, True)
+
+    return [endpoint[mate[v]] if mate[v] >= 0 else -1 for v in range(vertex_count)]
@@ -0,0 +1,86 @@
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, F, When
+
+
+@dataclass
+class ScheduledGame:
+    """
+    A game computed in memory, before being persisted.
+    """
+
+    team1_id: int
+    team2_id: int
+    referee_id: int = None
+    slot: int = 0
+
+
+@dataclass
+class ScheduledRound:
+    """
+    A round computed in memory, before being persisted.
+    """
+
+    order: int
+    games: list[ScheduledGame] = field(default_factory=list)
+
+
+def persist_schedule(discipline, rounds: list[ScheduledRound]) -> None:
+    """
+    Persist rounds and games computed in memory with a constant number of queries.
+
+    Games are created as 0-0 draws, hence granting a point to both teams as Game.save does.
+
+    @param discipline: discipline the rounds belong to
+    @param rounds: rounds to persist
+    """
+    TeamSportRound = apps.get_model('olympic_warriors', 'TeamSportRound')
+    Game = apps.get_model('olympic_warriors', 'Game')
+    TeamResult = apps.get_model('olympic_warriors', 'TeamResult')
+    LeaderboardEntry = apps.get_model('olympic_warriors', 'LeaderboardEntry')
+    FeedEntry = apps.get_model('olympic_warriors', 'FeedEntry')
+
+    with transaction.atomic():
+        game_rounds = TeamSportRound.objects.bulk_create(
+            [
+                TeamSportRound(discipline_id=discipline.id, order=scheduled_round.order)
+                for scheduled_round in rounds
+            ]
+        )
+        games = Game.objects.bulk_create(
+            [
+                Game(
+                    discipline_id=discipline.id,
+                    round=game_round,
+                    team1_id=game.team1_id,
+                    team2_id=game.team2_id,
+                    referees_id=game.referee_id or game.team1_id,
+                    edition_id=discipline.edition_id,
+                )
+                for game_round, scheduled_round in zip(game_rounds, rounds)
+                for game in scheduled_round.games
+            ]
+        )
+
+        FeedEntry.record_games(games)
+
+        draws = Counter(
+            team_id
+            for scheduled_round in rounds
+            for game in scheduled_round.games
+            for team_id in (game.team1_id, game.team2_id)
+        )
+        if draws:
+            TeamResult.objects.filter(discipline_id=discipline.id, team_id__in=draws).update(
+                points=Case(
+                    *[
+                        When(team_id=team_id, then=F("points") + count)
+                        for team_id, count in draws.items()
+                    ],
+                    default=F("points"),
+                )
+            )
+            LeaderboardEntry.refresh_discipline(discipline.id)
@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from olympic_warriors.models.Team import Team
+
+from .plan import ScheduledRound
+from .referees import RefereeAllocator
+from .round_robin import compute_round_robin_schedule
+from .swiss import compute_swiss_round, load_swiss_state
+
+
+@dataclass
+class SchedulePreview:
+    """
+    A schedule computed in memory for preview, never persisted.
+    """
+
+    pairing_system: str
+    max_rounds: int
+    teams: dict[int, str]
+    rounds: list[ScheduledRound] = field(default_factory=list)
+    byes: list[list[int]] = field(default_factory=list)
+    referees: dict = None
+
+
+def preview_schedule(
+    pairing_system: str = None,
+    edition_id: int = None,
+    discipline_id: int = None,
+    team_count: int = None,
+    max_rounds: int = None,
+) -> SchedulePreview:
+    """
+    Compute a round-robin schedule or the next Swiss round without writing to the database.
+
+    Teams are taken from the discipline or the edition, or are placeholders when a team
+    count is given. For a Swiss discipline, the next round is paired from its history, unless
+    the maximum number of rounds was reached.
+
+    @param pairing_system: "RR" or "SW", defaults to the pairing system of the discipline
+    @param edition_id: id of the edition whose active teams are scheduled
+    @param discipline_id: id of the discipline to take the configuration and teams from
+    @param team_count: number of placeholder teams to schedule instead of real ones
+    @param max_rounds: number of rounds, defaults to the discipline or a full round-robin
+
+    @return: schedule preview
+    """
+    Discipline = apps.get_model('olympic_warriors', 'Discipline')
+
+    discipline = None
+    if discipline_id is not None:
+        discipline = Discipline.objects.get(pk=discipline_id)
+        edition_id = discipline.edition_id
+        pairing_system = pairing_system or discipline.pairing_system
+        max_rounds = max_rounds or discipline.max_rounds
+
+    if team_count is not None:
+        teams = {team_id: f"Team {team_id}" for team_id in range(1, team_count + 1)}
+        discipline = None
+    else:
+        teams = dict(
+            Team.objects.filter(edition=edition_id, is_active=True)
+            .order_by("id")
+            .values_list("id", "name")
+        )
+
+    team_ids = list(teams)
+    if pairing_system == Discipline.PairingSystem.ROUND_ROBIN:
+        allocator = RefereeAllocator(team_ids)
+        max_rounds = max_rounds or len(team_ids) - 1
+        rounds = compute_round_robin_schedule(team_ids, max_rounds, allocator)
+        return SchedulePreview(
+            pairing_system=pairing_system,
+            max_rounds=max_rounds,
+            teams=teams,
+            rounds=rounds,
+            byes=[
+                sorted(
+                    set(team_ids)
+                    - {
+                        team_id
+                        for game in scheduled_round.games
+                        for team_id in (game.team1_id, game.team2_id)
+                    }
+                )
+                for scheduled_round in rounds
+            ],
+            referees=allocator.report(),
+        )
+
+    if pairing_system == Discipline.PairingSystem.SWISS:
+        if discipline is not None:
+            order, scores, played_pairings, bye_counts = load_swiss_state(discipline)
+        else:
+            order, scores, played_pairings, bye_counts = 0, dict.fromkeys(team_ids, 0), set(), {}
+        preview = SchedulePreview(pairing_system=pairing_system, max_rounds=max_rounds, teams=teams)
+        # Like schedule_swiss_games, no round is paired once the last one was played
+        if max_rounds is None or order < max_rounds:
+            scheduled_round, byes = compute_swiss_round(
+                order, scores, played_pairings, bye_counts
+            )
+            preview.rounds.append(scheduled_round)
+            preview.byes.append(byes)
+        return preview
+
+    raise ValueError("Schedule preview needs a round-robin or Swiss pairing system.")
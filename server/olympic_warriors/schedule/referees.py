@@ -0,0 +1,143 @@
+from .plan import ScheduledGame
+
+# Weights of the assignment cost, refereeing count first, then recency, then variety
+COUNT_WEIGHT = 10000
+RECENCY_WEIGHT = 100
+RECENCY_WINDOW = 3
+PAIRING_WEIGHT = 1
+
+
+def solve_assignment(cost: list[list[int]]) -> list[int]:
+    """
+    Solve a rectangular min-cost assignment problem with the Hungarian algorithm.
+
+    @param cost: cost matrix with one row per task and at least as many columns as rows
+
+    @return: column assigned to each row
+    """
+    rows = len(cost)
+    if rows == 0:
+        return []
+    columns = len(cost[0])
+    if columns < rows:
+        raise ValueError("Not enough candidates to solve the assignment.")
+
+    # Potentials and matching are 1-indexed, index 0 being a virtual row/column
+    row_potentials = [0] * (rows + 1)
+    column_potentials = [0] * (columns + 1)
+    matched_rows = [0] * (columns + 1)
+    way = [0] * (columns + 1)
+
+    for row in range(1, rows + 1):
+        matched_rows[0] = row
+        column = 0
+        min_slack = [float("inf")] * (columns + 1)
+        used = [False] * (columns + 1)
+        while matched_rows[column] != 0:
+            used[column] = True
+            current_row = matched_rows[column]
+            delta = float("inf")
+            next_column = 0
+            for candidate in range(1, columns + 1):
+                if used[candidate]:
+                    continue
+                slack = (
+                    cost[current_row - 1][candidate - 1]
+                    - row_potentials[current_row]
+                    - column_potentials[candidate]
+                )
+                if slack < min_slack[candidate]:
+                    min_slack[candidate] = slack
+                    way[candidate] = column
+                if min_slack[candidate] < delta:
+                    delta = min_slack[candidate]
+                    next_column = candidate
+            for candidate in range(columns + 1):
+                if used[candidate]:
+                    row_potentials[matched_rows[candidate]] += delta
+                    column_potentials[candidate] -= delta
+                else:
+                    min_slack[candidate] -= delta
+            column = next_column
+
+        # Augment along the alternating path
+        while column != 0:
+            previous_column = way[column]
+            matched_rows[column] = matched_rows[previous_column]
+            column = previous_column
+
+    assignment = [0] * rows
+    for column in range(1, columns + 1):
+        if matched_rows[column] != 0:
+            assignment[matched_rows[column] - 1] = column - 1
+    return assignment
+
+
+class RefereeAllocator:
+    """
+    Allocate referees to games across a whole schedule, keeping fairness counters in memory.
+
+    Each batch of simultaneous games is solved as a min-cost assignment, the cost of a team
+    refereeing a game favoring teams that refereed the least, then teams that didn't referee
+    recently, then teams that refereed the playing teams the least.
+    """
+
+    def __init__(self, team_ids: list[int]):
+        self.referee_counts = {team_id: 0 for team_id in team_ids}
+        self.last_round_as_referee = {team_id: -1 for team_id in team_ids}
+        self.refereed_teams = {team_id: {} for team_id in team_ids}
+
+    def _cost(self, game: ScheduledGame, team_id: int, round_index: int) -> int:
+        """
+        Cost of a team refereeing a game.
+        """
+        cost = self.referee_counts[team_id] * COUNT_WEIGHT
+
+        last_round = self.last_round_as_referee[team_id]
+        if last_round >= 0:
+            cost += max(0, RECENCY_WINDOW - (round_index - last_round)) * RECENCY_WEIGHT
+
+        refereed_teams = self.refereed_teams[team_id]
+        cost += (
+            refereed_teams.get(game.team1_id, 0) + refereed_teams.get(game.team2_id, 0)
+        ) * PAIRING_WEIGHT
+
+        return cost
+
+    def assign(
+        self, games: list[ScheduledGame], available_team_ids: list[int], round_index: int
+    ) -> None:
+        """
+        Assign referees to simultaneous games and update fairness counters.
+
+        @param games: simultaneous games without referees
+        @param available_team_ids: ids of the teams not playing at that time
+        @param round_index: index of the round being scheduled
+        """
+        cost = [
+            [self._cost(game, team_id, round_index) for team_id in available_team_ids]
+            for game in games
+        ]
+
+        for game, column in zip(games, solve_assignment(cost)):
+            referee_id = available_team_ids[column]
+            game.referee_id = referee_id
+            self.referee_counts[referee_id] += 1
+            self.last_round_as_referee[referee_id] = round_index
+            for team_id in (game.team1_id, game.team2_id):
+                refereed_teams = self.refereed_teams[referee_id]
+                refereed_teams[team_id] = refereed_teams.get(team_id, 0) + 1
+
+    def report(self) -> dict:
+        """
+        Report the referee distribution of the schedule.
+
+        @return: refereeing count by team id, with the min, max and spread of the counts
+        """
+        counts = self.referee_counts.values()
+        return {
+            "counts": dict(self.referee_counts),
+            "min": min(counts, default=0),
+            "max": max(counts, default=0),
+            "spread": max(counts, default=0) - min(counts, default=0),
+        }
@@ -1,8 +1,10 @@
-from copy import deepcopy
-
 from django.apps import apps
+from django.db import transaction
 from olympic_warriors.models.Team import Team
 
+from .plan import ScheduledGame, ScheduledRound, persist_schedule
+from .referees import RefereeAllocator
+
 
 def _get_discipline_model():
     """
@@ -11,179 +13,107 @@ def _get_discipline_model():
     return apps.get_model('olympic_warriors', 'Discipline')
 
 
-def _get_game_model():
-    """
-    Get the Game model from the apps registry.
+def compute_round_robin_schedule(
+    team_ids: list[int], max_rounds: int, allocator: RefereeAllocator = None
+) -> list[ScheduledRound]:
     """
-    return apps.get_model('olympic_warriors', 'Game')
+    Compute round-robin rounds, games and referees in memory, without any query.
 
+    Each round is split in iterations of simultaneous games, teams not playing
+    in an iteration being available to referee it.
 
-def _get_team_sport_round_model():
-    """
-    Get the TeamSportRound model from the apps registry.
-    """
-    return apps.get_model('olympic_warriors', 'TeamSportRound')
-
+    @param team_ids: ids of the teams to schedule
+    @param max_rounds: number of rounds to schedule
+    @param allocator: referee allocator to use, pass one to report the referee distribution
 
-def _get_last_round_as_referee(discipline_id: int, team_id: int) -> int:
+    @return: scheduled rounds
     """
-    Get the last round order in which a team was a referee.
-
-    @param team_id: id of the team to search for
-
-    @return: order of the last round in which the team was a referee, -1 if never
-    """
-    Game = _get_game_model()
-
-    last_game_refereed = (
-        Game.objects.filter(referees__id=team_id, is_active=True)
-        .filter(discipline__id=discipline_id)
-        .order_by("-round__order")
-        .first()
-    )
-
-    if not last_game_refereed:
-        return -1
-    return last_game_refereed.round.order
-
+    if len(team_ids) < 3:
+        raise ValueError("Not enough teams to schedule round-robin games.")
 
+    simultaneous_games = len(team_ids) // 3
+    iteration_per_round = (len(team_ids) // 2) // simultaneous_games
 
-def _assign_referees(
-    discipline_id: int, game_without_referees: list, leftover_team_ids: set[int]
-) -> None:
-    """
-    Assign referees to games without referees while ensuring best possible distribution.
+    allocator = allocator or RefereeAllocator(team_ids)
 
-    @param game_without_referees: list of games without referees for this round iteration
-    @param leftover_team_ids: set of team ids that can be referees for this round iteration
-    """
-    Game = _get_game_model()
-
-    for game in game_without_referees:
-        best_referee_id: int = None
-        best_referee_score: int = None
-        last_round_best_referee: int = None
-        for team_id in leftover_team_ids:
-            referee_score = Game.objects.filter(
-                referees__id=team_id, discipline__id=discipline_id, is_active=True
-            ).count()
-
-            # Assign the first team as the best referee, or the one with the refereed games
-            if not best_referee_id or referee_score < best_referee_score:
-                best_referee_id = team_id
-                best_referee_score = referee_score
-
-            # If the team has refereed the same number of games,
-            # pick the one that didn't referee for longer
-            elif referee_score == best_referee_score:
-                if not last_round_best_referee:
-                    last_round_best_referee = _get_last_round_as_referee(
-                        discipline_id,
-                        best_referee_id
-                    )
-
-                if _get_last_round_as_referee(discipline_id, team_id) < last_round_best_referee:
-                    best_referee_id = team_id
-                    best_referee_score = referee_score
-
-        game.referees = Team.objects.get(id=best_referee_id)
-        game.save()
-        leftover_team_ids.remove(best_referee_id)
-
-
-def _create_round_iterations(
-    discipline_id: int,
-    l1: list[Team],
-    l2: list[Team],
-    leftover_team_ids: set[int],
-    game_round_id: int,
-    game_index: int,
-    iteration_index: int,
-    simultaneous_games: int,
-    ) -> int:
-    """
-    Create round iterations for team sports.
-
-    @param l1: list of teams in the first half of the round
-    @param l2: list of teams in the second half of the round
-    @param leftover_team_ids: set of team ids that can be referees for this round iteration
-    @param game_round: round of the game
-    @param game_index: index of the game in the round
-    @param iteration_index: index of the iteration in the round
-    @param simultaneous_games: number of simultaneous games in the round
+    # Split teams in two halves for round-robin, with a bye for an odd number of teams
+    circle = list(team_ids) + ([None] if len(team_ids) % 2 else [])
+    l1 = circle[: len(circle) // 2]
+    l2 = circle[len(circle) // 2:]
+    l2.reverse()
 
-    @return: game index
-    """
-    games_without_referees = []
-    Discipline = _get_discipline_model()
-    Game = _get_game_model()
-    discipline = Discipline.objects.get(id=discipline_id)
+    rounds = []
+    for round_index in range(max_rounds):
+        scheduled_round = ScheduledRound(order=round_index)
+
+        # Only part of the pairings can be played in a round, let the pairings of the teams
+        # that refereed the least sit out so that they are available to referee
+        pairings = [
+            (team1_id, team2_id)
+            for team1_id, team2_id in zip(l1, l2)
+            if team1_id is not None and team2_id is not None
+        ]
+        played_pairings = [
+            pairings[pairing_index]
+            for pairing_index in sorted(
+                sorted(
+                    range(len(pairings)),
+                    key=lambda pairing_index: (
+                        allocator.referee_counts[pairings[pairing_index][0]]
+                        + allocator.referee_counts[pairings[pairing_index][1]],
+                        pairing_index,
+                    ),
+                )[len(pairings) - simultaneous_games * iteration_per_round:]
+            )
+        ]
 
-    # Create games for this iteration, hence the number of simultaneous games for a round
-    while game_index < simultaneous_games * (iteration_index + 1):
-        games_without_referees.append(
-            Game.objects.create(
-                discipline=discipline,
-                round_id=game_round_id,
-                team1=l1[game_index],
-                team2=l2[game_index],
-                referees=l1[game_index],
-                edition=discipline.edition,
+        for iteration_index in range(iteration_per_round):
+            games = [
+                ScheduledGame(team1_id=team1_id, team2_id=team2_id, slot=iteration_index)
+                for team1_id, team2_id in played_pairings[
+                    simultaneous_games * iteration_index:
+                    simultaneous_games * (iteration_index + 1)
+                ]
+            ]
+            playing_team_ids = {
+                team_id for game in games for team_id in (game.team1_id, game.team2_id)
+            }
+            allocator.assign(
+                games,
+                [team_id for team_id in team_ids if team_id not in playing_team_ids],
+                round_index,
             )
-        )
-        leftover_team_ids.remove(l1[game_index].id)
-        leftover_team_ids.remove(l2[game_index].id)
-        game_index += 1
+            scheduled_round.games.extend(games)
+
+        rounds.append(scheduled_round)
 
-    _assign_referees(discipline_id, games_without_referees, leftover_team_ids)
+        # Rotate teams for next round
+        l2.append(l1.pop())
+        l1.insert(1, l2.pop(0))
 
-    return game_index
+    return rounds
 
 
 def schedule_round_robin_games(discipline_id: int) -> None:
     """
     Schedule round-robin games for the discipline, including teams refereeing.
     Applicable to team sports.
+
+    The schedule is computed in memory and persisted in bulk, using a constant
+    number of queries whatever the number of teams.
     """
     Discipline = _get_discipline_model()
-    TeamSportRound = _get_team_sport_round_model()
 
     discipline = Discipline.objects.get(id=discipline_id)
-    teams = Team.objects.filter(edition=discipline.edition, is_active=True)
-
-    if len(teams) < 2:
-        raise ValueError("Not enough teams to schedule round-robin games.")
-
-    simultaneous_games = len(teams) // 3
-    iteration_per_round = (len(teams) // 2) // simultaneous_games
-
-    if not discipline.max_rounds:
-        discipline.max_rounds = len(teams) - 1
-        discipline.save()
-
-    team_ids = {team.id for team in teams}
-
-    # Split teams in two halves for round-robin
-    l1 = teams[: len(teams) // 2]
-    l2 = teams[len(teams) // 2:]
-    l2.reverse()
-
-    for round_index in range(discipline.max_rounds):
-        game_round = TeamSportRound.objects.create(discipline=discipline, order=round_index)
-        game_index = 0
-
-        for iteration_index in range(iteration_per_round):
-            game_index = _create_round_iterations(
-                discipline_id,
-                l1,
-                l2,
-                deepcopy(team_ids),
-                game_round.id,
-                game_index,
-                iteration_index,
-                simultaneous_games,
-            )
+    team_ids = list(
+        Team.objects.filter(edition=discipline.edition_id, is_active=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    max_rounds = discipline.max_rounds or len(team_ids) - 1
+    rounds = compute_round_robin_schedule(team_ids, max_rounds)
 
-        # Rotate teams for next round
-        l2.append(l1.pop())
-        l1.insert(1, l2.pop(0))
+    with transaction.atomic():
+        if not discipline.max_rounds:
+            Discipline.objects.filter(id=discipline_id).update(max_rounds=max_rounds)
+        persist_schedule(discipline, rounds)
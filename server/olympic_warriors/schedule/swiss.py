@@ -1,6 +1,9 @@
-
 from django.apps import apps
-from olympic_warriors.models.Team import Team, TeamResult
+from olympic_warriors.models.Team import TeamResult
+
+from .matching import max_weight_matching
+from .plan import ScheduledGame, ScheduledRound, persist_schedule
+
 
 def _get_discipline_model():
     """
@@ -16,40 +19,123 @@ def _get_game_model():
     return apps.get_model('olympic_warriors', 'Game')
 
 
-def _get_team_sport_round_model():
+def compute_swiss_round(
+    order: int,
+    scores: dict[int, int],
+    played_pairings: set[frozenset],
+    bye_counts: dict[int, int] = None,
+) -> tuple[ScheduledRound, list[int]]:
     """
-    Get the TeamSportRound model from the apps registry.
+    Compute the pairings of a Swiss round in memory, with a maximum weight matching.
+
+    Teams are paired with teams of the closest possible score while avoiding rematches,
+    any matching with fewer rematches being preferred whatever the score differences.
+    With an odd number of teams, the bye goes to a low-ranked team that had no bye yet.
+
+    @param order: order of the round
+    @param scores: score of each team id to pair
+    @param played_pairings: pairs of team ids that already played each other
+    @param bye_counts: number of byes already granted by team id
+
+    @return: scheduled round and ids of the teams with a bye
     """
-    return apps.get_model('olympic_warriors', 'TeamSportRound')
+    bye_counts = bye_counts or {}
+    team_ids = sorted(scores, key=lambda team_id: (-scores[team_id], team_id))
+    if len(team_ids) < 2:
+        return ScheduledRound(order=order), team_ids
 
-def schedule_swiss_games(discipline_id: int):
+    lowest_score = min(scores.values())
+    # Weights are scaled so that the bye goes to the lowest ranked team among equals
+    scale = len(team_ids) + 1
+    max_difference = (max(scores.values()) - lowest_score) ** 2 + 1
+    # Avoiding a rematch outweighs any sum of score differences
+    rematch_penalty = max_difference * scale * (len(team_ids) // 2 + 1)
+
+    edges = []
+    for i, team1_id in enumerate(team_ids):
+        for j in range(i + 1, len(team_ids)):
+            team2_id = team_ids[j]
+            weight = (max_difference - (scores[team1_id] - scores[team2_id]) ** 2) * scale
+            if frozenset((team1_id, team2_id)) not in played_pairings:
+                weight += rematch_penalty
+            edges.append((i, j, weight))
+
+    if len(team_ids) % 2:
+        # A virtual opponent stands for the bye
+        bye_vertex = len(team_ids)
+        for i, team_id in enumerate(team_ids):
+            weight = (max_difference - (scores[team_id] - lowest_score) ** 2) * scale + i
+            if not bye_counts.get(team_id):
+                weight += rematch_penalty
+            edges.append((i, bye_vertex, weight))
+
+    mate = max_weight_matching(edges, max_cardinality=True)
+
+    scheduled_round = ScheduledRound(order=order)
+    bye_team_ids = []
+    for i, team_id in enumerate(team_ids):
+        if mate[i] == -1 or mate[i] >= len(team_ids):
+            bye_team_ids.append(team_id)
+        elif i < mate[i]:
+            # No referee for Swiss rounds for now
+            scheduled_round.games.append(
+                ScheduledGame(team1_id=team_id, team2_id=team_ids[mate[i]], referee_id=team_id)
+            )
+
+    return scheduled_round, bye_team_ids
+
+
+def load_swiss_state(discipline) -> tuple[int, dict, set, dict]:
     """
-    Schedule Swiss games for a discipline.
+    Load everything needed to pair the next Swiss round of a discipline in two queries.
+
+    @param discipline: discipline to pair
+
+    @return: order of the next round, scores, played pairings and bye counts
     """
     Game = _get_game_model()
-    TeamSportRound = _get_team_sport_round_model()
-    discipline = _get_discipline_model().objects.get(pk=discipline_id)
-    last_round = discipline.rounds.filter(
-        is_active=True).order_by('-order').first()
-    round_index = (last_round.order if last_round else -1) + 1
+    round_orders = list(
+        discipline.rounds.filter(is_active=True).values_list('order', flat=True)
+    )
+    round_index = max(round_orders, default=-1) + 1
+
+    scores = dict(
+        TeamResult.objects.filter(discipline=discipline, is_active=True).values_list(
+            'team_id', 'points'
+        )
+    )
+    scores = {team_id: points or 0 for team_id, points in scores.items()}
+
+    played_pairings = set()
+    games_played = dict.fromkeys(scores, 0)
+    for team1_id, team2_id in Game.objects.filter(
+        discipline=discipline, is_active=True, round__is_active=True
+    ).values_list('team1_id', 'team2_id'):
+        played_pairings.add(frozenset((team1_id, team2_id)))
+        for team_id in (team1_id, team2_id):
+            if team_id in games_played:
+                games_played[team_id] += 1
+
+    # Teams that played less games than rounds were given a bye
+    bye_counts = {
+        team_id: len(round_orders) - played for team_id, played in games_played.items()
+    }
+
+    return round_index, scores, played_pairings, bye_counts
 
 
-    if round_index > discipline.max_rounds:
+def schedule_swiss_games(discipline_id: int):
+    """
+    Schedule the next Swiss round for a discipline.
+
+    The pairing history is loaded once, the round is computed in memory
+    and persisted in bulk.
+    """
+    discipline = _get_discipline_model().objects.get(pk=discipline_id)
+    round_index, scores, played_pairings, bye_counts = load_swiss_state(discipline)
+
+    if discipline.max_rounds is not None and round_index >= discipline.max_rounds:
         return
 
-    team_ids = TeamResult.objects.filter(discipline=discipline, is_active=True).order_by('points', 'time').values_list('team_id', flat=True)
-    round = TeamSportRound.objects.create(discipline=discipline, order=round_index)
-
-    for i in range(0, len(team_ids), 2):
-        if i + 1 < len(team_ids):
-            team1 = Team.objects.get(pk=team_ids[i])
-            team2 = Team.objects.get(pk=team_ids[i + 1])
-            game = Game(
-                discipline=discipline,
-                round=round,
-                team1=team1,
-                team2=team2,
-                referees=team1,  # No referee for Swiss rounds for now
-                edition=discipline.edition
-            )
-            game.save()
\ No newline at end of file
+    scheduled_round, _ = compute_swiss_round(round_index, scores, played_pairings, bye_counts)
+    persist_schedule(discipline, [scheduled_round])
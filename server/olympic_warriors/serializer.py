@@ -4,7 +4,7 @@ Serializers for the Olympic Warriors app
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from drf_spectacular.utils import extend_schema_field
+from django.db.models import Prefetch
 from olympic_warriors.models import (
     Player,
     Edition,
@@ -17,10 +17,37 @@ from olympic_warriors.models import (
     TeamResult,
     BlindtestRound,
     BlindtestGuess,
+    FeedEntry,
+    RegistrationImportJob,
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """
+    Declares the relations a serializer reads, for list views to load them along with
+    their queryset instead of with one query per object.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Load the relations read by the serializer along with a queryset.
+
+        @param queryset: queryset to serialize
+
+        @return: queryset loading the relations
+        """
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class UserSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     User serializer
     """
@@ -33,7 +60,7 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ("id", "username", "first_name", "last_name", "email")
         
-class PlayerSerializer(serializers.ModelSerializer):
+class PlayerSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Player serializer
     """
@@ -41,6 +68,8 @@ class PlayerSerializer(serializers.ModelSerializer):
     first_name = serializers.CharField(source="user.first_name")
     last_name = serializers.CharField(source="user.last_name")
 
+    select_related_fields = ("user",)
+
     class Meta:
         """
         Meta class
@@ -58,7 +87,7 @@ class PlayerSerializer(serializers.ModelSerializer):
         )
 
 
-class EditionSerializer(serializers.ModelSerializer):
+class EditionSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Edition serializer
     """
@@ -72,14 +101,50 @@ class EditionSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class RegistrationImportJobSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """
+    Registration import job serializer
+    """
+
+    progress = serializers.ReadOnlyField()
+
+    class Meta:
+        model = RegistrationImportJob
+        fields = [
+            "id",
+            "edition",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "progress",
+            "created_users",
+            "created_players",
+            "created_ratings",
+            "updated_players",
+            "errors",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+
+class TeamSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Team serializer
     """
 
     total_points = serializers.ReadOnlyField()
     ranking = serializers.ReadOnlyField()
-    players = serializers.SerializerMethodField()
+    players = PlayerSerializer(many=True, read_only=True, source="active_players")
+
+    select_related_fields = ("leaderboard_entry",)
+    prefetch_related_fields = (
+        Prefetch(
+            "player_set",
+            queryset=PlayerSerializer.setup_eager_loading(Player.objects.filter(is_active=True)),
+            to_attr="active_players",
+        ),
+    )
 
     class Meta:
         """
@@ -89,84 +154,224 @@ class TeamSerializer(serializers.ModelSerializer):
         model = Team
         fields = "__all__"
 
-    @extend_schema_field(PlayerSerializer(many=True))
-    def get_players(self, obj):
-        """
-        Get players for a team
-        """
-        players = Player.objects.filter(team=obj)
-        return PlayerSerializer(players, many=True).data
 
+class DisciplineSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ("teams",)
 
-class DisciplineSerializer(serializers.ModelSerializer):
     class Meta:
         model = Discipline
         fields = "__all__"
 
 
-class PlayerRatingSerializer(serializers.ModelSerializer):
+class PlayerRatingSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(source="player.user.first_name")
     last_name = serializers.CharField(source="player.user.last_name")
 
+    select_related_fields = ("player__user",)
+
     class Meta:
         model = PlayerRating
         fields = "__all__"
 
 
-class GameSerializer(serializers.ModelSerializer):
+class GameSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Game
         fields = "__all__"
 
 
-class GameEventSerializer(serializers.ModelSerializer):
+class GameScoreSerializer(serializers.Serializer):
+    game_id = serializers.IntegerField()
+    score1 = serializers.IntegerField(min_value=0)
+    score2 = serializers.IntegerField(min_value=0)
+
+
+class GameScoresSerializer(serializers.Serializer):
+    scores = GameScoreSerializer(many=True, allow_empty=False)
+
+    def validate_scores(self, value):
+        game_ids = [score["game_id"] for score in value]
+        if len(game_ids) != len(set(game_ids)):
+            raise serializers.ValidationError("Each game can only be scored once per submission.")
+        return value
+
+
+class GameEventSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = GameEvent
         fields = "__all__"
 
 
-class TeamSportRoundSerializer(serializers.ModelSerializer):
-    games = serializers.SerializerMethodField()
+class GameEventBatchItemSerializer(serializers.Serializer):
+    idempotency_key = serializers.CharField(max_length=64)
+    game = serializers.IntegerField()
+    player1 = serializers.IntegerField()
+    player2 = serializers.IntegerField(required=False, allow_null=True)
+    time = serializers.DateTimeField(required=False)
+    event_type = serializers.CharField(max_length=3)
+
+
+class GameEventBatchSerializer(serializers.Serializer):
+    events = GameEventBatchItemSerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class GameEventBatchResultSerializer(serializers.Serializer):
+    created = serializers.DictField(child=serializers.IntegerField())
+    duplicates = serializers.DictField(child=serializers.IntegerField())
+    games = GameSerializer(many=True)
+
+
+class TeamSportRoundSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    games = GameSerializer(many=True, read_only=True, source="active_games")
+
+    prefetch_related_fields = (
+        Prefetch(
+            "round",
+            queryset=GameSerializer.setup_eager_loading(Game.objects.filter(is_active=True)),
+            to_attr="active_games",
+        ),
+    )
 
     class Meta:
         model = TeamSportRound
         fields = "__all__"
 
-    @extend_schema_field(GameSerializer(many=True))
-    def get_games(self, obj):
-        games = Game.objects.filter(round=obj)
-        return GameSerializer(games, many=True).data
-
 
-class BlindtestGuessSerializer(serializers.ModelSerializer):
+class BlindtestGuessSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = BlindtestGuess
         fields = "__all__"
 
 
 class BlindtestGuessUpdateSerializer(serializers.Serializer):
-    artist = serializers.CharField(max_length=255, required=True)
-    song = serializers.CharField(max_length=255, required=True)
+    artist = serializers.CharField(max_length=255, required=False)
+    song = serializers.CharField(max_length=255, required=False)
 
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide an artist or a song.")
+        return attrs
 
-class BlindtestRoundSerializer(serializers.ModelSerializer):
-    guesses = serializers.SerializerMethodField()
+
+class BlindtestGuessSubmissionSerializer(BlindtestGuessUpdateSerializer):
+    id = serializers.IntegerField()
+
+
+class BlindtestGuessBatchSerializer(serializers.Serializer):
+    guesses = BlindtestGuessSubmissionSerializer(many=True, allow_empty=False, max_length=100)
+
+    def validate_guesses(self, value):
+        guess_ids = [guess["id"] for guess in value]
+        if len(guess_ids) != len(set(guess_ids)):
+            raise serializers.ValidationError("Each guess can only be submitted once per batch.")
+        return value
+
+
+class BlindtestGuessBatchResultSerializer(serializers.Serializer):
+    submitted = serializers.ListField(child=serializers.IntegerField())
+    rejected = serializers.ListField(child=serializers.IntegerField())
+
+
+class BlindtestRoundGradingQuerySerializer(serializers.Serializer):
+    threshold = serializers.FloatField(required=False, min_value=0.5, max_value=1)
+
+
+class BlindtestRoundGradingSerializer(serializers.Serializer):
+    round_id = serializers.IntegerField()
+    graded = serializers.IntegerField()
+    changed = serializers.IntegerField()
+    points = serializers.DictField(child=serializers.IntegerField())
+
+
+class BlindtestRoundSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    guesses = BlindtestGuessSerializer(many=True, read_only=True, source="active_guesses")
+
+    prefetch_related_fields = (
+        Prefetch(
+            "blindtest_round",
+            queryset=BlindtestGuessSerializer.setup_eager_loading(
+                BlindtestGuess.objects.filter(is_active=True)
+            ),
+            to_attr="active_guesses",
+        ),
+    )
 
     class Meta:
         model = BlindtestRound
-        fields = "__all__"
-
-    @extend_schema_field(BlindtestGuessSerializer(many=True))
-    def get_guesses(self, obj):
-        guesses = BlindtestGuess.objects.filter(blindtest_round=obj)
-        return BlindtestGuessSerializer(guesses, many=True).data
+        # The answer key is left out, players read rounds while guessing
+        fields = ["id", "blindtest", "order", "is_active", "is_open", "guesses"]
 
 
-class TeamResultSerializer(serializers.ModelSerializer):
+class TeamResultSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     ranking = serializers.ReadOnlyField()
     global_points = serializers.ReadOnlyField()
     team_name = serializers.CharField(source="team.name")
 
+    select_related_fields = ("team",)
+
     class Meta:
         model = TeamResult
         fields = "__all__"
+
+
+class GameScoresResultSerializer(serializers.Serializer):
+    games = GameSerializer(many=True)
+    standings = TeamResultSerializer(many=True)
+
+
+class SchedulePreviewQuerySerializer(serializers.Serializer):
+    pairing_system = serializers.ChoiceField(
+        choices=[Discipline.PairingSystem.ROUND_ROBIN, Discipline.PairingSystem.SWISS],
+        required=False,
+    )
+    edition = serializers.IntegerField(required=False)
+    discipline = serializers.IntegerField(required=False)
+    teams = serializers.IntegerField(required=False, min_value=2, max_value=256)
+    # A round robin of the largest team count needs 255 rounds
+    max_rounds = serializers.IntegerField(required=False, min_value=1, max_value=255)
+
+    def validate(self, attrs):
+        if not any(key in attrs for key in ("edition", "discipline", "teams")):
+            raise serializers.ValidationError("Provide an edition, a discipline or a team count.")
+        if "discipline" not in attrs and "pairing_system" not in attrs:
+            raise serializers.ValidationError("Provide a pairing system.")
+        return attrs
+
+
+class ScheduledGameSerializer(serializers.Serializer):
+    team1 = serializers.IntegerField(source="team1_id")
+    team2 = serializers.IntegerField(source="team2_id")
+    referees = serializers.IntegerField(source="referee_id")
+    slot = serializers.IntegerField()
+
+
+class ScheduledRoundSerializer(serializers.Serializer):
+    order = serializers.IntegerField()
+    games = ScheduledGameSerializer(many=True)
+
+
+class SchedulePreviewSerializer(serializers.Serializer):
+    pairing_system = serializers.CharField()
+    max_rounds = serializers.IntegerField(allow_null=True)
+    teams = serializers.DictField(child=serializers.CharField())
+    rounds = ScheduledRoundSerializer(many=True)
+    byes = serializers.ListField(child=serializers.ListField(child=serializers.IntegerField()))
+    referees = serializers.DictField(allow_null=True)
+
+
+class FeedQuerySerializer(serializers.Serializer):
+    edition = serializers.IntegerField()
+    since = serializers.IntegerField(required=False, default=0, min_value=0)
+    limit = serializers.IntegerField(required=False, default=200, min_value=1, max_value=1000)
+
+
+class FeedEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FeedEntry
+        fields = ["id", "sequence", "kind", "object_id", "payload", "created_at"]
+
+
+class FeedSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    entries = FeedEntrySerializer(many=True)
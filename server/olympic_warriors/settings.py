@@ -225,3 +225,8 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': True,
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# Live scores
+
+# Broker of the server-sent events channel, the local broker only reaches clients of the same process
+LIVE_BROKER = 'olympic_warriors.live.broker.LocalBroker'
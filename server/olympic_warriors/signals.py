@@ -1,10 +1,52 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from olympic_warriors.models import (
+    Blindtest, Discipline, FeedEntry, GameEvent, LeaderboardEntry, Team, TeamResult
+)
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=TeamResult)
+def refresh_leaderboard_on_result_change(sender, instance=None, raw=False, **kwargs):
+    if not raw:
+        LeaderboardEntry.refresh_discipline(instance.discipline_id)
+
+
+@receiver(post_delete, sender=TeamResult)
+def refresh_leaderboard_on_result_delete(sender, instance=None, **kwargs):
+    LeaderboardEntry.refresh_discipline(instance.discipline_id, create_missing=False)
+
+
+@receiver(post_save)
+def refresh_leaderboard_on_discipline_change(sender, instance=None, raw=False, **kwargs):
+    # Discipline subclasses (Rugby, Blindtest...) are sent as their own sender
+    if not raw and isinstance(instance, Discipline):
+        LeaderboardEntry.refresh_discipline(instance.id)
+
+
+@receiver(post_save, sender=Team)
+def refresh_leaderboard_on_team_change(sender, instance=None, raw=False, **kwargs):
+    if not raw:
+        LeaderboardEntry.refresh_edition(instance.edition_id)
+
+
+@receiver(post_save, sender=Team)
+def provision_blindtests_on_team_change(sender, instance=None, raw=False, **kwargs):
+    if not raw and instance.is_active:
+        for blindtest in Blindtest.objects.filter(edition=instance.edition_id, is_active=True):
+            blindtest.provision()
+
+
+@receiver(post_save)
+def record_game_event_in_feed(sender, instance=None, raw=False, **kwargs):
+    # Game event subclasses (RugbyEvent, DodgeballEvent...) are sent as their own sender
+    if not raw and isinstance(instance, GameEvent):
+        FeedEntry.record_event(instance)
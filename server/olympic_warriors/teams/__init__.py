@@ -0,0 +1,3 @@
+from .balance import TeamBalance, TeamBalancer, balance_teams
+from .builder import EditionRoster, TeamBuildError, build_teams, load_edition_roster
+from .rebalance import Rebalance, rebalance_edition_teams, rebalance_teams
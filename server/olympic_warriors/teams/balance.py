@@ -0,0 +1,287 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Weight of the variance of team totals against the variances of each dimension
+TOTAL_WEIGHT = 1.0
+# Cost of a broken team preference, outweighing any strength imbalance
+PREFERENCE_PENALTY = 1e6
+
+DEFAULT_ITERATIONS = 20000
+# Random swaps evaluated at once per iteration, the best one being tried
+CANDIDATES = 32
+
+
+@dataclass
+class TeamBalance:
+    """
+    Assignment of players to teams and its balance.
+
+    The score is the objective minimized: the weighted variances across teams of their
+    per-dimension and total strengths, plus a penalty per broken preference.
+    """
+
+    assignment: np.ndarray
+    score: float
+    strength_spread: float
+    broken_preferences: int
+    iterations: int
+
+
+class TeamBalancer:
+    """
+    Objective of the balance of teams, with incremental updates on swaps.
+
+    Each team keeps the sum of the rating vectors of its players, so that the cost of
+    swapping or moving players is computed from the two team sums in O(dimensions).
+    Preferences are kept as the affinity of each player to each team, updated in
+    O(players) on swaps and moves. Team strengths are compared to the mean strength of a
+    team once every player is assigned.
+
+    @param ratings: rating of each player (rows) for each dimension (columns)
+    @param coefficients: coefficient of each dimension
+    @param assignment: team index of each player, -1 for players without a team
+    @param team_count: number of teams
+    @param together: pairs of player indices wishing to be in the same team
+    @param apart: pairs of player indices wishing not to be in the same team
+    """
+
+    def __init__(self, ratings, coefficients, assignment, team_count, together=(), apart=()):
+        self.ratings = np.asarray(ratings, dtype=float)
+        coefficients = np.asarray(coefficients, dtype=float)
+        self.weights = coefficients / coefficients.sum()
+        # Weighted strength of each player, one column per dimension and the total last
+        self.strengths = np.column_stack([self.ratings, self.ratings @ self.weights])
+        self.dimension_weights = np.append(self.weights, TOTAL_WEIGHT)
+        self.team_count = team_count
+        self.assignment = np.array(assignment, dtype=int)
+
+        assigned = self.assignment >= 0
+        self.team_sums = np.zeros((team_count, self.strengths.shape[1]))
+        np.add.at(self.team_sums, self.assignment[assigned], self.strengths[assigned])
+        self.mean = self.strengths.sum(axis=0) / team_count
+
+        player_count = len(self.assignment)
+        self.affinities = np.zeros((player_count, player_count))
+        for pairs, affinity in ((together, 1), (apart, -1)):
+            for player1, player2 in pairs:
+                if player1 == player2:
+                    continue
+                self.affinities[player1, player2] = self.affinities[player2, player1] = affinity
+        memberships = np.zeros((player_count, team_count))
+        memberships[np.flatnonzero(assigned), self.assignment[assigned]] = 1
+        self.team_affinities = self.affinities @ memberships
+
+    def strength_cost(self) -> float:
+        """
+        Weighted variances of the team strengths, per dimension and in total.
+        """
+        variances = ((self.team_sums - self.mean) ** 2).mean(axis=0)
+        return float(variances @ self.dimension_weights)
+
+    def strength_spread(self) -> float:
+        """
+        Difference between the total strengths of the strongest and weakest teams.
+        """
+        totals = self.team_sums[:, -1]
+        return float(totals.max() - totals.min())
+
+    def team_sizes(self) -> np.ndarray:
+        """
+        Number of players of each team.
+        """
+        return np.bincount(self.assignment[self.assignment >= 0], minlength=self.team_count)
+
+    def broken_preferences(self) -> int:
+        """
+        Number of preferences broken by the current assignment, players without a team
+        breaking the preferences to be with them.
+        """
+        same_team = (self.assignment[:, None] == self.assignment[None, :]) & (
+            self.assignment[:, None] >= 0
+        )
+        upper = np.triu(self.affinities, k=1)
+        return int(
+            np.count_nonzero((upper > 0) & ~same_team) + np.count_nonzero((upper < 0) & same_team)
+        )
+
+    def score(self) -> float:
+        """
+        Objective to minimize.
+        """
+        return self.strength_cost() + PREFERENCE_PENALTY * self.broken_preferences()
+
+    def swap_deltas(self, players1: np.ndarray, players2: np.ndarray) -> np.ndarray:
+        """
+        Change of the objective for each swap of two players of different teams,
+        without applying them.
+
+        @param players1: index of the first player of each swap
+        @param players2: index of the second player of each swap
+
+        @return: change of the objective of each swap
+        """
+        teams1, teams2 = self.assignment[players1], self.assignment[players2]
+        difference = self.strengths[players2] - self.strengths[players1]
+        # Sum of squares change of both teams: 2d(S1 - S2) + 2d²
+        strength_deltas = (
+            2 * difference * (self.team_sums[teams1] - self.team_sums[teams2] + difference)
+        ) @ self.dimension_weights / self.team_count
+
+        pair_affinities = self.affinities[players1, players2]
+        same_team_gains = (
+            self.team_affinities[players1, teams2] - self.team_affinities[players1, teams1]
+            + self.team_affinities[players2, teams1] - self.team_affinities[players2, teams2]
+            - 2 * pair_affinities
+        )
+        return strength_deltas - PREFERENCE_PENALTY * same_team_gains
+
+    def move_deltas(self, players: np.ndarray, teams: np.ndarray) -> np.ndarray:
+        """
+        Change of the objective for each move of a player to another team, without
+        applying them.
+
+        @param players: index of the player of each move, with or without a team
+        @param teams: index of the destination team of each move
+
+        @return: change of the objective of each move
+        """
+        origins = self.assignment[players]
+        assigned = origins >= 0
+        strengths = self.strengths[players]
+        # Sum of squares change of the destination team: x(2(S2 - m) + x), and of the
+        # origin team if any: x(x - 2(S1 - m))
+        changes = strengths * (2 * (self.team_sums[teams] - self.mean) + strengths)
+        changes += np.where(
+            assigned[:, None],
+            strengths * (strengths - 2 * (self.team_sums[origins] - self.mean)),
+            0,
+        )
+        strength_deltas = changes @ self.dimension_weights / self.team_count
+
+        same_team_gains = self.team_affinities[players, teams] - np.where(
+            assigned, self.team_affinities[players, origins], 0
+        )
+        return strength_deltas - PREFERENCE_PENALTY * same_team_gains
+
+    def move(self, player: int, team: int) -> None:
+        """
+        Move a player, with or without a team, to another team.
+        """
+        origin = self.assignment[player]
+        if origin >= 0:
+            self.team_sums[origin] -= self.strengths[player]
+            self.team_affinities[:, origin] -= self.affinities[:, player]
+        self.team_sums[team] += self.strengths[player]
+        self.team_affinities[:, team] += self.affinities[:, player]
+        self.assignment[player] = team
+
+    def sample_swaps(self, rng, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Draw random swaps of players of different teams.
+
+        @param rng: NumPy random generator
+        @param size: number of swaps drawn, swaps within a team being then dropped
+
+        @return: index of the first and second player of each swap
+        """
+        players1 = rng.integers(len(self.assignment), size=size)
+        players2 = rng.integers(len(self.assignment), size=size)
+        swaps = self.assignment[players1] != self.assignment[players2]
+        return players1[swaps], players2[swaps]
+
+    def swap(self, player1: int, player2: int) -> None:
+        """
+        Swap two players of different teams, updating team sums and affinities.
+        """
+        team1, team2 = self.assignment[player1], self.assignment[player2]
+        difference = self.strengths[player2] - self.strengths[player1]
+        self.team_sums[team1] += difference
+        self.team_sums[team2] -= difference
+        affinity_difference = self.affinities[:, player2] - self.affinities[:, player1]
+        self.team_affinities[:, team1] += affinity_difference
+        self.team_affinities[:, team2] -= affinity_difference
+        self.assignment[player1], self.assignment[player2] = team2, team1
+
+
+def snake_draft(strengths: np.ndarray, team_count: int) -> np.ndarray:
+    """
+    Assign players to teams in a snake draft by decreasing strength.
+
+    @param strengths: total strength of each player
+    @param team_count: number of teams
+
+    @return: team index of each player
+    """
+    assignment = np.empty(len(strengths), dtype=int)
+    for pick, player in enumerate(np.argsort(-strengths, kind="stable")):
+        draft_round, position = divmod(pick, team_count)
+        assignment[player] = position if draft_round % 2 == 0 else team_count - 1 - position
+    return assignment
+
+
+def balance_teams(
+    ratings,
+    coefficients,
+    team_count: int,
+    together=(),
+    apart=(),
+    iterations: int = DEFAULT_ITERATIONS,
+    seed: int = None,
+) -> TeamBalance:
+    """
+    Split players into balanced teams of sizes differing by at most one, with simulated
+    annealing over swaps of players starting from a snake draft.
+
+    Each iteration evaluates a batch of random swaps at once and tries the best one,
+    accepted if it improves the objective or with a probability decreasing with the
+    temperature otherwise.
+
+    @param ratings: rating of each player (rows) for each dimension (columns)
+    @param coefficients: coefficient of each dimension
+    @param team_count: number of teams
+    @param together: pairs of player indices wishing to be in the same team
+    @param apart: pairs of player indices wishing not to be in the same team
+    @param iterations: number of iterations
+    @param seed: seed of the random generator, for reproducible teams
+
+    @return: best assignment found and its balance
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    coefficients = np.asarray(coefficients, dtype=float)
+    initial = snake_draft(ratings @ (coefficients / coefficients.sum()), team_count)
+    balancer = TeamBalancer(ratings, coefficients, initial, team_count, together, apart)
+    player_count = len(initial)
+
+    score = balancer.score()
+    best_assignment, best_score = balancer.assignment.copy(), score
+    if team_count > 1 and player_count > 1:
+        rng = np.random.default_rng(seed)
+        # The temperature starts around the cost of a typical swap and cools geometrically
+        deltas = np.abs(balancer.swap_deltas(*balancer.sample_swaps(rng, CANDIDATES * 4)))
+        deltas = deltas[deltas < PREFERENCE_PENALTY]
+        start_temperature = max(float(deltas.mean()) if len(deltas) else 0.0, 1e-9)
+        cooling = math.log(1e-4) / iterations
+
+        for iteration in range(iterations):
+            players1, players2 = balancer.sample_swaps(rng, CANDIDATES)
+            if not len(players1):
+                continue
+            deltas = balancer.swap_deltas(players1, players2)
+            best = int(np.argmin(deltas))
+            temperature = start_temperature * math.exp(cooling * iteration)
+            if deltas[best] < 0 or rng.random() < math.exp(-deltas[best] / temperature):
+                balancer.swap(players1[best], players2[best])
+                score += deltas[best]
+                if score < best_score - 1e-9:
+                    best_assignment, best_score = balancer.assignment.copy(), score
+
+    balancer = TeamBalancer(ratings, coefficients, best_assignment, team_count, together, apart)
+    return TeamBalance(
+        assignment=best_assignment,
+        score=balancer.score(),
+        strength_spread=balancer.strength_spread(),
+        broken_preferences=balancer.broken_preferences(),
+        iterations=iterations,
+    )
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+from olympic_warriors.models import Player, PlayerRating, Team, TeamPreference
+
+from .balance import DEFAULT_ITERATIONS, TeamBalance, balance_teams
+
+
+class TeamBuildError(ValueError):
+    """
+    Raised when the teams of an edition cannot be built.
+    """
+
+
+@dataclass
+class EditionRoster:
+    """
+    Active players of an edition as NumPy arrays, ready to be balanced.
+    """
+
+    player_ids: list[int]
+    team_ids: list[int]
+    ratings: np.ndarray
+    coefficients: np.ndarray
+    assignment: np.ndarray
+    together: list[tuple[int, int]]
+    apart: list[tuple[int, int]]
+
+
+def load_edition_roster(edition) -> EditionRoster:
+    """
+    Load the active players, teams, rating vectors and preferences of an edition in four
+    queries.
+
+    Missing ratings default to the global rating of the player. Players without a team
+    are assigned -1.
+
+    @param edition: edition to load
+
+    @return: roster of the edition
+    """
+    team_ids = list(
+        Team.objects.filter(edition=edition, is_active=True).order_by("id").values_list(
+            "id", flat=True
+        )
+    )
+    players = list(
+        Player.objects.filter(edition=edition, is_active=True).order_by("id").values_list(
+            "id", "rating", "team_id"
+        )
+    )
+    player_ids = [player_id for player_id, _, _ in players]
+    player_indices = {player_id: index for index, player_id in enumerate(player_ids)}
+    team_indices = {team_id: index for index, team_id in enumerate(team_ids)}
+    dimensions = {rating["id"]: index for index, rating in enumerate(edition.ratings.values())}
+
+    ratings = np.repeat(
+        np.array([rating for _, rating, _ in players], dtype=float)[:, None],
+        len(dimensions),
+        axis=1,
+    )
+    for player_id, identifier, rating in PlayerRating.objects.filter(
+        player__in=player_ids, identifier__in=dimensions, is_active=True
+    ).values_list("player_id", "identifier", "rating"):
+        ratings[player_indices[player_id], dimensions[identifier]] = rating
+
+    together, apart = [], []
+    for player_id, other_player_id, kind in TeamPreference.objects.filter(
+        player__in=player_ids, other_player__in=player_ids, is_active=True
+    ).values_list("player_id", "other_player_id", "kind"):
+        pairs = together if kind == TeamPreference.Kinds.TOGETHER else apart
+        pairs.append((player_indices[player_id], player_indices[other_player_id]))
+
+    return EditionRoster(
+        player_ids=player_ids,
+        team_ids=team_ids,
+        ratings=ratings,
+        coefficients=np.array([rating["coef"] for rating in edition.ratings.values()]),
+        assignment=np.array([team_indices.get(team_id, -1) for _, _, team_id in players]),
+        together=together,
+        apart=apart,
+    )
+
+
+def build_teams(
+    edition, iterations: int = DEFAULT_ITERATIONS, seed: int = None, commit: bool = True
+) -> TeamBalance:
+    """
+    Split the active players of an edition into its active teams, balancing their
+    strength overall and in each rating dimension while respecting team preferences.
+
+    @param edition: edition whose teams are built
+    @param iterations: number of iterations of the annealing
+    @param seed: seed of the random generator, for reproducible teams
+    @param commit: whether to save the teams of the players, in one query
+
+    @return: balance of the teams built
+    @raise TeamBuildError: if the edition has no active team or player
+    """
+    roster = load_edition_roster(edition)
+    if not roster.team_ids:
+        raise TeamBuildError(f"{edition} has no active team, create the teams first.")
+    if not roster.player_ids:
+        raise TeamBuildError(f"{edition} has no active player.")
+
+    balance = balance_teams(
+        roster.ratings,
+        roster.coefficients,
+        len(roster.team_ids),
+        together=roster.together,
+        apart=roster.apart,
+        iterations=iterations,
+        seed=seed,
+    )
+
+    if commit:
+        with transaction.atomic():
+            Player.objects.bulk_update(
+                [
+                    Player(id=player_id, team_id=roster.team_ids[team_index])
+                    for player_id, team_index in zip(roster.player_ids, balance.assignment)
+                ],
+                ["team"],
+            )
+    return balance
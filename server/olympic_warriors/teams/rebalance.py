@@ -0,0 +1,192 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.db import transaction
+from olympic_warriors.models import Player
+
+from .balance import TeamBalancer
+from .builder import TeamBuildError, load_edition_roster
+
+# Spread of team total strengths considered balanced, a player being rated 1 to 10
+DEFAULT_TOLERANCE = 2.0
+# Maximum number of swaps and moves of a rebalancing, on top of placing new players
+DEFAULT_MAX_CHANGES = 50
+
+
+@dataclass
+class Rebalance:
+    """
+    Changes restoring the balance of teams, with player and team indices.
+
+    Moves are (player, origin team, destination team), the origin being -1 for players
+    without a team. Swaps are pairs of players exchanging their teams.
+    """
+
+    assignment: np.ndarray
+    moves: list[tuple[int, int, int]] = field(default_factory=list)
+    swaps: list[tuple[int, int]] = field(default_factory=list)
+    score_before: float = 0.0
+    score: float = 0.0
+    strength_spread_before: float = 0.0
+    strength_spread: float = 0.0
+    broken_preferences: int = 0
+    is_balanced: bool = False
+
+
+def _best_move(balancer: TeamBalancer, players: np.ndarray, teams: np.ndarray):
+    """
+    Get the best of the moves of each player to each team.
+
+    @return: player, team and change of the objective of the best move
+    """
+    players, teams = np.repeat(players, len(teams)), np.tile(teams, len(players))
+    candidates = balancer.assignment[players] != teams
+    players, teams = players[candidates], teams[candidates]
+    if not len(players):
+        return None, None, np.inf
+    deltas = balancer.move_deltas(players, teams)
+    best = int(np.argmin(deltas))
+    return int(players[best]), int(teams[best]), float(deltas[best])
+
+
+def rebalance_teams(
+    ratings,
+    coefficients,
+    assignment,
+    team_count: int,
+    together=(),
+    apart=(),
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_changes: int = DEFAULT_MAX_CHANGES,
+) -> Rebalance:
+    """
+    Restore the balance of teams after players withdrew or joined, with as few changes as
+    possible to the current assignment.
+
+    Players without a team are first placed, strongest first, in the best of the smallest
+    teams. Players then move from the largest teams to the smallest ones until their sizes
+    differ by at most one. Finally, while the spread of team strengths exceeds the
+    tolerance, the best swap, or move keeping sizes balanced, is applied as long as it
+    improves the objective. Every candidate is scored from the team rating sums, without
+    recomputing team totals.
+
+    @param ratings: rating of each player (rows) for each dimension (columns)
+    @param coefficients: coefficient of each dimension
+    @param assignment: current team index of each player, -1 for players without a team
+    @param team_count: number of teams
+    @param together: pairs of player indices wishing to be in the same team
+    @param apart: pairs of player indices wishing not to be in the same team
+    @param tolerance: spread of team total strengths considered balanced
+    @param max_changes: maximum number of swaps and moves after placing new players
+
+    @return: changes applied and the resulting balance
+    """
+    balancer = TeamBalancer(ratings, coefficients, assignment, team_count, together, apart)
+    assignment = balancer.assignment
+    rebalance = Rebalance(
+        assignment=assignment,
+        score_before=balancer.score(),
+        strength_spread_before=balancer.strength_spread(),
+    )
+
+    def move(player, team):
+        rebalance.moves.append((player, int(assignment[player]), team))
+        balancer.move(player, team)
+
+    # New players, strongest first, join the smallest teams
+    unassigned = np.flatnonzero(assignment < 0)
+    for player in unassigned[np.argsort(-balancer.strengths[unassigned, -1], kind="stable")]:
+        sizes = balancer.team_sizes()
+        move(*_best_move(balancer, np.array([player]), np.flatnonzero(sizes == sizes.min()))[:2])
+
+    # Players of the largest teams join the smallest ones
+    sizes = balancer.team_sizes()
+    while sizes.max() - sizes.min() > 1:
+        player, team, _ = _best_move(
+            balancer,
+            np.flatnonzero(assignment == sizes.argmax()),
+            np.flatnonzero(sizes == sizes.min()),
+        )
+        move(player, team)
+        sizes = balancer.team_sizes()
+
+    players1, players2 = np.triu_indices(len(assignment), k=1)
+    changes = 0
+    while balancer.strength_spread() > tolerance and changes < max_changes:
+        swaps = assignment[players1] != assignment[players2]
+        swap_deltas = balancer.swap_deltas(players1[swaps], players2[swaps])
+        best_swap = int(np.argmin(swap_deltas)) if len(swap_deltas) else None
+
+        # Moves from larger teams to smaller ones keep sizes within one
+        sizes = balancer.team_sizes()
+        player, team, move_delta = (None, None, np.inf)
+        if sizes.max() > sizes.min():
+            player, team, move_delta = _best_move(
+                balancer,
+                np.flatnonzero(sizes[assignment] == sizes.max()),
+                np.flatnonzero(sizes == sizes.min()),
+            )
+
+        if best_swap is not None and swap_deltas[best_swap] <= move_delta:
+            if swap_deltas[best_swap] >= 0:
+                break
+            player1 = int(players1[swaps][best_swap])
+            player2 = int(players2[swaps][best_swap])
+            rebalance.swaps.append((player1, player2))
+            balancer.swap(player1, player2)
+        else:
+            if move_delta >= 0:
+                break
+            move(player, team)
+        changes += 1
+
+    rebalance.score = balancer.score()
+    rebalance.strength_spread = balancer.strength_spread()
+    rebalance.broken_preferences = balancer.broken_preferences()
+    rebalance.is_balanced = rebalance.strength_spread <= tolerance
+    return rebalance
+
+
+def rebalance_edition_teams(
+    edition, tolerance: float = DEFAULT_TOLERANCE, commit: bool = True
+) -> tuple[Rebalance, dict[int, int]]:
+    """
+    Rebalance the teams of an edition from the current teams of its active players.
+
+    @param edition: edition whose teams are rebalanced
+    @param tolerance: spread of team total strengths considered balanced
+    @param commit: whether to save the new teams of the players, in one query
+
+    @return: rebalancing and the new team id of each player that changed team
+    @raise TeamBuildError: if the edition has no active team or player
+    """
+    roster = load_edition_roster(edition)
+    if not roster.team_ids:
+        raise TeamBuildError(f"{edition} has no active team, create the teams first.")
+    if not roster.player_ids:
+        raise TeamBuildError(f"{edition} has no active player.")
+
+    rebalance = rebalance_teams(
+        roster.ratings,
+        roster.coefficients,
+        roster.assignment,
+        len(roster.team_ids),
+        together=roster.together,
+        apart=roster.apart,
+        tolerance=tolerance,
+    )
+    new_teams = {
+        roster.player_ids[index]: roster.team_ids[team_index]
+        for index, (team_index, previous_index) in enumerate(
+            zip(rebalance.assignment, roster.assignment)
+        )
+        if team_index != previous_index
+    }
+
+    if commit and new_teams:
+        with transaction.atomic():
+            Player.objects.bulk_update(
+                [Player(id=player_id, team_id=team_id) for player_id, team_id in new_teams.items()],
+                ["team"],
+            )
+    return rebalance, new_teams
@@ -0,0 +1,265 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from olympic_warriors.events import replay_discipline
+from olympic_warriors.grading import AnswerIndex, grade_blindtest_round, normalize_answer
+from olympic_warriors.models import (
+    Edition, Team, TeamResult, Blindtest, BlindtestRound, BlindtestGuess, Player
+)
+from rest_framework.test import APIClient
+
+
+class TestBlindtestProvisioning(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+
+    def create_blindtest(self, teams_count, **kwargs):
+        Team.objects.filter(edition=self.edition).delete()
+        Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=self.edition) for i in range(teams_count)]
+        )
+        with CaptureQueriesContext(connection) as context:
+            blindtest = Blindtest.objects.create(edition=self.edition, **kwargs)
+        return blindtest, len(context.captured_queries)
+
+    def test_provisioning_queries_do_not_grow(self):
+        _, small_queries = self.create_blindtest(5, round_count=6)
+        blindtest, large_queries = self.create_blindtest(20, round_count=6)
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(BlindtestRound.objects.filter(blindtest=blindtest).count(), 6)
+        self.assertEqual(
+            BlindtestGuess.objects.filter(blindtest_round__blindtest=blindtest).count(), 120
+        )
+
+    def test_reprovisioning(self):
+        blindtest, _ = self.create_blindtest(4, round_count=5)
+        Team.objects.create(name="Late team", edition=self.edition)
+        self.assertEqual(
+            BlindtestGuess.objects.filter(blindtest_round__blindtest=blindtest).count(), 25
+        )
+
+        blindtest.round_count = 3
+        blindtest.save()
+        self.assertEqual(
+            list(blindtest.blindtest.filter(is_active=True).values_list("order", flat=True)),
+            [1, 2, 3],
+        )
+
+        # Rounds deactivated by organizers stay inactive on team and round count changes
+        blindtest.blindtest.filter(order=2).update(is_active=False)
+        Team.objects.create(name="Later team", edition=self.edition)
+        blindtest.round_count = 4
+        blindtest.save()
+        self.assertEqual(
+            list(blindtest.blindtest.filter(is_active=True).values_list("order", flat=True)),
+            [1, 3, 4],
+        )
+
+
+class TestBlindtestGrading(TestCase):
+
+    def setUp(self):
+        edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        Team.objects.bulk_create([Team(name=f"Team {i}", edition=edition) for i in range(4)])
+        self.blindtest = Blindtest.objects.create(edition=edition, round_count=1)
+        self.round = self.blindtest.blindtest.get()
+        self.round.artist = "Beyoncé"
+        self.round.song = "Crazy in Love (feat. Jay-Z)"
+        self.round.artist_aliases = ["Queen B"]
+        self.round.save()
+
+    def test_answer_key_is_hidden(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="player"))
+        for url in [
+            f"/blindtest/round/{self.round.id}/",
+            f"/blindtest/rounds/blindtest/{self.blindtest.id}/",
+        ]:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.data if isinstance(response.data, list) else [response.data]
+            for field in ["artist", "song", "artist_aliases", "song_aliases"]:
+                self.assertNotIn(field, data[0])
+            self.assertNotIn("Beyoncé", str(response.content, "utf-8"))
+
+    def test_normalize_answer(self):
+        self.assertEqual(normalize_answer("  Beyoncé ft. Jay-Z "), "beyonce")
+        self.assertEqual(
+            normalize_answer("The Beatles - Hey Jude (Remastered)"), "beatles hey jude"
+        )
+        self.assertTrue(AnswerIndex(["Crazy in Love"]).matches("crazy in lvoe"))
+        self.assertFalse(AnswerIndex(["Crazy in Love"]).matches("Drunk in Love"))
+
+    def test_grade_round(self):
+        answers = [("beyonce", "crazy in love"), ("Queen B!", "Halo"), ("Rihanna", ""), ("", "")]
+        guesses = list(self.round.blindtest_round.order_by("team_id"))
+        for guess, (artist, song) in zip(guesses, answers):
+            guess.artist, guess.song = artist, song
+        BlindtestGuess.objects.bulk_update(guesses, ["artist", "song"])
+
+        grading = grade_blindtest_round(self.round.id)
+        self.assertEqual((grading.graded, grading.changed), (4, 2))
+        points = dict(
+            TeamResult.objects.filter(discipline=self.blindtest).values_list("team_id", "points")
+        )
+        self.assertEqual([points[guess.team_id] for guess in guesses], [2, 1, 0, 0])
+
+        # Grading again with the guesses fixed only applies the differences
+        guesses[1].refresh_from_db()
+        guesses[1].song = "Crazy In Love"
+        guesses[1].save()
+        grading = grade_blindtest_round(self.round.id)
+        self.assertEqual(grading.points, {guesses[1].team_id: 1})
+
+    def test_grading_is_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="player"))
+        response = client.post(f"/blindtest/round/{self.round.id}/grade/", {}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        client.force_authenticate(User.objects.create(username="organizer", is_staff=True))
+        response = client.post(f"/blindtest/round/{self.round.id}/grade/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["graded"], 4)
+
+    def test_deactivated_rounds_do_not_count(self):
+        def points():
+            return sorted(
+                TeamResult.objects.filter(discipline=self.blindtest).values_list(
+                    "team_id", "points"
+                )
+            )
+
+        self.blindtest.round_count = 2
+        self.blindtest.save()
+        second_round = self.blindtest.blindtest.get(order=2)
+        second_round.artist = "Beyoncé"
+        second_round.save()
+        second_round.blindtest_round.update(artist="Beyonce")
+        grade_blindtest_round(second_round.id)
+        graded_points = points()
+        self.assertEqual([points for _, points in graded_points], [1, 1, 1, 1])
+
+        # Results and replays agree that the points of deactivated rounds do not count
+        self.blindtest.round_count = 1
+        self.blindtest.save()
+        self.assertEqual([points for _, points in points()], [0, 0, 0, 0])
+        self.assertEqual(replay_discipline(self.blindtest.id).diffs, [])
+
+        self.blindtest.round_count = 2
+        self.blindtest.save()
+        self.assertEqual(points(), graded_points)
+        self.assertEqual(replay_discipline(self.blindtest.id).diffs, [])
+
+
+class TestBlindtestSubmission(TestCase):
+
+    def setUp(self):
+        edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        self.team, self.other_team = Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=edition) for i in range(2)]
+        )
+        user = User.objects.create(username="player")
+        Player.objects.create(edition=edition, user=user, rating=5, team=self.team)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        blindtest = Blindtest.objects.create(edition=edition, round_count=2)
+        self.round, self.closed_round = blindtest.blindtest.order_by("order")
+        self.round.is_open = True
+        self.round.save()
+        self.guess = self.round.blindtest_round.get(team=self.team)
+
+    def test_submit_guess(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f"/blindtest/guess/{self.guess.id}/answer/", {"song": "Halo"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.guess.refresh_from_db()
+        self.assertEqual(self.guess.song, "Halo")
+        self.assertEqual(
+            len([query for query in context.captured_queries
+                 if query["sql"].startswith("UPDATE")]),
+            1,
+        )
+
+    def test_rejected_submissions(self):
+        other_guess = self.round.blindtest_round.get(team=self.other_team)
+        closed_guess = self.closed_round.blindtest_round.get(team=self.team)
+        for guess_id, status in ((other_guess.id, 403), (closed_guess.id, 409), (0, 404)):
+            response = self.client.patch(
+                f"/blindtest/guess/{guess_id}/answer/", {"artist": "Beyoncé"}, format="json"
+            )
+            self.assertEqual(response.status_code, status)
+
+        response = self.client.post(
+            "/blindtest/guesses/submit/",
+            {"guesses": [
+                {"id": self.guess.id, "artist": "Beyoncé"},
+                {"id": other_guess.id, "artist": "Beyoncé"},
+                {"id": closed_guess.id, "song": "Halo"},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["submitted"], [self.guess.id])
+        self.assertEqual(response.data["rejected"], sorted([other_guess.id, closed_guess.id]))
+        self.assertEqual(
+            list(BlindtestGuess.objects.exclude(artist="").values_list("id", flat=True)),
+            [self.guess.id],
+        )
+
+
+class TestBlindtestLoadTest(TransactionTestCase):
+
+    def setUp(self):
+        edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        teams = Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=edition) for i in range(2)]
+        )
+        for team in teams:
+            user = User.objects.create(username=f"player{team.id}")
+            Player.objects.create(edition=edition, user=user, rating=5, team=team)
+        self.blindtest = Blindtest.objects.create(edition=edition, round_count=1)
+
+    def test_load_test_runs_on_inactive_blindtests(self):
+        with self.assertRaises(CommandError):
+            call_command("loadtest_blindtest_guesses", self.blindtest.id)
+
+        self.blindtest.is_active = False
+        self.blindtest.save()
+        out = io.StringIO()
+        call_command(
+            "loadtest_blindtest_guesses", self.blindtest.id, submissions=4, concurrency=2,
+            max_p99_ms=10000, stdout=out,
+        )
+        self.assertIn("4 submissions, 0 rejected", out.getvalue())
+        # The temporary round is deleted and the real ones are left untouched
+        self.assertEqual(BlindtestRound.objects.filter(blindtest=self.blindtest).count(), 1)
+        self.assertFalse(BlindtestGuess.objects.exclude(artist="").exists())
@@ -0,0 +1,381 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from olympic_warriors.models import (
+    Edition, FeedEntry, Team, TeamResult, Game, Player, Rugby, RugbyEvent, Dodgeball,
+    DodgeballEvent
+)
+from olympic_warriors.events import EventBatchError, ingest_game_events, replay_discipline
+
+
+class TestGameScores(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="scorekeeper", is_staff=True))
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=self.edition) for i in range(6)]
+        )
+        self.rugby = Rugby.objects.create(edition=self.edition, pairing_system="RR")
+        self.round = self.rugby.rounds.get(order=0)
+
+    def points(self):
+        return dict(
+            TeamResult.objects.filter(discipline=self.rugby).values_list("team_id", "points")
+        )
+
+    def test_submit_round_scores(self):
+        games = list(Game.objects.filter(round=self.round).order_by("id"))
+        scores = [
+            {"game_id": game.id, "score1": 3 + i, "score2": i}
+            for i, game in enumerate(games)
+        ]
+        points = self.points()
+
+        response = self.client.post("/games/scores/", {"scores": scores}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["games"]), len(games))
+        self.assertEqual(len(response.data["standings"]), 6)
+
+        # Scheduled games are draws, turned into wins for team 1
+        for game in games:
+            points[game.team1_id] += 2
+            points[game.team2_id] -= 1
+        self.assertEqual(self.points(), points)
+
+        # Submitting the same scores again does not change anything
+        response = self.client.post("/games/scores/", {"scores": scores}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.points(), points)
+
+    def test_submit_scores_errors(self):
+        game = Game.objects.filter(round=self.round).first()
+
+        player_client = APIClient()
+        player_client.force_authenticate(User.objects.create(username="player"))
+        response = player_client.post(
+            "/games/scores/",
+            {"scores": [{"game_id": game.id, "score1": 1, "score2": 0}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(
+            "/games/scores/",
+            {"scores": [{"game_id": game.id, "score1": 1, "score2": 0}] * 2},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/games/scores/",
+            {"scores": [
+                {"game_id": game.id, "score1": 1, "score2": 0},
+                {"game_id": 0, "score1": 1, "score2": 0},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+        game.refresh_from_db()
+        self.assertEqual((game.score1, game.score2), (0, 0))
+
+
+class TestRugbyGameSetup(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=self.edition) for i in range(3)]
+        )
+        self.rugby = Rugby.objects.create(edition=self.edition, pairing_system="RR")
+        self.game = Game.objects.filter(discipline=self.rugby).first()
+        self.players = {}
+        for team_id in (self.game.team1_id, self.game.team2_id):
+            user = User.objects.create(username=f"player{team_id}")
+            self.players[team_id] = Player.objects.create(
+                user=user, edition=self.edition, rating=5, team_id=team_id
+            )
+        self.time = timezone.now()
+
+    def event(self, event_type, team_id):
+        self.time += timedelta(seconds=1)
+        return RugbyEvent.objects.create(
+            game=self.game, player1=self.players[team_id], event_type=event_type, time=self.time
+        )
+
+    def score(self):
+        self.game.refresh_from_db()
+        return self.game.score1, self.game.score2
+
+
+class TestRugbyEvents(TestRugbyGameSetup):
+
+    def test_try_points(self):
+        team1_id, team2_id = self.game.team1_id, self.game.team2_id
+        self.event(RugbyEvent.RugbyEventTypes.START, team1_id)
+        self.event(RugbyEvent.RugbyEventTypes.TACKLE, team2_id)
+        self.event(RugbyEvent.RugbyEventTypes.TACKLE, team2_id)
+        try_event = self.event(RugbyEvent.RugbyEventTypes.TRY, team1_id)
+        self.assertEqual(try_event.points, 1)
+        self.assertEqual(self.score(), (1, 0))
+
+        self.event(RugbyEvent.RugbyEventTypes.TACKLE, team2_id)
+        self.event(RugbyEvent.RugbyEventTypes.TACKLE, team1_id)
+        self.assertEqual(self.event(RugbyEvent.RugbyEventTypes.TRY, team2_id).points, 2)
+        self.assertEqual(self.score(), (1, 2))
+
+        # Removing a tackle replays the game state, removing a try takes its points back
+        tackle = RugbyEvent.objects.filter(event_type=RugbyEvent.RugbyEventTypes.TACKLE).first()
+        tackle.is_active = False
+        tackle.save()
+        self.assertEqual(self.game.rugby_state.tackles_against_team1, 0)
+        try_event.is_active = False
+        try_event.save()
+        self.assertEqual(self.score(), (0, 2))
+
+    def test_try_queries_do_not_grow(self):
+        team1_id, team2_id = self.game.team1_id, self.game.team2_id
+        self.event(RugbyEvent.RugbyEventTypes.START, team1_id)
+        self.event(RugbyEvent.RugbyEventTypes.TRY, team1_id)
+        with CaptureQueriesContext(connection) as first:
+            self.event(RugbyEvent.RugbyEventTypes.TRY, team1_id)
+        for _ in range(20):
+            self.event(RugbyEvent.RugbyEventTypes.TACKLE, team2_id)
+            self.event(RugbyEvent.RugbyEventTypes.TACKLE, team1_id)
+        with CaptureQueriesContext(connection) as last:
+            self.event(RugbyEvent.RugbyEventTypes.TRY, team1_id)
+        self.assertEqual(len(first.captured_queries), len(last.captured_queries))
+
+
+class TestGameEventBatch(TestRugbyGameSetup):
+
+    def test_batch_is_idempotent(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="scorekeeper", is_staff=True))
+        team1_id, team2_id = self.game.team1_id, self.game.team2_id
+        events = [
+            (RugbyEvent.RugbyEventTypes.TRY, team1_id),
+            (RugbyEvent.RugbyEventTypes.START, team1_id),
+            (RugbyEvent.RugbyEventTypes.TACKLE, team2_id),
+        ]
+        # Sent out of order, applied in time order
+        payload = {"events": [
+            {
+                "idempotency_key": f"phone-{i}",
+                "game": self.game.id,
+                "player1": self.players[team_id].id,
+                "time": (self.time + timedelta(seconds=[3, 1, 2][i])).isoformat(),
+                "event_type": event_type,
+            }
+            for i, (event_type, team_id) in enumerate(events)
+        ]}
+
+        player_client = APIClient()
+        player_client.force_authenticate(User.objects.create(username="player"))
+        response = player_client.post("/events/batch/", payload, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        response = client.post("/events/batch/", payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["created"]), 3)
+        self.assertEqual(response.data["games"][0]["score1"], 2)
+
+        response = client.post("/events/batch/", payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["duplicates"]), 3)
+        self.assertEqual(RugbyEvent.objects.count(), 3)
+        self.assertEqual(self.score(), (2, 0))
+
+        # A key repeated within a batch is applied once and reported as a duplicate
+        payload["events"][2]["idempotency_key"] = "phone-3"
+        payload["events"][1]["idempotency_key"] = "phone-3"
+        response = client.post("/events/batch/", payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data["created"]), ["phone-3"])
+        self.assertEqual(
+            response.data["duplicates"]["phone-3"], response.data["created"]["phone-3"]
+        )
+        self.assertEqual(RugbyEvent.objects.count(), 4)
+
+        payload["events"][0].update(idempotency_key="phone-4", event_type="HIT")
+        response = client.post("/events/batch/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(RugbyEvent.objects.count(), 4)
+
+
+class TestScoreReplay(TestRugbyGameSetup):
+
+    def test_replay_reports_and_fixes_diffs(self):
+        team1_id, team2_id = self.game.team1_id, self.game.team2_id
+        self.event(RugbyEvent.RugbyEventTypes.START, team1_id)
+        self.event(RugbyEvent.RugbyEventTypes.TACKLE, team2_id)
+        self.event(RugbyEvent.RugbyEventTypes.TRY, team1_id)
+        self.assertEqual(replay_discipline(self.rugby.id).diffs, [])
+
+        # Corrupt stored values as a missed or double-applied delta would
+        Game.objects.filter(id=self.game.id).update(score1=7)
+        TeamResult.objects.filter(team=team2_id, discipline=self.rugby).update(points=42)
+        replay = replay_discipline(self.rugby.id)
+        self.assertEqual(
+            {(diff.kind, diff.stored, diff.expected) for diff in replay.diffs},
+            {("game", (7, 0), (2, 0)), ("result", 42, replay.team_points[team2_id])},
+        )
+
+        out = StringIO()
+        call_command("rebuild_scores", edition=self.edition.id, fix=True, stdout=out)
+        self.assertIn("2 differences fixed", out.getvalue())
+        self.assertEqual(self.score(), (2, 0))
+        self.assertEqual(replay_discipline(self.rugby.id).diffs, [])
+
+
+class TestFeed(TestRugbyGameSetup):
+
+    def test_feed_since_cursor(self):
+        # Entries of the setup are numbered as if its transaction committed
+        FeedEntry.sequence_entries([self.edition.id])
+        client = APIClient()
+        response = client.get("/feed/", {"edition": self.edition.id})
+        self.assertEqual(response.status_code, 200)
+        cursor = response.data["cursor"]
+
+        # Results are recorded along the leaderboard, once the score is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event(RugbyEvent.RugbyEventTypes.START, self.game.team1_id)
+            self.event(RugbyEvent.RugbyEventTypes.TRY, self.game.team1_id)
+
+        response = client.get("/feed/", {"edition": self.edition.id, "since": cursor})
+        kinds = [entry["kind"] for entry in response.data["entries"]]
+        self.assertEqual(kinds, ["EVT", "EVT", "GAM", "RES"])
+        self.assertEqual(response.data["entries"][2]["payload"]["score1"], 3)
+        self.assertGreater(response.data["cursor"], cursor)
+
+        response = client.get(
+            "/feed/", {"edition": self.edition.id, "since": response.data["cursor"]}
+        )
+        self.assertEqual(response.data["entries"], [])
+        self.assertFalse(response.data["has_more"])
+
+    def test_feed_follows_commit_order(self):
+        FeedEntry.sequence_entries([self.edition.id])
+        client = APIClient()
+        cursor = client.get("/feed/", {"edition": self.edition.id}).data["cursor"]
+
+        def commit_entry(entry_id):
+            entry = FeedEntry.objects.create(
+                id=entry_id,
+                edition=self.edition,
+                kind=FeedEntry.Kinds.RESULTS,
+                object_id=self.rugby.id,
+            )
+            FeedEntry.sequence_entries([self.edition.id])
+            return entry.id
+
+        # A transaction that inserted its entry first commits after another one
+        last_id = FeedEntry.objects.latest("id").id
+        first_commit_id = commit_entry(last_id + 2)
+        response = client.get("/feed/", {"edition": self.edition.id, "since": cursor})
+        self.assertEqual([entry["id"] for entry in response.data["entries"]], [first_commit_id])
+
+        last_commit_id = commit_entry(last_id + 1)
+        response = client.get(
+            "/feed/", {"edition": self.edition.id, "since": response.data["cursor"]}
+        )
+        self.assertEqual([entry["id"] for entry in response.data["entries"]], [last_commit_id])
+
+
+class TestDodgeballEvents(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=self.edition) for i in range(3)]
+        )
+        self.dodgeball = Dodgeball.objects.create(edition=self.edition, pairing_system="RR")
+        self.game = Game.objects.filter(discipline=self.dodgeball).first()
+        self.players = {}
+        for team_id in (self.game.team1_id, self.game.team2_id):
+            user = User.objects.create(username=f"player{team_id}")
+            self.players[team_id] = Player.objects.create(
+                user=user, edition=self.edition, rating=5, team_id=team_id
+            )
+        self.team_ids = (self.game.team1_id, self.game.team2_id)
+        self.time = timezone.now()
+
+    def event(self, event_type, team1_id, team2_id=None):
+        self.time += timedelta(seconds=1)
+        return DodgeballEvent.objects.create(
+            game=self.game,
+            player1=self.players[team1_id],
+            player2=self.players[team2_id] if team2_id else None,
+            event_type=event_type,
+            time=self.time,
+        )
+
+    def score(self):
+        self.game.refresh_from_db()
+        return self.game.score1, self.game.score2
+
+    def test_round_end(self):
+        team1_id, team2_id = self.team_ids
+        self.event(DodgeballEvent.DodgeballEventTypes.START, team1_id)
+        self.event(DodgeballEvent.DodgeballEventTypes.HIT, team1_id, team2_id)
+        self.event(DodgeballEvent.DodgeballEventTypes.HIT, team1_id, team2_id)
+        catch = self.event(DodgeballEvent.DodgeballEventTypes.CATCH, team2_id, team1_id)
+        self.event(DodgeballEvent.DodgeballEventTypes.HIT, team1_id, team2_id)
+        self.assertEqual(self.score(), (0, 0))
+        last_hit = self.event(DodgeballEvent.DodgeballEventTypes.HIT, team1_id, team2_id)
+        self.assertTrue(last_hit.ended_round)
+        self.assertEqual(self.score(), (1, 0))
+
+        # Events after the end of the round do not count until a new round starts
+        self.event(DodgeballEvent.DodgeballEventTypes.FOUL, team2_id)
+        self.event(DodgeballEvent.DodgeballEventTypes.NEW_ROUND, team1_id)
+        for _ in range(3):
+            self.event(DodgeballEvent.DodgeballEventTypes.FOUL, team1_id)
+        self.assertEqual(self.score(), (1, 1))
+        self.assertEqual(self.game.dodgeball_state.round_number, 2)
+
+        # Removing the catch makes the previous hit end the first round instead
+        catch.is_active = False
+        catch.save()
+        last_hit.refresh_from_db()
+        self.assertFalse(last_hit.ended_round)
+        self.assertEqual(self.score(), (1, 1))
+
+    def test_batch_requires_player2(self):
+        team1_id, team2_id = self.team_ids
+        event = {
+            "idempotency_key": "hit",
+            "game": self.game.id,
+            "player1": self.players[team1_id].id,
+            "event_type": DodgeballEvent.DodgeballEventTypes.HIT,
+        }
+        with self.assertRaises(EventBatchError) as error:
+            ingest_game_events([event])
+        self.assertEqual(error.exception.errors, {0: "Player 2 is required."})
+
+        event["player2"] = self.players[team2_id].id
+        self.assertEqual(list(ingest_game_events([event]).created), ["hit"])
@@ -0,0 +1,130 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from olympic_warriors.models import (
+    Edition, Team, TeamResult, Crossfit, Fair, Game, TeamSportRound
+)
+from rest_framework.test import APIClient
+
+
+class TestLeaderboard(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        self.teams = [
+            Team.objects.create(name=f"Team {i}", edition=self.edition) for i in range(4)
+        ]
+        self.fair = Fair.objects.create(edition=self.edition, reveal_score=True)
+        self.crossfit = Crossfit.objects.create(edition=self.edition, reveal_score=False)
+
+    def set_points(self, points):
+        for team, value in zip(self.teams, points):
+            result = TeamResult.objects.get(team=team, discipline=self.fair)
+            result.points = value
+            result.save()
+
+    def assert_matches_computed(self):
+        for team in Team.objects.select_related("leaderboard_entry"):
+            self.assertEqual(team.total_points, team.compute_total_points())
+            self.assertEqual(team.ranking, team.compute_ranking())
+
+    def test_leaderboard_follows_results(self):
+        self.set_points([10, 30, 20, 20])
+        self.assert_matches_computed()
+        self.assertEqual(self.teams[1].leaderboard_entry.ranking, 1)
+        self.assertEqual(
+            self.teams[1].leaderboard_entry.breakdown,
+            {str(self.fair.id): 6, str(self.crossfit.id): 0}
+        )
+
+    def test_leaderboard_follows_reveal_score(self):
+        for team, time in zip(self.teams, ["00:10:00", "00:12:00", "00:08:00", "00:09:00"]):
+            result = TeamResult.objects.get(team=team, discipline=self.crossfit)
+            result.time = time
+            result.save()
+        self.assertEqual(Team.objects.get(id=self.teams[2].id).total_points, 6)
+
+        self.crossfit.reveal_score = True
+        self.crossfit.save()
+        self.assert_matches_computed()
+        self.assertEqual(Team.objects.get(id=self.teams[2].id).total_points, 12)
+
+    def test_leaderboard_ignores_inactive_teams(self):
+        self.set_points([10, 30, 20, 5])
+        self.teams[1].is_active = False
+        self.teams[1].save()
+        self.assertEqual(Team.objects.get(id=self.teams[2].id).ranking, 1)
+
+    def test_with_ranking_matches_properties(self):
+        self.set_points([10, 30, 20, 20])
+        for time, team in zip(["00:10:00", None, "00:08:00", "00:09:00"], self.teams):
+            TeamResult.objects.filter(team=team, discipline=self.crossfit).update(time=time)
+        self.crossfit.reveal_score = True
+        self.crossfit.save()
+
+        with self.assertNumQueries(1):
+            results = list(TeamResult.objects.filter(is_active=True).with_ranking())
+        for result in results:
+            plain = TeamResult.objects.get(id=result.id)
+            if plain.time is None and plain.discipline_id == self.crossfit.id:
+                self.assertEqual(result.ranking, 4)
+                continue
+            self.assertEqual(result.ranking, plain.ranking)
+            self.assertEqual(result.global_points, plain.global_points)
+
+    def test_result_endpoints_rank_disciplines(self):
+        self.set_points([10, 30, 20, 20])
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="viewer"))
+        result = TeamResult.objects.get(team=self.teams[2], discipline=self.fair)
+
+        with self.assertNumQueries(1):
+            ranked = TeamResult.objects.get_ranked(result.id)
+        self.assertEqual((ranked.ranking, ranked.global_points), (2, 4))
+        response = client.get(f"/result/{result.id}/")
+        self.assertEqual((response.data["ranking"], response.data["global_points"]), (2, 4))
+
+        # A leftover inactive result of the team does not duplicate the rows of its discipline
+        TeamResult.objects.create(
+            team=self.teams[2], discipline=self.fair, points=0, is_active=False
+        )
+        response = client.get(f"/results/team/{self.teams[2].id}/")
+        self.assertEqual(
+            sorted((row["discipline"], row["ranking"]) for row in response.data),
+            sorted([(self.fair.id, 2), (self.crossfit.id, 0)]),
+        )
+
+        result.is_active = False
+        result.save()
+        self.assertEqual(client.get(f"/result/{result.id}/").status_code, 404)
+
+    def test_game_scores_propagate_deltas(self):
+        game_round = TeamSportRound.objects.create(discipline=self.fair, order=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.create(
+                discipline=self.fair,
+                round=game_round,
+                team1=self.teams[0],
+                team2=self.teams[1],
+                referees=self.teams[2],
+                edition=self.edition,
+            )
+
+        def points():
+            return [
+                TeamResult.objects.get(team=team, discipline=self.fair).points
+                for team in self.teams[:2]
+            ]
+
+        for score1, score2, expected in [
+            (0, 0, [1, 1]), (2, 1, [3, 0]), (2, 5, [0, 3]), (3, 3, [1, 1]), (4, 3, [3, 0])
+        ]:
+            with self.captureOnCommitCallbacks(execute=True):
+                game.score1, game.score2 = score1, score2
+                game.save()
+            self.assertEqual(points(), expected)
+            self.assert_matches_computed()
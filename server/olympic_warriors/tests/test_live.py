@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TestCase
+from olympic_warriors.live import LocalBroker, get_broker
+from olympic_warriors.models import Edition, FeedEntry, Team, Game, Rugby
+from olympic_warriors.views import streamLive
+
+
+class TestLiveBroker(TestCase):
+
+    def test_publish_from_another_thread(self):
+        broker = LocalBroker()
+
+        async def receive():
+            subscription = broker.subscribe(["edition:1"])
+            other = broker.subscribe(["edition:2"])
+            thread = threading.Thread(
+                target=broker.publish, args=(["edition:1", "discipline:3"], {"id": 1})
+            )
+            thread.start()
+            message = await asyncio.wait_for(subscription.get(), timeout=1)
+            thread.join()
+            broker.unsubscribe(subscription)
+            broker.unsubscribe(other)
+            return message, other.queue.qsize()
+
+        self.assertEqual(asyncio.run(receive()), ({"id": 1}, 0))
+        self.assertEqual(broker._subscriptions, {})
+
+    def test_feed_entries_published_on_commit(self):
+        edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        Team.objects.bulk_create([Team(name=f"Team {i}", edition=edition) for i in range(3)])
+        rugby = Rugby.objects.create(edition=edition, pairing_system="RR")
+        game = Game.objects.filter(discipline=rugby).first()
+        FeedEntry.sequence_entries([edition.id])
+
+        with mock.patch.object(get_broker(), "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                game.score1 = 2
+                game.save()
+                publish.assert_not_called()
+
+        channels = [call.args[0] for call in publish.call_args_list]
+        self.assertIn([f"edition:{edition.id}", f"discipline:{rugby.id}"], channels)
+        self.assertEqual(publish.call_args_list[0].args[1]["payload"]["score1"], 2)
+
+
+class TestLiveStream(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        for sequence in range(1, 4):
+            self.entry(sequence)
+
+    def entry(self, sequence):
+        return FeedEntry.objects.create(
+            edition=self.edition,
+            kind=FeedEntry.Kinds.GAME,
+            object_id=sequence,
+            payload={"discipline": 1},
+            sequence=sequence,
+        )
+
+    def publish(self, entry):
+        get_broker().publish(
+            [f"edition:{self.edition.id}"],
+            {
+                "id": entry.id,
+                "sequence": entry.sequence,
+                "kind": entry.kind,
+                "object_id": entry.object_id,
+                "payload": entry.payload,
+            },
+        )
+
+    async def test_stream_follows_sequences(self):
+        request = AsyncRequestFactory().get(
+            f"/live/edition/{self.edition.id}/", headers={"Last-Event-ID": "0"}
+        )
+        # Missed entries are read in pages of two
+        with mock.patch("olympic_warriors.views.SUBSCRIPTION_MAX_SIZE", 2):
+            response = await streamLive(request, self.edition.id)
+            chunks = response.streaming_content
+
+            async def received(count):
+                sequences = []
+                while len(sequences) < count:
+                    chunk = (await asyncio.wait_for(anext(chunks), timeout=1)).decode()
+                    if chunk.startswith("id: "):
+                        sequences.append(int(chunk.split("\n")[0].removeprefix("id: ")))
+                return sequences
+
+            try:
+                self.assertEqual(await received(3), [1, 2, 3])
+
+                # The entry numbered 4 is published after the entry numbered 5
+                entry4 = await sync_to_async(self.entry)(4)
+                entry5 = await sync_to_async(self.entry)(5)
+                self.publish(entry5)
+                self.assertEqual(await received(2), [4, 5])
+                self.publish(entry4)
+                self.publish(await sync_to_async(self.entry)(6))
+                self.assertEqual(await received(1), [6])
+            finally:
+                await chunks.aclose()
@@ -0,0 +1,123 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from olympic_warriors.models import (
+    Blindtest,
+    BlindtestRound,
+    Edition,
+    Fair,
+    Game,
+    Player,
+    PlayerRating,
+    Team,
+    TeamResult,
+    TeamSportRound,
+)
+from rest_framework.test import APIClient
+
+
+class TestListQueries(TestCase):
+    """
+    List endpoints run a constant number of queries, whatever the number of rows.
+    """
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        self.discipline = Fair.objects.create(edition=self.edition, reveal_score=True)
+        self.round = TeamSportRound.objects.create(discipline=self.discipline, order=1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="viewer"))
+
+    def add_rows(self, count):
+        for _ in range(count):
+            index = Team.objects.count()
+            team = Team.objects.create(name=f"Team {index}", edition=self.edition)
+            player = Player.objects.create(
+                edition=self.edition,
+                user=User.objects.create(username=f"player{index}"),
+                rating=5,
+                team=team,
+            )
+            PlayerRating.objects.create(player=player, name="Cardio", identifier="CARD", rating=5)
+            Game.objects.create(
+                discipline=self.discipline,
+                round=self.round,
+                team1=team,
+                team2=team,
+                referees=team,
+                edition=self.edition,
+            )
+            TeamResult.objects.create(team=team, discipline=self.discipline, points=index)
+        self.player, self.team = player, team
+        self.result = TeamResult.objects.get(team=team)
+
+    def assert_constant_queries(self, urls):
+        """
+        Pin each endpoint to the number of queries it runs with a few rows, after
+        adding more rows.
+        """
+        self.add_rows(2)
+        counts = {}
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(urls[url]):
+                response = self.client.get(url.format(self=self))
+                self.assertEqual(response.status_code, 200)
+                # Detail endpoints are only pinned to their number of queries
+                counts[url] = len(response.data) if isinstance(response.data, list) else 0
+
+        self.add_rows(5)
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(urls[url]):
+                response = self.client.get(url.format(self=self))
+                if counts[url] > 1:
+                    self.assertGreater(len(response.data), counts[url])
+
+    def test_player_queries(self):
+        self.assert_constant_queries(
+            {
+                "/players/": 1,
+                "/players/edition/{self.edition.id}/": 1,
+                "/players/team/{self.team.id}/": 1,
+                "/ratings/": 1,
+                "/ratings/player/{self.player.id}/": 1,
+            }
+        )
+
+    def test_result_queries(self):
+        self.assert_constant_queries(
+            {
+                "/results/": 1,
+                "/results/edition/{self.edition.id}/": 1,
+                "/results/discipline/{self.discipline.id}/": 1,
+                "/results/team/{self.team.id}/": 1,
+                "/result/{self.result.id}/": 1,
+                "/disciplines/": 2,
+                "/disciplines/{self.edition.id}/": 2,
+            }
+        )
+
+    def test_nested_queries(self):
+        self.blindtest = Blindtest.objects.create(edition=self.edition, round_count=1)
+        self.blindtest_round = BlindtestRound.objects.get(blindtest=self.blindtest)
+        self.assert_constant_queries(
+            {
+                "/teams/": 2,
+                "/team/{self.team.id}/": 2,
+                "/rounds/discipline/{self.discipline.id}/": 2,
+                "/round/{self.round.id}/": 2,
+                "/blindtest/rounds/blindtest/{self.blindtest.id}/": 2,
+                "/blindtest/round/{self.blindtest_round.id}/": 2,
+            }
+        )
+
+        Game.objects.filter(team1=self.team).update(is_active=False)
+        response = self.client.get(f"/round/{self.round.id}/")
+        self.assertEqual(len(response.data["games"]), 6)
+        response = self.client.get(f"/blindtest/round/{self.blindtest_round.id}/")
+        self.assertEqual(len(response.data["guesses"]), 7)
+        response = self.client.get(f"/team/{self.team.id}/")
+        self.assertEqual([player["id"] for player in response.data["players"]], [self.player.id])
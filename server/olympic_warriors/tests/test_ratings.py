@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from olympic_warriors.models import Edition
+from olympic_warriors.ratings import score_players, weighted_ratings
+
+
+class TestRatings(SimpleTestCase):
+
+    def test_score_players(self):
+        ratings = np.array([[10, 10], [5, 1], [2, 2], [2, 2]])
+        weighted, global_rating = score_players(ratings, [1, 3], [10, 5, 8, 3])
+        # Low ratings of confident players are boosted
+        np.testing.assert_allclose(weighted, [10, 5, 5, 2])
+        np.testing.assert_allclose(global_rating, [10, 5, 7.4, 2.8])
+        np.testing.assert_allclose(weighted_ratings([[0, 0], [12, 12]], [1, 1]), [1, 10])
+
+    def test_edition_ratings(self):
+        edition = Edition()
+        df = pd.DataFrame(
+            [[5] * len(edition.ratings), [1] * len(edition.ratings)], columns=list(edition.ratings)
+        )
+        df["Global Level Estimation for Olympic Warriors 2025"] = [7, 6]
+        df = edition.process_global_rating(edition.process_weighted_rating(df))
+        self.assertEqual(df["Weighted_Rating"].tolist(), [5, 2.5])
+        self.assertEqual(df["Global_Rating"].tolist(), [6.6, 5.3])
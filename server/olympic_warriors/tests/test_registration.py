@@ -0,0 +1,155 @@
+import io
+import tempfile
+from unittest import mock
+
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from olympic_warriors.models import Edition, Player, PlayerRating, RegistrationImportJob
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+class TestRegistrationImport(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        self.headers = {column: header for header, column in Edition.header_mapping.items()}
+
+    def registration_form(self, names, cardio=5):
+        df = pd.DataFrame({"Name": names})
+        for rating in Edition.ratings:
+            df[rating] = 5
+        df["Cardio"] = cardio
+        df["Global Level Estimation for Olympic Warriors 2025"] = 6
+        return io.StringIO(df.rename(columns=self.headers).to_csv(index=False))
+
+    def import_form(self, names):
+        with CaptureQueriesContext(connection) as context:
+            result = self.edition.create_players_from_registration_form(
+                self.registration_form(names)
+            )
+        return result, len(context.captured_queries)
+
+    def test_import_queries_do_not_grow(self):
+        User.objects.create_user(username="janedoe", first_name="Jane", last_name="Doe")
+        _, small_queries = self.import_form(["Jane Doe", "John Smith"])
+        result, large_queries = self.import_form([f"Player {i}" for i in range(15)])
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual((result.users, result.players, result.ratings), (15, 15, 150))
+
+        user = User.objects.get(username="player0")
+        self.assertEqual((user.first_name, user.last_name), ("Player", "0"))
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(Token.objects.filter(user=user).exists())
+        self.assertEqual(Player.objects.get(user=user).rating, 5)
+        self.assertEqual(PlayerRating.objects.filter(player__user=user).count(), 10)
+        self.assertEqual(Player.objects.filter(edition=self.edition).count(), 17)
+
+    def test_reimport(self):
+        self.import_form(["Jane Doe", "John Smith", "Max Power"])
+        jane = Player.objects.get(user__username="janedoe")
+        # Duplicate ratings left by an import predating registration hashes
+        Player.objects.filter(id=jane.id).update(registration_hash="")
+        PlayerRating.objects.create(player=jane, name="Cardio", identifier="CARD", rating=5)
+
+        result, _ = self.import_form(["Jane Doe", "John Smith", "Max Power"])
+        self.assertEqual((result.updated_players, result.unchanged_players), (1, 2))
+        self.assertEqual(PlayerRating.objects.count(), 30)
+
+        with CaptureQueriesContext(connection) as context:
+            result = self.edition.create_players_from_registration_form(
+                self.registration_form(["Jane Doe", "John Smith", "Max Power"], cardio=[5, 8, 5])
+            )
+        self.assertEqual((result.players, result.ratings), (0, 0))
+        self.assertEqual((result.updated_players, result.unchanged_players), (1, 2))
+        self.assertEqual(PlayerRating.objects.count(), 30)
+        self.assertEqual(
+            PlayerRating.objects.get(player__user__username="johnsmith", identifier="CARD").rating,
+            8,
+        )
+        writes = [
+            query["sql"].split()[0] for query in context.captured_queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        self.assertEqual(writes, ["UPDATE", "UPDATE"])
+
+        with CaptureQueriesContext(connection) as context:
+            result = self.edition.create_players_from_registration_form(
+                self.registration_form(["Jane Doe", "John Smith", "Max Power"], cardio=[5, 8, 5])
+            )
+        self.assertEqual(result.unchanged_players, 3)
+        self.assertFalse(
+            [query for query in context.captured_queries
+             if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+        )
+
+    def test_import_job(self):
+        form = self.registration_form(
+            ["Jane Doe", None, "John Smith", "Max Power", "Ann Lee"], cardio=[5, 5, 11, 5, 5]
+        )
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            self.edition.registration_form = SimpleUploadedFile(
+                "registrations.csv", form.getvalue().encode()
+            )
+            self.edition.save()
+            job = RegistrationImportJob.objects.get(edition=self.edition)
+            self.assertEqual(job.status, RegistrationImportJob.Statuses.PENDING)
+            self.assertFalse(Player.objects.exists())
+
+            call_command("run_registration_imports", once=True, chunk_size=2, stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, RegistrationImportJob.Statuses.DONE)
+        self.assertEqual((job.processed_rows, job.created_players), (5, 3))
+        self.assertEqual(
+            job.errors,
+            [
+                {"line": 3, "error": "Missing name"},
+                {"line": 4, "error": "Invalid Cardio: 11"},
+            ],
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="admin", is_staff=True))
+        response = client.get(f"/registration/import/{job.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["progress"], 1)
+
+    def run_import_job(self, form):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            self.edition.registration_form = SimpleUploadedFile(
+                "registrations.csv", form.getvalue().encode()
+            )
+            self.edition.save()
+            call_command("run_registration_imports", once=True, stdout=io.StringIO())
+        return RegistrationImportJob.objects.get(edition=self.edition)
+
+    def test_import_job_reports_ratings_that_are_not_numbers(self):
+        job = self.run_import_job(
+            self.registration_form(["Jane Doe", "John Smith"], cardio=["5", "fast"])
+        )
+        self.assertEqual(job.status, RegistrationImportJob.Statuses.DONE)
+        self.assertEqual((job.processed_rows, job.created_players), (2, 1))
+        self.assertEqual(job.errors, [{"line": 3, "error": "Invalid Cardio: not a number"}])
+
+    def test_import_job_fails_on_unexpected_errors(self):
+        with mock.patch(
+            "olympic_warriors.registration.jobs.registration_errors",
+            side_effect=RuntimeError("database is gone"),
+        ):
+            job = self.run_import_job(self.registration_form(["Jane Doe"]))
+        self.assertEqual(job.status, RegistrationImportJob.Statuses.FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(
+            job.errors, [{"line": None, "error": "Import failed: database is gone"}]
+        )
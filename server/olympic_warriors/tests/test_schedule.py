@@ -0,0 +1,152 @@
+import io
+import json
+from collections import Counter
+from itertools import permutations
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from olympic_warriors.models import Edition, Team, TeamResult, Game, Rugby, TeamSportRound
+from olympic_warriors.schedule.referees import RefereeAllocator, solve_assignment
+from olympic_warriors.schedule.round_robin import compute_round_robin_schedule
+from olympic_warriors.schedule.swiss import compute_swiss_round
+
+
+class TestRoundRobinSchedule(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+
+    def create_rugby(self, teams_count):
+        Team.objects.bulk_create(
+            [Team(name=f"Team {i}", edition=self.edition) for i in range(teams_count)]
+        )
+        with CaptureQueriesContext(connection) as context:
+            rugby = Rugby.objects.create(edition=self.edition, pairing_system="RR")
+        return rugby, len(context.captured_queries)
+
+    def test_round_robin_games(self):
+        rugby, _ = self.create_rugby(8)
+        games = Game.objects.filter(discipline=rugby)
+        pairings = Counter(frozenset((game.team1_id, game.team2_id)) for game in games)
+
+        self.assertEqual(len(pairings), 28)
+        self.assertEqual(max(pairings.values()), 1)
+        for game in games:
+            self.assertNotIn(game.referees_id, (game.team1_id, game.team2_id))
+
+        # Games are created as draws
+        played = Counter(team_id for pairing in pairings for team_id in pairing)
+        for team_result in TeamResult.objects.filter(discipline=rugby):
+            self.assertEqual(team_result.points, played[team_result.team_id])
+
+    def test_round_robin_query_count_is_constant(self):
+        _, small_count = self.create_rugby(6)
+        Team.objects.all().delete()
+        _, large_count = self.create_rugby(12)
+        self.assertEqual(small_count, large_count)
+
+
+class TestRefereeAllocation(TestCase):
+
+    def test_solve_assignment_is_optimal(self):
+        cost = [[4, 1, 3, 7], [2, 0, 5, 1], [3, 2, 2, 6]]
+        assignment = solve_assignment(cost)
+        best = min(
+            sum(cost[row][column] for row, column in enumerate(columns))
+            for columns in permutations(range(4), 3)
+        )
+        self.assertEqual(len(set(assignment)), 3)
+        self.assertEqual(sum(cost[row][column] for row, column in enumerate(assignment)), best)
+
+    def test_referee_distribution(self):
+        team_ids = list(range(1, 17))
+        allocator = RefereeAllocator(team_ids)
+        rounds = compute_round_robin_schedule(team_ids, 15, allocator)
+
+        for scheduled_round in rounds:
+            for game in scheduled_round.games:
+                self.assertNotIn(game.referee_id, (game.team1_id, game.team2_id))
+        report = allocator.report()
+        self.assertEqual(sum(report["counts"].values()), sum(len(r.games) for r in rounds))
+        self.assertLessEqual(report["spread"], 1)
+
+
+class TestSwissSchedule(TestCase):
+
+    def test_swiss_round_pairs_close_scores_without_rematch(self):
+        scores = {1: 9, 2: 9, 3: 6, 4: 6, 5: 3, 6: 3, 7: 0}
+        scheduled_round, byes = compute_swiss_round(
+            2, scores, {frozenset((1, 2)), frozenset((3, 4))}, {7: 1}
+        )
+        pairings = {frozenset((game.team1_id, game.team2_id)) for game in scheduled_round.games}
+
+        self.assertEqual(pairings, {frozenset((1, 3)), frozenset((2, 4)), frozenset((5, 7))})
+        self.assertEqual(byes, [6])
+
+    def test_swiss_rounds_are_scheduled_when_rounds_end(self):
+        edition = Edition.objects.create(
+            year=2025, host="Paris", start_date="2025-08-21", end_date="2025-08-24"
+        )
+        Team.objects.bulk_create([Team(name=f"Team {i}", edition=edition) for i in range(7)])
+        rugby = Rugby.objects.create(edition=edition, pairing_system="SW", max_rounds=5)
+
+        for order in range(5):
+            game_round = TeamSportRound.objects.get(discipline=rugby, order=order)
+            for game in Game.objects.filter(round=game_round):
+                game.score1 = game.team1_id % 3
+                game.save()
+            game_round.is_over = True
+            game_round.save()
+
+        games = Game.objects.filter(discipline=rugby)
+        pairings = Counter(frozenset((game.team1_id, game.team2_id)) for game in games)
+        self.assertEqual(TeamSportRound.objects.filter(discipline=rugby).count(), 5)
+        self.assertEqual(len(games), 15)
+        self.assertEqual(max(pairings.values()), 1)
+
+
+class TestSchedulePreview(TestCase):
+
+    def test_schedule_preview_does_not_write(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="organizer"))
+
+        response = client.get("/schedule/preview/", {"pairing_system": "RR", "teams": 9})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["rounds"]), 8)
+        self.assertLessEqual(response.data["referees"]["spread"], 3)
+        self.assertFalse(Game.objects.exists())
+
+        response = client.get("/schedule/preview/", {"pairing_system": "SW", "teams": 9})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["byes"], [[9]])
+
+        response = client.get(
+            "/schedule/preview/", {"pairing_system": "RR", "teams": 256, "max_rounds": 10000000}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_swiss_preview_stops_at_max_rounds(self):
+        edition = Edition.objects.create(
+            year=2025, host="Paris", start_date="2025-08-21", end_date="2025-08-24"
+        )
+        for index in range(4):
+            Team.objects.create(name=f"Team {index}", edition=edition)
+        rugby = Rugby.objects.create(edition=edition, pairing_system="SW", max_rounds=1)
+        # The only round was scheduled on creation
+        self.assertEqual(TeamSportRound.objects.filter(discipline=rugby).count(), 1)
+
+        with self.assertRaises(CommandError):
+            call_command("preview_schedule", discipline=rugby.id + 1000)
+        out = io.StringIO()
+        call_command("preview_schedule", discipline=rugby.id, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["rounds"], [])
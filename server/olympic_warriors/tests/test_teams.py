@@ -0,0 +1,150 @@
+from collections import Counter
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+from olympic_warriors.models import Edition, Player, PlayerRating, Team, TeamPreference
+from olympic_warriors.teams import (
+    TeamBalancer, TeamBuildError, balance_teams, build_teams, rebalance_edition_teams,
+    rebalance_teams,
+)
+from olympic_warriors.teams.balance import snake_draft
+
+
+class TestTeamBalance(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.ratings = rng.integers(1, 11, (41, 4))
+        self.coefficients = [1, 2, 3, 4]
+
+    def test_balance_teams(self):
+        together, apart = [(0, 1), (2, 3)], [(4, 5), (0, 6)]
+        balance = balance_teams(
+            self.ratings, self.coefficients, 4, together=together, apart=apart, seed=0
+        )
+        assignment = balance.assignment
+        self.assertEqual(sorted(np.bincount(assignment)), [10, 10, 10, 11])
+        self.assertEqual(balance.broken_preferences, 0)
+        self.assertEqual(assignment[0], assignment[1])
+        self.assertNotEqual(assignment[0], assignment[6])
+
+        draft = snake_draft(self.ratings @ np.array(self.coefficients) / 10, 4)
+        self.assertLess(
+            balance.score, TeamBalancer(self.ratings, self.coefficients, draft, 4).strength_cost()
+        )
+
+    def test_swap_deltas(self):
+        balancer = TeamBalancer(
+            self.ratings, self.coefficients, np.arange(41) % 4, 4, together=[(0, 1)], apart=[(0, 4)]
+        )
+        score = balancer.score()
+        for player1, player2 in ((0, 1), (1, 6), (7, 10)):
+            delta = balancer.swap_deltas(np.array([player1]), np.array([player2]))[0]
+            balancer.swap(player1, player2)
+            self.assertAlmostEqual(balancer.score(), score + delta)
+            score = balancer.score()
+
+    def test_self_preferences_are_ignored(self):
+        balancer = TeamBalancer(
+            self.ratings, self.coefficients, np.arange(41) % 4, 4, together=[(0, 0)], apart=[(1, 1)]
+        )
+        self.assertFalse(balancer.affinities.any())
+
+    def test_rebalance_teams(self):
+        balance = balance_teams(self.ratings, self.coefficients, 4, seed=0)
+        # The strongest players of a team withdraw and a player joins late
+        team = balance.assignment[0]
+        members = np.flatnonzero(balance.assignment == team)
+        strengths = self.ratings @ np.array(self.coefficients)
+        withdrawn = members[np.argsort(-strengths[members])[:3]]
+        keep = np.ones(len(self.ratings), dtype=bool)
+        keep[withdrawn] = False
+        ratings = np.vstack([self.ratings[keep], [[10, 10, 10, 10]]])
+        assignment = np.append(balance.assignment[keep], -1)
+
+        rebalance = rebalance_teams(ratings, self.coefficients, assignment, 4, tolerance=1)
+        self.assertTrue(rebalance.is_balanced)
+        self.assertLess(rebalance.strength_spread, rebalance.strength_spread_before)
+        self.assertEqual(rebalance.moves[0], (len(ratings) - 1, -1, team))
+        self.assertLessEqual(np.ptp(np.bincount(rebalance.assignment)), 1)
+        changed = np.count_nonzero(rebalance.assignment != assignment)
+        self.assertEqual(changed, len(rebalance.moves) + 2 * len(rebalance.swaps))
+        self.assertLess(changed, len(ratings) // 2)
+
+
+class TestBuildTeams(TestCase):
+
+    def setUp(self):
+        self.edition = Edition.objects.create(
+            year=2025,
+            host="Paris",
+            start_date="2025-08-21",
+            end_date="2025-08-24",
+        )
+        self.players = [
+            Player.objects.create(
+                edition=self.edition,
+                user=User.objects.create(username=f"player{i}"),
+                rating=i % 10 + 1,
+            )
+            for i in range(12)
+        ]
+        PlayerRating.objects.bulk_create(
+            [
+                PlayerRating(player=player, name=name, identifier=rating["id"], rating=i % 10 + 1)
+                for i, player in enumerate(self.players)
+                for name, rating in Edition.ratings.items()
+            ]
+        )
+
+    def test_build_teams(self):
+        with self.assertRaises(TeamBuildError):
+            build_teams(self.edition)
+
+        Team.objects.bulk_create([Team(name=f"Team {i}", edition=self.edition) for i in range(3)])
+        TeamPreference.objects.create(
+            player=self.players[0],
+            other_player=self.players[11],
+            kind=TeamPreference.Kinds.TOGETHER,
+        )
+        balance = build_teams(self.edition, seed=0)
+        self.assertEqual(balance.broken_preferences, 0)
+
+        teams = dict(Player.objects.values_list("id", "team_id"))
+        self.assertEqual(teams[self.players[0].id], teams[self.players[11].id])
+        self.assertEqual(sorted(Counter(teams.values()).values()), [4, 4, 4])
+
+        # Rebalancing a balanced edition changes nothing
+        rebalance, new_teams = rebalance_edition_teams(self.edition, tolerance=100)
+        self.assertEqual((rebalance.moves, rebalance.swaps, new_teams), ([], [], {}))
+
+        Player.objects.filter(id__in=[self.players[1].id, self.players[2].id]).update(
+            is_active=False
+        )
+        _, new_teams = rebalance_edition_teams(self.edition, tolerance=0)
+        self.assertTrue(new_teams)
+        teams = dict(Player.objects.filter(is_active=True).values_list("id", "team_id"))
+        self.assertLessEqual(np.ptp(list(Counter(teams.values()).values())), 1)
+
+    def test_preference_validation(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TeamPreference.objects.create(
+                player=self.players[0],
+                other_player=self.players[0],
+                kind=TeamPreference.Kinds.APART,
+            )
+
+        other_edition = Edition.objects.create(
+            year=2026, host="Lyon", start_date="2026-08-20", end_date="2026-08-23"
+        )
+        other_player = Player.objects.create(
+            edition=other_edition, user=self.players[1].user, rating=5
+        )
+        preference = TeamPreference(
+            player=self.players[0], other_player=other_player, kind=TeamPreference.Kinds.TOGETHER
+        )
+        with self.assertRaises(ValidationError):
+            preference.full_clean()
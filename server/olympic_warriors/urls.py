@@ -50,6 +50,11 @@ urlpatterns = [
     # editions
     path("edition/<int:edition_id>/", views.getEdition),
     path("editions/", views.getEditions),
+    path("registration/import/<int:job_id>/", views.getRegistrationImportJob),
+    path(
+        "registration/imports/edition/<int:edition_id>/",
+        views.getRegistrationImportJobsByEdition,
+    ),
     # teams
     path("team/<int:team_id>/", views.getTeam),
     path("teams/", views.getTeams),
@@ -82,9 +87,11 @@ urlpatterns = [
         views.getRefereedGamesByDisciplineAndTeam,
     ),
     path("games/round/<int:round>/", views.getGamesByRound),
+    path("games/scores/", views.submitGameScores),
     # game events
     path("event/<int:event_id>/", views.getGameEvent),
     path("event/create/", views.createGameEvent),
+    path("events/batch/", views.createGameEventBatch),
     path("event/<int:event_id>/delete/", views.deleteGameEvent),
     path("events/", views.getGameEvents),
     path("events/game/<int:game_id>/", views.getGameEventsByGame),
@@ -94,6 +101,11 @@ urlpatterns = [
     path("round/<int:round_id>/", views.getRound),
     path("rounds/", views.getRounds),
     path("rounds/discipline/<int:discipline_id>/", views.getRoundsByDiscipline),
+    # schedules
+    path("schedule/preview/", views.getSchedulePreview),
+    # feed
+    path("feed/", views.getFeed),
+    path("live/edition/<int:edition_id>/", views.streamLive),
     # blindtest guesses
     path("blindtest/guess/<int:guess_id>/", views.getBlindtestGuess),
     path("blindtest/guesses/", views.getBlindtestGuesses),
@@ -111,6 +123,8 @@ urlpatterns = [
     path("blindtest/rounds/blindtest/<int:blindtest_id>/", views.getBlindtestRoundsByBlindtest),
     path("blindtest/rounds/edition/<int:edition_id>/", views.getBlindtestRoundsByEdition),
     path("blindtest/guess/<int:guess_id>/answer/", views.setBlindtestGuessAnswer),
+    path("blindtest/guesses/submit/", views.submitBlindtestGuesses),
+    path("blindtest/round/<int:round_id>/grade/", views.gradeBlindtestRound),
     # team results
     path("result/<int:result_id>/", views.getTeamResult),
     path("results/", views.getTeamResults),
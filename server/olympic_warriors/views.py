@@ -2,8 +2,15 @@
 Logic for the Olympic Warriors app endpoints.
 """
 
-from django.db.models import Q
-from rest_framework.permissions import AllowAny
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.db.models import Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django.contrib.auth.models import User
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -17,12 +24,26 @@ from .serializer import (
     DisciplineSerializer,
     PlayerRatingSerializer,
     GameSerializer,
+    GameScoresSerializer,
+    GameScoresResultSerializer,
     GameEventSerializer,
+    GameEventBatchSerializer,
+    GameEventBatchResultSerializer,
     TeamSportRoundSerializer,
     TeamResultSerializer,
     BlindtestGuessSerializer,
     BlindtestGuessUpdateSerializer,
+    BlindtestGuessSubmissionSerializer,
+    BlindtestGuessBatchSerializer,
+    BlindtestGuessBatchResultSerializer,
     BlindtestRoundSerializer,
+    BlindtestRoundGradingQuerySerializer,
+    BlindtestRoundGradingSerializer,
+    SchedulePreviewQuerySerializer,
+    SchedulePreviewSerializer,
+    FeedQuerySerializer,
+    FeedSerializer,
+    RegistrationImportJobSerializer,
 )
 from .models import (
     Player,
@@ -36,7 +57,14 @@ from .models import (
     TeamResult,
     BlindtestGuess,
     BlindtestRound,
+    FeedEntry,
+    RegistrationImportJob,
 )
+from .schedule import preview_schedule
+from .events import EventBatchError, ingest_game_events
+from .grading import grade_blindtest_round
+from .live import get_broker
+from .live.broker import SUBSCRIPTION_MAX_SIZE
 
 # Users
 
@@ -67,6 +95,7 @@ def getUser(request, user_id):
 @api_view(["GET"])
 def getUsers(request):
     users = User.objects.all()
+    users = UserSerializer.setup_eager_loading(users)
     serializer = UserSerializer(users, many=True)
     return Response(serializer.data)
 
@@ -120,6 +149,7 @@ def getPlayers(request):
     Get all players.
     """
     players = Player.objects.filter(is_active=True)
+    players = PlayerSerializer.setup_eager_loading(players)
     serializer = PlayerSerializer(players, many=True)
     return Response(serializer.data)
 
@@ -135,6 +165,7 @@ def getPlayers(request):
 @api_view(["GET"])
 def getPlayersByEdition(request, edition_id):
     players = Player.objects.filter(edition=edition_id, is_active=True)
+    players = PlayerSerializer.setup_eager_loading(players)
     serializer = PlayerSerializer(players, many=True)
     return Response(serializer.data)
 
@@ -166,6 +197,7 @@ def getPlayerByUserAndEdition(request, user_id, edition_id):
 @api_view(["GET"])
 def getPlayersByTeam(request, team_id):
     players = Player.objects.filter(team=team_id, is_active=True)
+    players = PlayerSerializer.setup_eager_loading(players)
     serializer = PlayerSerializer(players, many=True)
     return Response(serializer.data)
 
@@ -203,10 +235,49 @@ def getEdition(request, edition_id):
 @api_view(["GET"])
 def getEditions(request):
     editions = Edition.objects.filter(is_active=True)
+    editions = EditionSerializer.setup_eager_loading(editions)
     serializer = EditionSerializer(editions, many=True)
     return Response(serializer.data)
 
 
+@extend_schema(
+    summary="Get the status of a registration import job by ID",
+    description="Polled by admins while a registration form is imported in the background.",
+    responses={
+        "200": RegistrationImportJobSerializer,
+        "403": OpenApiResponse(description="Forbidden"),
+        "404": OpenApiResponse(description="Registration import job not found"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def getRegistrationImportJob(request, job_id):
+    try:
+        job = RegistrationImportJob.objects.get(id=job_id)
+    except RegistrationImportJob.DoesNotExist:
+        return Response({"error": "Registration import job not found"}, status=404)
+    serializer = RegistrationImportJobSerializer(job)
+    return Response(serializer.data)
+
+
+@extend_schema(
+    summary="Get the registration import jobs of an edition, latest first",
+    responses={
+        "200": RegistrationImportJobSerializer(many=True),
+        "403": OpenApiResponse(description="Forbidden"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def getRegistrationImportJobsByEdition(request, edition_id):
+    jobs = RegistrationImportJob.objects.filter(edition=edition_id).order_by("-id")
+    jobs = RegistrationImportJobSerializer.setup_eager_loading(jobs)
+    serializer = RegistrationImportJobSerializer(jobs, many=True)
+    return Response(serializer.data)
+
+
 # Teams
 
 
@@ -222,7 +293,7 @@ def getEditions(request):
 @api_view(["GET"])
 def getTeam(request, team_id):
     try:
-        team = Team.objects.get(id=team_id)
+        team = TeamSerializer.setup_eager_loading(Team.objects).get(id=team_id)
     except Team.DoesNotExist:
         return Response({"error": "Team not found"}, status=404)
     serializer = TeamSerializer(team)
@@ -239,7 +310,7 @@ def getTeam(request, team_id):
 )
 @api_view(["GET"])
 def getTeams(request):
-    teams = Team.objects.filter(is_active=True)
+    teams = TeamSerializer.setup_eager_loading(Team.objects.filter(is_active=True))
     serializer = TeamSerializer(teams, many=True)
     return Response(serializer.data)
 
@@ -277,6 +348,7 @@ def getDiscipline(request, discipline_id):
 @api_view(["GET"])
 def getDisciplines(request):
     disciplines = Discipline.objects.filter(is_active=True)
+    disciplines = DisciplineSerializer.setup_eager_loading(disciplines)
     serializer = DisciplineSerializer(disciplines, many=True)
     return Response(serializer.data)
 
@@ -292,6 +364,7 @@ def getDisciplines(request):
 @api_view(["GET"])
 def getDisciplinesByEdition(request, edition_id):
     disciplines = Discipline.objects.filter(edition=edition_id, is_active=True)
+    disciplines = DisciplineSerializer.setup_eager_loading(disciplines)
     serializer = DisciplineSerializer(disciplines, many=True)
     return Response(serializer.data)
 
@@ -329,6 +402,7 @@ def getPlayerRating(request, rating_id):
 @api_view(["GET"])
 def getPlayerRatings(request):
     player_ratings = PlayerRating.objects.filter(is_active=True)
+    player_ratings = PlayerRatingSerializer.setup_eager_loading(player_ratings)
     serializer = PlayerRatingSerializer(player_ratings, many=True)
     return Response(serializer.data)
 
@@ -344,6 +418,7 @@ def getPlayerRatings(request):
 @api_view(["GET"])
 def getPlayerRatingsByPlayer(request, player_id):
     player_ratings = PlayerRating.objects.filter(player=player_id, is_active=True)
+    player_ratings = PlayerRatingSerializer.setup_eager_loading(player_ratings)
     serializer = PlayerRatingSerializer(player_ratings, many=True)
     return Response(serializer.data)
 
@@ -381,6 +456,7 @@ def getGame(request, game_id):
 @api_view(["GET"])
 def getGames(request):
     games = Game.objects.filter(is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -398,6 +474,7 @@ def getGamesByTeam(request, team_id):
     games = Game.objects.filter(
         (Q(team1=team_id) | Q(team2=team_id) | Q(referees=team_id)), is_active=True
     )
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -413,6 +490,7 @@ def getGamesByTeam(request, team_id):
 @api_view(["GET"])
 def getGamesByDiscipline(request, discipline_id):
     games = Game.objects.filter(discipline=discipline_id, is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -427,6 +505,7 @@ def getGamesByDiscipline(request, discipline_id):
 )
 def getPlayedGamesByTeam(request, team_id):
     games = Game.objects.filter((Q(team1=team_id) | Q(team2=team_id)), is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -441,6 +520,7 @@ def getPlayedGamesByTeam(request, team_id):
 )
 def getRefereedGamesByTeam(request, team_id):
     games = Game.objects.filter(referees=team_id, is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -456,6 +536,7 @@ def getRefereedGamesByTeam(request, team_id):
 @api_view(["GET"])
 def getGamesByEdition(request, edition_id):
     games = Game.objects.filter(discipline__edition=edition_id, is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -475,6 +556,7 @@ def getGamesByDisciplineAndTeam(request, discipline_id, team_id):
         discipline=discipline_id,
         is_active=True,
     )
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -494,6 +576,7 @@ def getPlayedGamesByDisciplineAndTeam(request, team_id, discipline_id):
         discipline=discipline_id,
         is_active=True,
     )
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -513,6 +596,7 @@ def getRefereedGamesByDisciplineAndTeam(request, team_id, discipline_id):
         discipline=discipline_id,
         is_active=True,
     )
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
@@ -528,10 +612,55 @@ def getRefereedGamesByDisciplineAndTeam(request, team_id, discipline_id):
 @api_view(["GET"])
 def getGamesByRound(request, round_id):
     games = Game.objects.filter(round=round_id, is_active=True)
+    games = GameSerializer.setup_eager_loading(games)
     serializer = GameSerializer(games, many=True)
     return Response(serializer.data)
 
 
+@extend_schema(
+    summary="Submit the scores of several games at once",
+    request=GameScoresSerializer,
+    responses={
+        "200": GameScoresResultSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "403": OpenApiResponse(description="Forbidden"),
+        "404": OpenApiResponse(description="Game not found"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def submitGameScores(request):
+    serializer = GameScoresSerializer(data=request.data)
+    try:
+        serializer.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    try:
+        games = Game.submit_scores(
+            {
+                score["game_id"]: (score["score1"], score["score2"])
+                for score in serializer.validated_data["scores"]
+            }
+        )
+    except Game.DoesNotExist as e:
+        return Response({"error": "Game not found", "details": str(e)}, status=404)
+
+    standings = (
+        TeamResultSerializer.setup_eager_loading(
+            TeamResult.objects.filter(
+                discipline__in={game.discipline_id for game in games}, is_active=True
+            )
+        )
+        .with_ranking()
+        .order_by("discipline", "annotated_ranking")
+    )
+    serializer = GameScoresResultSerializer({"games": games, "standings": standings})
+    return Response(serializer.data)
+
+
 # Game Events
 
 
@@ -565,6 +694,7 @@ def getGameEvent(request, event_id):
 @api_view(["GET"])
 def getGameEvents(request):
     events = GameEvent.objects.filter(is_active=True)
+    events = GameEventSerializer.setup_eager_loading(events)
     serializer = GameEventSerializer(events, many=True)
     return Response(serializer.data)
 
@@ -580,6 +710,7 @@ def getGameEvents(request):
 @api_view(["GET"])
 def getGameEventsByGame(request, game_id):
     events = GameEvent.objects.filter(game=game_id, is_active=True)
+    events = GameEventSerializer.setup_eager_loading(events)
     serializer = GameEventSerializer(events, many=True)
     return Response(serializer.data)
 
@@ -595,6 +726,7 @@ def getGameEventsByGame(request, game_id):
 @api_view(["GET"])
 def getGameEventsByPlayer(request, player_id):
     events = GameEvent.objects.filter(Q(player1=player_id) | Q(player2=player_id), is_active=True)
+    events = GameEventSerializer.setup_eager_loading(events)
     serializer = GameEventSerializer(events, many=True)
     return Response(serializer.data)
 
@@ -612,6 +744,7 @@ def getGameEventsByTeam(request, team_id):
     events = GameEvent.objects.filter(
         Q(player1__team=team_id) | Q(player2__team=team_id), is_active=True
     )
+    events = GameEventSerializer.setup_eager_loading(events)
     serializer = GameEventSerializer(events, many=True)
     return Response(serializer.data)
 
@@ -637,6 +770,46 @@ def createGameEvent(request):
     return Response(serializer.data)
 
 
+@extend_schema(
+    summary="Create a batch of typed game events",
+    description=(
+        "Events are applied in time order in one transaction. "
+        "Events whose idempotency key was already received are skipped."
+    ),
+    request=GameEventBatchSerializer,
+    responses={
+        "200": GameEventBatchResultSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "403": OpenApiResponse(description="Forbidden"),
+        "409": OpenApiResponse(description="Events applied concurrently"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def createGameEventBatch(request):
+    serializer = GameEventBatchSerializer(data=request.data)
+    try:
+        serializer.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    try:
+        result = ingest_game_events(serializer.validated_data["events"])
+    except EventBatchError as e:
+        return Response({"error": "Bad request", "details": e.errors}, status=400)
+    except IntegrityError:
+        # Another request applied some of the events meanwhile, sending again skips them
+        return Response(
+            {"error": "Conflict", "details": "Events are being applied by another request"},
+            status=409,
+        )
+
+    serializer = GameEventBatchResultSerializer(result)
+    return Response(serializer.data)
+
+
 @extend_schema(
     summary="Delete a game event",
     responses={
@@ -674,7 +847,9 @@ def deleteGameEvent(request, event_id):
 @api_view(["GET"])
 def getRound(request, round_id):
     try:
-        round = TeamSportRound.objects.get(id=round_id)
+        round = TeamSportRoundSerializer.setup_eager_loading(TeamSportRound.objects).get(
+            id=round_id
+        )
     except TeamSportRound.DoesNotExist:
         return Response({"error": "Round not found"}, status=404)
     serializer = TeamSportRoundSerializer(round)
@@ -692,6 +867,7 @@ def getRound(request, round_id):
 @api_view(["GET"])
 def getRounds(request):
     rounds = TeamSportRound.objects.filter(is_active=True)
+    rounds = TeamSportRoundSerializer.setup_eager_loading(rounds)
     serializer = TeamSportRoundSerializer(rounds, many=True)
     return Response(serializer.data)
 
@@ -707,10 +883,210 @@ def getRounds(request):
 @api_view(["GET"])
 def getRoundsByDiscipline(request, discipline_id):
     rounds = TeamSportRound.objects.filter(discipline=discipline_id, is_active=True)
+    rounds = TeamSportRoundSerializer.setup_eager_loading(rounds)
     serializer = TeamSportRoundSerializer(rounds, many=True)
     return Response(serializer.data)
 
 
+# Schedules
+
+
+@extend_schema(
+    summary="Preview a schedule without writing to the database",
+    parameters=[SchedulePreviewQuerySerializer],
+    responses={
+        "200": SchedulePreviewSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "404": OpenApiResponse(description="Discipline not found"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["GET"])
+def getSchedulePreview(request):
+    query = SchedulePreviewQuerySerializer(data=request.query_params)
+    try:
+        query.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    try:
+        preview = preview_schedule(
+            pairing_system=query.validated_data.get("pairing_system"),
+            edition_id=query.validated_data.get("edition"),
+            discipline_id=query.validated_data.get("discipline"),
+            team_count=query.validated_data.get("teams"),
+            max_rounds=query.validated_data.get("max_rounds"),
+        )
+    except Discipline.DoesNotExist:
+        return Response({"error": "Discipline not found"}, status=404)
+    except ValueError as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    serializer = SchedulePreviewSerializer(preview)
+    return Response(serializer.data)
+
+
+# Feed
+
+
+@extend_schema(
+    summary="Get the changes of an edition since a cursor",
+    description=(
+        "Returns game events, game scores and discipline results changed after the cursor, "
+        "in commit order. Poll again with the returned cursor to get the next changes."
+    ),
+    parameters=[FeedQuerySerializer],
+    responses={
+        "200": FeedSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def getFeed(request):
+    query = FeedQuerySerializer(data=request.query_params)
+    try:
+        query.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    limit = query.validated_data["limit"]
+    entries = list(
+        FeedEntry.objects.filter(
+            edition=query.validated_data["edition"], sequence__gt=query.validated_data["since"]
+        ).order_by("sequence")[: limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    serializer = FeedSerializer(
+        {
+            "cursor": entries[-1].sequence if entries else query.validated_data["since"],
+            "has_more": has_more,
+            "entries": entries,
+        }
+    )
+    return Response(serializer.data)
+
+
+# Live
+
+# Seconds between keep-alive comments, preventing proxies from closing idle streams
+LIVE_KEEPALIVE_INTERVAL = 15
+
+
+def _format_live_message(message: dict) -> str:
+    """
+    Format a feed message as a server-sent event.
+    """
+    return (
+        f"id: {message['sequence']}\nevent: {message['kind']}\n"
+        f"data: {json.dumps(message, cls=DjangoJSONEncoder)}\n\n"
+    )
+
+
+async def streamLive(request, edition_id):
+    """
+    Stream the changes of an edition, or of one of its disciplines, as server-sent events.
+
+    Clients reconnecting with a Last-Event-ID header first receive the feed entries they missed.
+    Changes are sent in sequence order: live messages published after messages of later
+    sequences, e.g. by another process, are read back from the feed when their sequence is
+    skipped and dropped when they arrive. Requires the ASGI application.
+    """
+    discipline_id = request.GET.get("discipline")
+    if discipline_id is not None and not discipline_id.isdigit():
+        return JsonResponse({"error": "Bad request", "details": "Invalid discipline"}, status=400)
+    discipline_id = int(discipline_id) if discipline_id is not None else None
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+
+    def matches(message):
+        if discipline_id is None:
+            return True
+        if message["kind"] == FeedEntry.Kinds.RESULTS:
+            return message["object_id"] == discipline_id
+        return message["payload"].get("discipline") == discipline_id
+
+    def get_last_sequence():
+        return FeedEntry.objects.filter(edition=edition_id).aggregate(
+            last_sequence=Max("sequence")
+        )["last_sequence"] or 0
+
+    def get_messages(after, until=None):
+        entries = FeedEntry.objects.filter(edition=edition_id, sequence__gt=after)
+        if until is not None:
+            entries = entries.filter(sequence__lte=until)
+        if discipline_id:
+            entries = entries.filter(
+                Q(kind=FeedEntry.Kinds.RESULTS, object_id=discipline_id)
+                | Q(payload__discipline=discipline_id)
+            )
+        return [
+            {
+                "id": entry.id,
+                "sequence": entry.sequence,
+                "kind": entry.kind,
+                "object_id": entry.object_id,
+                "payload": entry.payload,
+            }
+            for entry in entries.order_by("sequence")[:SUBSCRIPTION_MAX_SIZE]
+        ]
+
+    async def read_feed(after, until=None):
+        # Page through the feed, however many entries were missed
+        while True:
+            messages = await sync_to_async(get_messages)(after, until)
+            for message in messages:
+                yield message
+            if len(messages) < SUBSCRIPTION_MAX_SIZE:
+                return
+            after = messages[-1]["sequence"]
+
+    async def stream():
+        broker = get_broker()
+        # Subscribe before reading the feed so that nothing is lost in between. Streams of a
+        # discipline also follow the whole edition, so that skipped sequences are detected
+        subscription = broker.subscribe([f"edition:{edition_id}"])
+        try:
+            yield "retry: 3000\n\n"
+            if last_event_id is None:
+                sequence = await sync_to_async(get_last_sequence)()
+            else:
+                sequence = last_event_id
+                async for message in read_feed(last_event_id):
+                    sequence = message["sequence"]
+                    yield _format_live_message(message)
+
+            while not subscription.overflowed:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), timeout=LIVE_KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message["sequence"] <= sequence:
+                    # Already sent, read back from the feed
+                    continue
+                if message["sequence"] > sequence + 1:
+                    async for missed_message in read_feed(sequence, message["sequence"] - 1):
+                        yield _format_live_message(missed_message)
+                sequence = message["sequence"]
+                if matches(message):
+                    yield _format_live_message(message)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # Team Results
 
 
@@ -724,9 +1100,11 @@ def getRoundsByDiscipline(request, discipline_id):
     },
 )
 @api_view(["GET"])
-def getTeamResult(request, team_result_id):
+def getTeamResult(request, result_id):
     try:
-        team_result = TeamResult.objects.get(id=team_result_id)
+        team_result = TeamResultSerializer.setup_eager_loading(
+            TeamResult.objects.all()
+        ).get_ranked(result_id)
     except TeamResult.DoesNotExist:
         return Response({"error": "Team result not found"}, status=404)
     serializer = TeamResultSerializer(team_result)
@@ -743,7 +1121,8 @@ def getTeamResult(request, team_result_id):
 )
 @api_view(["GET"])
 def getTeamResults(request):
-    team_results = TeamResult.objects.filter(is_active=True)
+    team_results = TeamResult.objects.filter(is_active=True).with_ranking()
+    team_results = TeamResultSerializer.setup_eager_loading(team_results)
     serializer = TeamResultSerializer(team_results, many=True)
     return Response(serializer.data)
 
@@ -758,7 +1137,15 @@ def getTeamResults(request):
 )
 @api_view(["GET"])
 def getTeamResultsByTeam(request, team_id):
-    team_results = TeamResult.objects.filter(team=team_id, is_active=True)
+    # Rank every discipline of the team, the window function needs every active row
+    disciplines = TeamResult.objects.filter(team=team_id, is_active=True).values("discipline")
+    team_results = [
+        team_result
+        for team_result in TeamResultSerializer.setup_eager_loading(
+            TeamResult.objects.filter(discipline__in=disciplines, is_active=True)
+        ).with_ranking()
+        if team_result.team_id == team_id
+    ]
     serializer = TeamResultSerializer(team_results, many=True)
     return Response(serializer.data)
 
@@ -773,7 +1160,10 @@ def getTeamResultsByTeam(request, team_id):
 )
 @api_view(["GET"])
 def getTeamResultsByEdition(request, edition_id):
-    team_results = TeamResult.objects.filter(edition=edition_id, is_active=True)
+    team_results = TeamResult.objects.filter(
+        discipline__edition=edition_id, is_active=True
+    ).with_ranking()
+    team_results = TeamResultSerializer.setup_eager_loading(team_results)
     serializer = TeamResultSerializer(team_results, many=True)
     return Response(serializer.data)
 
@@ -788,7 +1178,10 @@ def getTeamResultsByEdition(request, edition_id):
 )
 @api_view(["GET"])
 def getTeamResultsByDiscipline(request, discipline_id):
-    team_results = TeamResult.objects.filter(discipline=discipline_id, is_active=True)
+    team_results = TeamResult.objects.filter(
+        discipline=discipline_id, is_active=True
+    ).with_ranking()
+    team_results = TeamResultSerializer.setup_eager_loading(team_results)
     serializer = TeamResultSerializer(team_results, many=True)
     return Response(serializer.data)
 
@@ -826,6 +1219,7 @@ def getBlindtestGuess(request, guess_id):
 @api_view(["GET"])
 def getBlindtestGuesses(request):
     guesses = BlindtestGuess.objects.filter(is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -841,6 +1235,7 @@ def getBlindtestGuesses(request):
 @api_view(["GET"])
 def getBlindtestGuessesByTeam(request, team_id):
     guesses = BlindtestGuess.objects.filter(team=team_id, is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -856,6 +1251,7 @@ def getBlindtestGuessesByTeam(request, team_id):
 @api_view(["GET"])
 def getBlindtestGuessesByBlindtest(request, blindtest_id):
     guesses = BlindtestGuess.objects.filter(blindtest=blindtest_id, is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -871,6 +1267,7 @@ def getBlindtestGuessesByBlindtest(request, blindtest_id):
 @api_view(["GET"])
 def getBlindtestGuessesByTeamAndBlindtest(request, team_id, blindtest_id):
     guesses = BlindtestGuess.objects.filter(team=team_id, blindtest=blindtest_id, is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -888,6 +1285,7 @@ def getCorrectBlindtestGuesses(request):
     guesses = BlindtestGuess.objects.filter(
         is_artist_correct=True, is_song_correct=True, is_active=True
     )
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -903,6 +1301,7 @@ def getCorrectBlindtestGuesses(request):
 @api_view(["GET"])
 def getCorrectArtistBlindtestGuesses(request):
     guesses = BlindtestGuess.objects.filter(is_artist_correct=True, is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -918,6 +1317,7 @@ def getCorrectArtistBlindtestGuesses(request):
 @api_view(["GET"])
 def getCorrectSongBlindtestGuesses(request):
     guesses = BlindtestGuess.objects.filter(is_song_correct=True, is_active=True)
+    guesses = BlindtestGuessSerializer.setup_eager_loading(guesses)
     serializer = BlindtestGuessSerializer(guesses, many=True)
     return Response(serializer.data)
 
@@ -934,7 +1334,9 @@ def getCorrectSongBlindtestGuesses(request):
 @api_view(["GET"])
 def getBlindtestRound(request, round_id):
     try:
-        round = BlindtestRound.objects.get(id=round_id)
+        round = BlindtestRoundSerializer.setup_eager_loading(BlindtestRound.objects).get(
+            id=round_id
+        )
     except BlindtestRound.DoesNotExist:
         return Response({"error": "Blindtest round not found"}, status=404)
     serializer = BlindtestRoundSerializer(round)
@@ -952,6 +1354,7 @@ def getBlindtestRound(request, round_id):
 @api_view(["GET"])
 def getBlindtestRounds(request):
     rounds = BlindtestRound.objects.filter(is_active=True)
+    rounds = BlindtestRoundSerializer.setup_eager_loading(rounds)
     serializer = BlindtestRoundSerializer(rounds, many=True)
     return Response(serializer.data)
 
@@ -967,6 +1370,7 @@ def getBlindtestRounds(request):
 @api_view(["GET"])
 def getBlindtestRoundsByBlindtest(request, blindtest_id):
     rounds = BlindtestRound.objects.filter(blindtest=blindtest_id, is_active=True)
+    rounds = BlindtestRoundSerializer.setup_eager_loading(rounds)
     serializer = BlindtestRoundSerializer(rounds, many=True)
     return Response(serializer.data)
 
@@ -982,36 +1386,102 @@ def getBlindtestRoundsByBlindtest(request, blindtest_id):
 @api_view(["GET"])
 def getBlindtestRoundsByEdition(request, edition_id):
     rounds = BlindtestRound.objects.filter(blindtest__edition=edition_id, is_active=True)
+    rounds = BlindtestRoundSerializer.setup_eager_loading(rounds)
     serializer = BlindtestRoundSerializer(rounds, many=True)
     return Response(serializer.data)
 
 
 @extend_schema(
-    summary="Set the artist and song for a blindtest guess",
+    summary="Set the artist and/or song for a blindtest guess",
+    description="Only possible while the round is open, for a guess of the user's team.",
     request=BlindtestGuessUpdateSerializer,
     responses={
-        "200": BlindtestGuessSerializer,
+        "200": BlindtestGuessSubmissionSerializer,
         "400": OpenApiResponse(description="Bad request"),
+        "403": OpenApiResponse(description="Blindtest guess of another team"),
         "404": OpenApiResponse(description="Blindtest guess not found"),
+        "409": OpenApiResponse(description="Blindtest round closed"),
         "500": OpenApiResponse(description="Internal server error"),
     },
 )
 @api_view(["PATCH"])
 def setBlindtestGuessAnswer(request, guess_id):
+    serializer = BlindtestGuessUpdateSerializer(data=request.data)
     try:
-        guess = BlindtestGuess.objects.get(id=guess_id)
-    except BlindtestGuess.DoesNotExist:
-        return Response({"error": "Blindtest guess not found"}, status=404)
+        serializer.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
 
-    serializer = BlindtestGuessUpdateSerializer(data=request.data)
+    # Single conditional UPDATE on the hot path, errors are looked up only on failure
+    if not BlindtestGuess.submit(guess_id, request.user, **serializer.validated_data):
+        error, status = BlindtestGuess.submission_error(guess_id, request.user)
+        return Response({"error": error}, status=status)
+
+    serializer = BlindtestGuessSubmissionSerializer({"id": guess_id, **serializer.validated_data})
+    return Response(serializer.data)
+
+
+@extend_schema(
+    summary="Set the artists and/or songs of several blindtest guesses",
+    description=(
+        "Guesses are submitted with a single UPDATE. Guesses of closed rounds, "
+        "of another team or not found are rejected."
+    ),
+    request=BlindtestGuessBatchSerializer,
+    responses={
+        "200": BlindtestGuessBatchResultSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["POST"])
+def submitBlindtestGuesses(request):
+    serializer = BlindtestGuessBatchSerializer(data=request.data)
     try:
         serializer.is_valid(raise_exception=True)
     except Exception as e:
         return Response({"error": "Bad request", "details": str(e)}, status=400)
 
-    guess.artist = serializer.validated_data["artist"]
-    guess.song = serializer.validated_data["song"]
-    guess.save()
+    submissions = {
+        guess.pop("id"): guess for guess in serializer.validated_data["guesses"]
+    }
+    rejected = BlindtestGuess.submit_many(request.user, submissions)
 
-    serializer = BlindtestGuessSerializer(guess)
+    serializer = BlindtestGuessBatchResultSerializer(
+        {
+            "submitted": [guess_id for guess_id in submissions if guess_id not in rejected],
+            "rejected": rejected,
+        }
+    )
+    return Response(serializer.data)
+
+
+@extend_schema(
+    summary="Grade the guesses of a blindtest round against its answer key",
+    request=BlindtestRoundGradingQuerySerializer,
+    responses={
+        "200": BlindtestRoundGradingSerializer,
+        "400": OpenApiResponse(description="Bad request"),
+        "401": OpenApiResponse(description="Unauthorized"),
+        "403": OpenApiResponse(description="Forbidden"),
+        "404": OpenApiResponse(description="Blindtest round not found"),
+        "500": OpenApiResponse(description="Internal server error"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def gradeBlindtestRound(request, round_id):
+    serializer = BlindtestRoundGradingQuerySerializer(data=request.data)
+    try:
+        serializer.is_valid(raise_exception=True)
+    except Exception as e:
+        return Response({"error": "Bad request", "details": str(e)}, status=400)
+
+    try:
+        grading = grade_blindtest_round(round_id, **serializer.validated_data)
+    except BlindtestRound.DoesNotExist:
+        return Response({"error": "Blindtest round not found"}, status=404)
+
+    serializer = BlindtestRoundGradingSerializer(grading)
     return Response(serializer.data)